@@ -0,0 +1,58 @@
+'''
+Compares the latency of a new connection per request (as with requests.get in the
+OauthProviderMixin of RDMO) with the pooled keep-alive session of rdmo_plugins.exports.utils.
+
+    python benchmarks/http_sessions.py [requests] [delay_ms]
+
+The stand-in server from benchmarks/servers.py answers every request with a small JSON document
+after delay_ms milliseconds. The server uses plain HTTP, so the TLS handshake, which is saved
+as well by the pooled session, is not part of the numbers. Needs requests, but not RDMO.
+'''
+import os
+import statistics
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from servers import start_server  # noqa: E402
+from rdmo_plugins.exports.utils import get_session  # noqa: E402
+
+
+def measure(get, url, headers, number_of_requests):
+    latencies = []
+    for i in range(number_of_requests):
+        start = time.perf_counter()
+        get(url, headers=headers, timeout=(5, 30)).raise_for_status()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def main():
+    number_of_requests = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    latency = (int(sys.argv[2]) if len(sys.argv) > 2 else 0) / 1000
+
+    server = start_server(latency=latency)
+    url = '{}/radar/api/workspaces'.format(server.url)
+
+    # the stand-in server needs an access token, like RADAR
+    access_token = requests.post('{}/radar-backend/oauth/token'.format(server.url)).json()['access_token']
+    headers = {'Authorization': 'Bearer {}'.format(access_token)}
+
+    try:
+        for label, session in [
+            ('new connection:', requests),
+            ('pooled session:', get_session(url))
+        ]:
+            latencies = sorted(measure(session.get, url, headers, number_of_requests))
+            print('{:16} median {:6.2f} ms, p95 {:6.2f} ms, total {:8.1f} ms'.format(
+                label, statistics.median(latencies), latencies[int(len(latencies) * 0.95)], sum(latencies)
+            ))
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
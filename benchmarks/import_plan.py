@@ -0,0 +1,177 @@
+'''
+Compares the ElementPath queries, which were used by the DataCite and RADAR
+imports before, with the single pass of the ImportPlan.
+
+    python benchmarks/import_plan.py [number_of_creators] [repetitions]
+
+Only the traversal of the document is measured, the creation of the values is
+left out, so that the benchmark runs without RDMO or a database.
+'''
+import os
+import sys
+import timeit
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rdmo_plugins.imports.utils import ImportPlan  # noqa: E402
+
+NS = 'http://datacite.org/schema/kernel-4'
+NS_MAP = {'ns0': NS}
+
+
+def create_document(number_of_creators):
+    resource = ET.Element('{%s}resource' % NS)
+    ET.SubElement(resource, '{%s}identifier' % NS, identifierType='DOI').text = '10.1234/test'
+
+    creators = ET.SubElement(resource, '{%s}creators' % NS)
+    for i in range(number_of_creators):
+        creator = ET.SubElement(creators, '{%s}creator' % NS)
+        ET.SubElement(creator, '{%s}creatorName' % NS).text = 'Creator #{}'.format(i)
+        ET.SubElement(creator, '{%s}nameIdentifier' % NS, nameIdentifierScheme='ORCID').text = '0000'
+        ET.SubElement(creator, '{%s}affiliation' % NS).text = 'Affiliation'
+
+    titles = ET.SubElement(resource, '{%s}titles' % NS)
+    ET.SubElement(titles, '{%s}title' % NS).text = 'Title'
+    ET.SubElement(resource, '{%s}publisher' % NS).text = 'Publisher'
+    ET.SubElement(resource, '{%s}publicationYear' % NS).text = '2020'
+
+    subjects = ET.SubElement(resource, '{%s}subjects' % NS)
+    for i in range(10):
+        ET.SubElement(subjects, '{%s}subject' % NS).text = 'Subject #{}'.format(i)
+
+    contributors = ET.SubElement(resource, '{%s}contributors' % NS)
+    for i in range(number_of_creators):
+        contributor = ET.SubElement(contributors, '{%s}contributor' % NS, contributorType='Other')
+        ET.SubElement(contributor, '{%s}contributorName' % NS).text = 'Contributor #{}'.format(i)
+
+    dates = ET.SubElement(resource, '{%s}dates' % NS)
+    ET.SubElement(dates, '{%s}date' % NS, dateType='Created').text = '2020-01-01'
+    ET.SubElement(dates, '{%s}date' % NS, dateType='Issued').text = '2020-01-02'
+    ET.SubElement(resource, '{%s}language' % NS).text = 'en-US'
+    ET.SubElement(resource, '{%s}resourceType' % NS, resourceTypeGeneral='Dataset').text = 'Dataset'
+
+    related_identifiers = ET.SubElement(resource, '{%s}relatedIdentifiers' % NS)
+    for i in range(10):
+        ET.SubElement(related_identifiers, '{%s}relatedIdentifier' % NS,
+                      relatedIdentifierType='DOI', relationType='Cites').text = '10.1234/{}'.format(i)
+
+    rights_list = ET.SubElement(resource, '{%s}rightsList' % NS)
+    ET.SubElement(rights_list, '{%s}rights' % NS, rightsURI='https://creativecommons.org/licenses/by/4.0/')
+    descriptions = ET.SubElement(resource, '{%s}descriptions' % NS)
+    ET.SubElement(descriptions, '{%s}description' % NS, descriptionType='Abstract').text = 'Description'
+
+    funding_references = ET.SubElement(resource, '{%s}fundingReferences' % NS)
+    funding_reference = ET.SubElement(funding_references, '{%s}fundingReference' % NS)
+    ET.SubElement(funding_reference, '{%s}funderName' % NS).text = 'Funder'
+
+    return resource
+
+
+def process_xpath(root):
+    nodes = [
+        root.find('./ns0:titles/ns0:title', NS_MAP),
+        root.find("./ns0:descriptions/ns0:description[@descriptionType='Abstract']", NS_MAP),
+        root.find('./ns0:language', NS_MAP),
+        root.find('./ns0:resourceType', NS_MAP),
+        root.findall('./ns0:subjects/ns0:subject', NS_MAP),
+        root.find('./ns0:identifier', NS_MAP),
+        root.find('./ns0:publisher', NS_MAP),
+        root.find("./ns0:dates/ns0:date[@dateType='Created']", NS_MAP),
+        root.find("./ns0:dates/ns0:date[@dateType='Issued']", NS_MAP),
+        root.find('./ns0:publicationYear', NS_MAP),
+        root.findall('./ns0:rightsList/ns0:rights', NS_MAP),
+        root.findall('./ns0:alternateIdentifiers/ns0:alternateIdentifier', NS_MAP),
+        root.findall('./ns0:relatedIdentifiers/ns0:relatedIdentifier', NS_MAP),
+    ]
+    for creator_node in root.findall('./ns0:creators/ns0:creator', NS_MAP):
+        nodes.append(creator_node.find('./ns0:creatorName', NS_MAP))
+        nodes.append(creator_node.find('./ns0:nameIdentifier', NS_MAP))
+        nodes.append(creator_node.findall('./ns0:affiliation', NS_MAP))
+    for contributor_node in root.findall('./ns0:contributors/ns0:contributor', NS_MAP):
+        nodes.append(contributor_node.find('./ns0:contributorName', NS_MAP))
+        nodes.append(contributor_node.find('./ns0:nameIdentifier', NS_MAP))
+        nodes.append(contributor_node.findall('./ns0:affiliation', NS_MAP))
+    for funding_reference_node in root.findall('./ns0:fundingReferences/ns0:fundingReference', NS_MAP):
+        nodes.append(funding_reference_node.find('./ns0:funderName', NS_MAP))
+        nodes.append(funding_reference_node.find('./ns0:funderIdentifier', NS_MAP))
+        nodes.append(funding_reference_node.find('./ns0:awardNumber', NS_MAP))
+        nodes.append(funding_reference_node.find('./ns0:awardTitle', NS_MAP))
+    return nodes
+
+
+class Plugin(object):
+
+    import_plan = {
+        'identifier': 'process_node',
+        'creators': 'process_names',
+        'titles': 'process_container',
+        'publisher': 'process_node',
+        'publicationYear': 'process_node',
+        'subjects': 'process_container',
+        'contributors': 'process_names',
+        'dates': 'process_dates',
+        'language': 'process_node',
+        'resourceType': 'process_node',
+        'alternateIdentifiers': 'process_container',
+        'relatedIdentifiers': 'process_container',
+        'rightsList': 'process_container',
+        'descriptions': 'process_descriptions',
+        'fundingReferences': 'process_funding_references'
+    }
+
+    def __init__(self):
+        self.plan = ImportPlan(NS, self.import_plan)
+
+    def process(self, root):
+        self.nodes = []
+        self.plan.dispatch(self, root)
+        return self.nodes
+
+    def process_node(self, node):
+        self.nodes.append(node)
+
+    def process_container(self, node):
+        self.nodes.append(list(node))
+
+    def process_descriptions(self, node):
+        self.nodes.append(self.plan.children(node).first('description', descriptionType='Abstract'))
+
+    def process_dates(self, node):
+        children = self.plan.children(node)
+        self.nodes.append(children.first('date', dateType='Created'))
+        self.nodes.append(children.first('date', dateType='Issued'))
+
+    def process_names(self, node):
+        for name_node in node:
+            children = self.plan.children(name_node)
+            self.nodes.append(children.first('creatorName'))
+            self.nodes.append(children.first('contributorName'))
+            self.nodes.append(children.first('nameIdentifier'))
+            self.nodes.append(children['affiliation'])
+
+    def process_funding_references(self, node):
+        for funding_reference_node in node:
+            children = self.plan.children(funding_reference_node)
+            for tag in ['funderName', 'funderIdentifier', 'awardNumber', 'awardTitle']:
+                self.nodes.append(children.first(tag))
+
+
+def main():
+    number_of_creators = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    repetitions = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+    root = create_document(number_of_creators)
+    plugin = Plugin()
+
+    xpath_time = min(timeit.repeat(lambda: process_xpath(root), number=repetitions, repeat=5))
+    plan_time = min(timeit.repeat(lambda: plugin.process(root), number=repetitions, repeat=5))
+
+    print('creators/contributors: {}, repetitions: {}'.format(number_of_creators, repetitions))
+    print('ElementPath queries: {:8.2f} us/document'.format(xpath_time / repetitions * 1e6))
+    print('ImportPlan:          {:8.2f} us/document'.format(plan_time / repetitions * 1e6))
+    print('speedup:             {:8.2f}x'.format(xpath_time / plan_time))
+
+
+if __name__ == '__main__':
+    main()
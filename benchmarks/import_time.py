@@ -0,0 +1,92 @@
+'''
+Measures the time it takes to import the classes of the plugins, after Django was set up, as it
+happens when a worker process of RDMO uses an export or import for the first time. Every class is
+imported in a new process, so that the numbers do not depend on each other. Needs an RDMO instance
+with rdmo_plugins installed, e.g.:
+
+    cd rdmo-app
+    DJANGO_SETTINGS_MODULE=config.settings python /path/to/rdmo-plugins/benchmarks/import_time.py --repetitions 5
+
+For every class, the median import time, the number of modules which were loaded by the import,
+and which of the larger dependencies were loaded with it are shown.
+'''
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+plugins = [
+    'rdmo_plugins.exports.datacite.DataCiteExport',
+    'rdmo_plugins.exports.datacite.DataCiteJSONExport',
+    'rdmo_plugins.exports.madmp.MaDMPExport',
+    'rdmo_plugins.exports.radar.RadarExport',
+    'rdmo_plugins.exports.bundle.BundleExport',
+    'rdmo_plugins.exports.radar.RadarExportProvider',
+    'rdmo_plugins.exports.zenodo.ZenodoExportProvider',
+    'rdmo_plugins.exports.combined.CombinedExportProvider',
+    'rdmo_plugins.imports.datacite.DataCiteImport',
+    'rdmo_plugins.imports.madmp.MaDMPImport',
+    'rdmo_plugins.imports.radar.RadarImport'
+]
+
+dependencies = [
+    'requests',
+    'cryptography',
+    'lxml',
+    'jsonschema',
+    'django.forms',
+    'rdmo.services.providers'
+]
+
+script = '''
+import json
+import sys
+import time
+
+import django
+django.setup()
+
+from rdmo.core.utils import import_class
+
+modules = set(sys.modules)
+start = time.perf_counter()
+import_class(sys.argv[1])
+print(json.dumps({
+    'time': time.perf_counter() - start,
+    'modules': sorted(set(sys.modules) - modules)
+}))
+'''
+
+
+def measure(class_name):
+    output = subprocess.check_output([sys.executable, '-c', script, class_name], env=dict(os.environ),
+                                     cwd=os.getcwd())
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Import time of the plugins.')
+    parser.add_argument('--repetitions', type=int, default=5)
+    parser.add_argument('--plugins', nargs='+', default=plugins)
+    args = parser.parse_args()
+
+    if 'DJANGO_SETTINGS_MODULE' not in os.environ:
+        parser.error('DJANGO_SETTINGS_MODULE needs to be set.')
+
+    for class_name in args.plugins:
+        results = [measure(class_name) for i in range(args.repetitions)]
+        modules = results[-1]['modules']
+        loaded = [dependency for dependency in dependencies if dependency in modules]
+
+        print('{}: median {:.1f} ms, {} modules, {}'.format(
+            class_name,
+            statistics.median(result['time'] for result in results) * 1000,
+            len(modules),
+            'loads {}'.format(', '.join(loaded)) if loaded else 'no larger dependencies'
+        ))
+
+
+if __name__ == '__main__':
+    main()
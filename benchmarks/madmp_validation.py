@@ -0,0 +1,86 @@
+'''
+Measures the overhead of the validation of maDMP documents against the
+RDA DMP Common Standard schema, with a validator which is compiled once and
+reused (as in rdmo_plugins.validators) and with a validator which is created
+for every document.
+
+    python benchmarks/madmp_validation.py /path/to/maDMP-schema-1.1.json [number_of_datasets] [repetitions]
+
+Needs jsonschema, but not RDMO.
+'''
+import json
+import sys
+import timeit
+
+import jsonschema
+
+
+def create_document(number_of_datasets):
+    return {
+        'dmp': {
+            'title': 'maDMP for Test',
+            'created': '2020-01-01T00:00:00',
+            'modified': '2020-01-01T00:00:00',
+            'language': 'eng',
+            'ethical_issues_exist': 'unknown',
+            'dmp_id': {'identifier': 'https://example.com/dmp', 'type': 'url'},
+            'contact': {
+                'name': 'Contact',
+                'mbox': 'contact@example.com',
+                'contact_id': {'identifier': '0000-0000-0000-0000', 'type': 'orcid'}
+            },
+            'dataset': [{
+                'title': 'Dataset #{}'.format(i),
+                'description': 'Description',
+                'dataset_id': {'identifier': 'dataset-{}'.format(i), 'type': 'other'},
+                'keyword': ['a', 'b', 'c'],
+                'personal_data': 'no',
+                'sensitive_data': 'unknown',
+                'distribution': [{
+                    'title': 'Preservation after the project',
+                    'data_access': 'open',
+                    'license': [{
+                        'license_ref': 'https://creativecommons.org/licenses/by/4.0/',
+                        'start_date': '2020-01-01'
+                    }]
+                }]
+            } for i in range(number_of_datasets)]
+        }
+    }
+
+
+def main():
+    schema_path = sys.argv[1]
+    number_of_datasets = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    repetitions = int(sys.argv[3]) if len(sys.argv) > 3 else 500
+
+    with open(schema_path) as f:
+        schema = json.load(f)
+
+    document = create_document(number_of_datasets)
+    serialized = json.dumps(document)
+
+    validator_class = jsonschema.validators.validator_for(schema)
+    validator_class.check_schema(schema)
+    validator = validator_class(schema)
+    assert not list(validator.iter_errors(document))
+
+    def uncached():
+        validator_class = jsonschema.validators.validator_for(schema)
+        validator_class.check_schema(schema)
+        return list(validator_class(schema).iter_errors(document))
+
+    dumps_time = min(timeit.repeat(lambda: json.dumps(document), number=repetitions, repeat=5))
+    loads_time = min(timeit.repeat(lambda: json.loads(serialized), number=repetitions, repeat=5))
+    cached_time = min(timeit.repeat(lambda: list(validator.iter_errors(document)), number=repetitions, repeat=5))
+    uncached_time = min(timeit.repeat(uncached, number=repetitions, repeat=5))
+
+    print('datasets: {}, repetitions: {}'.format(number_of_datasets, repetitions))
+    print('json.dumps (export):        {:8.3f} ms/document'.format(dumps_time / repetitions * 1e3))
+    print('json.loads (import):        {:8.3f} ms/document'.format(loads_time / repetitions * 1e3))
+    print('validation, cached:         {:8.3f} ms/document'.format(cached_time / repetitions * 1e3))
+    print('validation, not cached:     {:8.3f} ms/document'.format(uncached_time / repetitions * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+'''
+Load test of the RADAR and Zenodo export providers against the stand-in server from
+benchmarks/servers.py. The providers run end-to-end, from render and submit to the write-back
+of the values, for all datasets of an existing project. All changes to the database are rolled
+back at the end. Needs an RDMO instance with rdmo_plugins installed, e.g.:
+
+    cd rdmo-app
+    DJANGO_SETTINGS_MODULE=config.settings python /path/to/rdmo-plugins/benchmarks/providers.py \\
+        --project 1 --iterations 10 --latency 50 --error-rate 0.05
+
+The first iteration creates the datasets and depositions, the following ones update them. With
+--lost-response-rate, some datasets are created, but the provider gets a 504, so they are created
+again in the next iteration (the claims of the RADAR provider are released after every iteration, as
+if the pending_timeout had passed). The number of duplicates, which the server created for a known
+Idempotency-Key, is reported at the end, with --ignore-idempotency-key the server behaves like a
+service, which does not support the header.
+'''
+import argparse
+import os
+import statistics
+import sys
+import time
+from importlib import import_module
+
+import requests
+
+sys.path.insert(0, os.getcwd())
+
+import django  # noqa: E402
+
+from servers import start_server  # noqa: E402
+
+providers = [
+    ('radar', 'rdmo_plugins.exports.radar.RadarExportProvider', 'radar-backend/oauth/token'),
+    ('zenodo', 'rdmo_plugins.exports.zenodo.ZenodoExportProvider', 'oauth/token')
+]
+
+
+def get_request(method, path, user, session, data=None):
+    from django.test import RequestFactory
+
+    request = getattr(RequestFactory(), method)(path, data or {})
+    request.user = user
+    request.session = session
+    request.LANGUAGE_CODE = 'en'
+    return request
+
+
+def get_provider(key, class_name, request, project):
+    from rdmo.core.utils import import_class
+
+    provider = import_class(class_name)(key, key, class_name)
+    provider.request = request
+    provider.project = project
+    return provider
+
+
+def get_post_data(key, project):
+    set_indexes = [str(value.set_index) for value in project.values.filter(snapshot=None, set_prefix='',
+                                                                           attribute__path='project/dataset/id')]
+    if key == 'radar':
+        return {'datasets': set_indexes, 'all_datasets': 'on', 'workspace': 'workspace-1'}
+    else:
+        return {'datasets': set_indexes}
+
+
+def run(key, class_name, token_path, server, project, user, iterations):
+    from django.conf import settings
+    from django.core.cache import cache
+
+    session = import_module(settings.SESSION_ENGINE).SessionStore()
+    path = '/projects/{}/export/{}/'.format(project.id, key)
+    data = get_post_data(key, project)
+
+    provider = get_provider(key, class_name, get_request('get', path, user, session), project)
+    access_token = requests.post('{}/{}'.format(server.url, token_path)).json()['access_token']
+    provider.store_in_session(provider.request, 'access_token', access_token)
+
+    if key == 'radar':
+        cache.delete(provider.get_workspace_cache_key(provider.request))
+
+    timings = []
+    for iteration in range(iterations):
+        # render the form (for RADAR, this includes the redirect after the workspaces were fetched)
+        response = provider.render()
+        if response.status_code == 302:
+            response = provider.render()
+
+        if key == 'radar':
+            for set_index in data['datasets']:
+                provider.release_dataset(int(set_index))
+
+        provider.request = get_request('post', path, user, session, data)
+
+        start = time.perf_counter()
+        response = provider.submit()
+        timings.append(time.perf_counter() - start)
+
+        provider.request = get_request('get', path, user, session)
+
+    number_of_datasets = len(data['datasets'])
+    print('{}: {} datasets, {} iterations, median {:.1f} ms per submit, {:.1f} datasets/s'.format(
+        key, number_of_datasets, iterations, statistics.median(timings) * 1000,
+        number_of_datasets * iterations / sum(timings) if sum(timings) else 0
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test of the RADAR and Zenodo export providers.')
+    parser.add_argument('--project', type=int, required=True, help='id of the project to export')
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--latency', type=int, default=0, help='latency of every request in ms')
+    parser.add_argument('--error-rate', type=float, default=0, help='share of the requests which fail')
+    parser.add_argument('--error-status', type=int, default=503, help='status of the failing requests')
+    parser.add_argument('--lost-response-rate', type=float, default=0,
+                        help='share of the POST requests which create the resource, but answer with 504')
+    parser.add_argument('--ignore-idempotency-key', action='store_true',
+                        help='the server creates a new resource for every POST, even with a known Idempotency-Key')
+    parser.add_argument('--max-workers', type=int, default=4)
+    parser.add_argument('--rate-limit', type=float, default=0, help='requests per second, 0 for no limit')
+    parser.add_argument('--providers', nargs='+', default=[key for key, class_name, token_path in providers])
+    args = parser.parse_args()
+
+    django.setup()
+
+    from django.conf import settings
+    from django.db import transaction
+    from django.test import override_settings
+
+    from rdmo.projects.models import Project
+
+    server = start_server(latency=args.latency / 1000, error_rate=args.error_rate, error_status=args.error_status,
+                          lost_response_rate=args.lost_response_rate,
+                          ignore_idempotency_key=args.ignore_idempotency_key)
+
+    provider_settings = {
+        'client_id': 'client_id',
+        'client_secret': 'client_secret',
+        'redirect_uri': '{}/callback'.format(server.url),
+        'max_workers': args.max_workers,
+        'rate_limit': args.rate_limit
+    }
+
+    try:
+        with override_settings(
+            RADAR_PROVIDER=dict(getattr(settings, 'RADAR_PROVIDER', {}), radar_url=server.url, **provider_settings),
+            ZENODO_PROVIDER=dict(getattr(settings, 'ZENODO_PROVIDER', {}), zenodo_url=server.url, **provider_settings)
+        ):
+            with transaction.atomic():
+                project = Project.objects.get(pk=args.project)
+                user = project.owners.first()
+                if user is None:
+                    parser.error('The project needs an owner.')
+
+                for key, class_name, token_path in providers:
+                    if key in args.providers:
+                        run(key, class_name, token_path, server, project, user, args.iterations)
+
+                transaction.set_rollback(True)
+    finally:
+        server.shutdown()
+
+    print('server: {}'.format(', '.join('{}={}'.format(*item) for item in sorted(server.counter.items()))))
+    if server.files:
+        print('files: {count} uploaded, {bytes} bytes'.format(**server.files))
+    print('duplicates: {} resources were created again for a known Idempotency-Key, {} responses were lost'.format(
+        server.counter['duplicates'], server.counter['lost_responses']
+    ))
+
+
+if __name__ == '__main__':
+    main()
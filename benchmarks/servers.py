@@ -0,0 +1,335 @@
+'''
+Local stand-in servers for the RADAR and Zenodo APIs, which are used by the RADAR and Zenodo
+export providers. One server answers both, since the paths of the two APIs do not overlap:
+
+    GET  /radar-backend/oauth/authorize, POST /radar-backend/oauth/token
+    GET  /radar/api/workspaces (paginated using a Link header)
+    POST /radar/api/workspaces/<id>/datasets, GET/PUT /radar/api/datasets/<id>
+
+    GET  /oauth/authorize, POST /oauth/token
+    POST /api/deposit/depositions, PUT /api/deposit/depositions/<id>
+    PUT  /api/files/<bucket>/<file_name>
+
+POST requests with an Idempotency-Key header, which was seen before, return the same resource,
+unless --ignore-idempotency-key is given, which behaves like a service without support for the header.
+Every request is delayed by the given latency, and a share of the requests fails with the given
+error status, so that the behaviour of the providers under load and errors can be measured. With
+--lost-response-rate, a share of the POST requests creates the resource, but answers with 504, like
+a request which timed out after it reached the service. The number of resources, which were created
+again with a known Idempotency-Key, is counted as 'duplicates'.
+
+    python benchmarks/servers.py [--port 8000] [--latency 50] [--error-rate 0.05] [--error-status 503] \\
+        [--lost-response-rate 0.1] [--ignore-idempotency-key]
+
+Then set 'radar_url' in RADAR_PROVIDER and 'zenodo_url' in ZENODO_PROVIDER to http://localhost:8000.
+Only the standard library is needed.
+'''
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+
+class StandInServer(ThreadingHTTPServer):
+
+    daemon_threads = True
+
+    def __init__(self, address, latency=0, error_rate=0, error_status=503, workspaces=3, page_size=2,
+                 lost_response_rate=0, ignore_idempotency_key=False):
+        super().__init__(address, Handler)
+
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.page_size = page_size
+        self.lost_response_rate = lost_response_rate
+        self.ignore_idempotency_key = ignore_idempotency_key
+
+        self.lock = threading.Lock()
+        self.counter = Counter()
+        self.tokens = set()
+        self.idempotency_keys = {}
+        self.created_keys = Counter()
+        self.workspaces = [{
+            'id': 'workspace-{}'.format(i + 1),
+            'descriptiveMetadata': {'title': 'Workspace #{}'.format(i + 1)}
+        } for i in range(workspaces)]
+        self.datasets = {}
+        self.depositions = {}
+        self.files = Counter()
+
+    @property
+    def url(self):
+        return 'http://{}:{}'.format(*self.server_address[:2])
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return self
+
+
+class Handler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    routes = [
+        ('GET', r'^/(radar-backend/)?oauth/authorize$', 'authorize'),
+        ('POST', r'^/(radar-backend/)?oauth/token$', 'token'),
+        ('GET', r'^/radar/api/workspaces$', 'list_workspaces'),
+        ('POST', r'^/radar/api/workspaces/(?P<workspace_id>[^/]+)/datasets$', 'create_dataset'),
+        ('GET', r'^/radar/api/datasets/(?P<dataset_id>[^/]+)$', 'retrieve_dataset'),
+        ('PUT', r'^/radar/api/datasets/(?P<dataset_id>[^/]+)$', 'update_dataset'),
+        ('POST', r'^/api/deposit/depositions$', 'create_deposition'),
+        ('PUT', r'^/api/deposit/depositions/(?P<deposition_id>\d+)$', 'update_deposition'),
+        ('PUT', r'^/api/files/(?P<bucket>[^/]+)/(?P<file_name>.+)$', 'upload_file'),
+    ]
+
+    def do_GET(self):
+        self.dispatch('GET')
+
+    def do_POST(self):
+        self.dispatch('POST')
+
+    def do_PUT(self):
+        self.dispatch('PUT')
+
+    def dispatch(self, method):
+        url = urlsplit(self.path)
+        self.query = parse_qs(url.query)
+
+        for route_method, pattern, handler in self.routes:
+            match = re.match(pattern, url.path)
+            if route_method == method and match:
+                with self.server.lock:
+                    self.server.counter[handler] += 1
+
+                time.sleep(self.server.latency)
+
+                if handler not in ['authorize', 'token'] and not self.is_authorized():
+                    self.read_body()
+                    return self.send_json(401, {'error': 'unauthorized'})
+
+                if random.random() < self.server.error_rate:
+                    self.read_body()
+                    with self.server.lock:
+                        self.server.counter['errors'] += 1
+                    return self.send_json(self.server.error_status, {'error': 'injected error',
+                                                                     'exception': 'injected error'})
+
+                return getattr(self, handler)(**match.groupdict())
+
+        self.read_body()
+        self.send_json(404, {'error': 'not found'})
+
+    def is_authorized(self):
+        authorization = self.headers.get('Authorization', '')
+        return authorization.startswith('Bearer ') and authorization[7:] in self.server.tokens
+
+    def authorize(self):
+        # the user is always authorized, and redirected back to the redirect_uri
+        redirect_uri = self.query.get('redirect_uri', [''])[0]
+        state = self.query.get('state', [''])[0]
+
+        self.send_response(302)
+        self.send_header('Location', '{}?{}'.format(redirect_uri, urlencode({'code': 'code', 'state': state})))
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def token(self):
+        self.read_body()
+
+        access_token = uuid.uuid4().hex
+        with self.server.lock:
+            self.server.tokens.add(access_token)
+
+        self.send_json(200, {
+            'access_token': access_token,
+            'refresh_token': uuid.uuid4().hex,
+            'token_type': 'bearer',
+            'expires_in': 3600
+        })
+
+    def list_workspaces(self):
+        page = int(self.query.get('page', ['0'])[0])
+        start = page * self.server.page_size
+        workspaces = self.server.workspaces[start:start + self.server.page_size]
+
+        headers = {}
+        if start + self.server.page_size < len(self.server.workspaces):
+            headers['Link'] = '<{}/radar/api/workspaces?page={}>; rel="next"'.format(self.server.url, page + 1)
+
+        self.send_json(200, {'data': workspaces}, headers)
+
+    def create_dataset(self, workspace_id):
+        data = self.read_json()
+
+        def create():
+            dataset_id = uuid.uuid4().hex
+            self.server.datasets[dataset_id] = data
+            return 201, {'id': dataset_id}
+
+        self.send_created(*self.idempotent(create))
+
+    def retrieve_dataset(self, dataset_id):
+        with self.server.lock:
+            data = self.server.datasets.get(dataset_id)
+
+        if data is None:
+            return self.send_json(404, {'exception': 'dataset not found'})
+
+        self.send_json(200, {
+            'id': dataset_id,
+            'descriptiveMetadata': data.get('descriptiveMetadata')
+        })
+
+    def update_dataset(self, dataset_id):
+        data = self.read_json()
+
+        with self.server.lock:
+            if dataset_id not in self.server.datasets:
+                return self.send_json(404, {'exception': 'dataset not found'})
+            self.server.datasets[dataset_id] = data
+
+        self.send_json(200, {'id': dataset_id})
+
+    def create_deposition(self):
+        data = self.read_json()
+
+        def create():
+            deposition_id = len(self.server.depositions) + 1
+            self.server.depositions[deposition_id] = data
+            return 201, self.get_deposition(deposition_id)
+
+        self.send_created(*self.idempotent(create))
+
+    def update_deposition(self, deposition_id):
+        data = self.read_json()
+
+        with self.server.lock:
+            if int(deposition_id) not in self.server.depositions:
+                return self.send_json(404, {'errors': 'deposition not found'})
+            self.server.depositions[int(deposition_id)] = data
+
+        self.send_json(200, self.get_deposition(int(deposition_id)))
+
+    def upload_file(self, bucket, file_name):
+        size = 0
+        for chunk in self.iter_body():
+            size += len(chunk)
+
+        with self.server.lock:
+            self.server.files['count'] += 1
+            self.server.files['bytes'] += size
+
+        self.send_json(201, {'key': file_name, 'size': size})
+
+    def get_deposition(self, deposition_id):
+        return {
+            'id': deposition_id,
+            'links': {
+                'html': '{}/deposit/{}'.format(self.server.url, deposition_id),
+                'bucket': '{}/api/files/bucket-{}'.format(self.server.url, deposition_id)
+            }
+        }
+
+    def idempotent(self, create):
+        # a POST with a known Idempotency-Key returns the response of the first request,
+        # unless the key is ignored, then every POST with a known key creates a duplicate
+        idempotency_key = self.headers.get('Idempotency-Key')
+
+        with self.server.lock:
+            if idempotency_key and idempotency_key in self.server.idempotency_keys \
+                    and not self.server.ignore_idempotency_key:
+                self.server.counter['idempotent'] += 1
+                return self.server.idempotency_keys[idempotency_key]
+
+            response = create()
+            if idempotency_key:
+                if self.server.created_keys[idempotency_key]:
+                    self.server.counter['duplicates'] += 1
+                self.server.created_keys[idempotency_key] += 1
+                self.server.idempotency_keys[idempotency_key] = response
+            return response
+
+    def send_created(self, status, data):
+        # the resource was created, but the response is lost, e.g. since the request of the client timed out
+        if random.random() < self.server.lost_response_rate:
+            with self.server.lock:
+                self.server.counter['lost_responses'] += 1
+            return self.send_json(504, {'error': 'gateway timeout', 'exception': 'gateway timeout'})
+
+        self.send_json(status, data)
+
+    def iter_body(self, chunk_size=1024 * 1024):
+        length = int(self.headers.get('Content-Length', 0))
+        while length > 0:
+            chunk = self.rfile.read(min(chunk_size, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+    def read_body(self):
+        return b''.join(self.iter_body())
+
+    def read_json(self):
+        body = self.read_body()
+        return json.loads(body) if body else None
+
+    def send_json(self, status, data, headers=None):
+        body = json.dumps(data).encode()
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port=0, latency=0, error_rate=0, error_status=503, **kwargs):
+    return StandInServer(('127.0.0.1', port), latency=latency, error_rate=error_rate,
+                         error_status=error_status, **kwargs).start()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-in server for the RADAR and Zenodo APIs.')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency', type=int, default=0, help='latency of every request in ms')
+    parser.add_argument('--error-rate', type=float, default=0, help='share of the requests which fail')
+    parser.add_argument('--error-status', type=int, default=503, help='status of the failing requests')
+    parser.add_argument('--workspaces', type=int, default=3, help='number of RADAR workspaces')
+    parser.add_argument('--lost-response-rate', type=float, default=0,
+                        help='share of the POST requests which create the resource, but answer with 504')
+    parser.add_argument('--ignore-idempotency-key', action='store_true',
+                        help='create a new resource for every POST, even with a known Idempotency-Key')
+    args = parser.parse_args()
+
+    server = start_server(port=args.port, latency=args.latency / 1000, error_rate=args.error_rate,
+                          error_status=args.error_status, workspaces=args.workspaces,
+                          lost_response_rate=args.lost_response_rate,
+                          ignore_idempotency_key=args.ignore_idempotency_key)
+    print('Serving RADAR and Zenodo at {} (Ctrl+C to stop)'.format(server.url))
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(dict(server.counter))
+        print('{} duplicates created'.format(server.counter['duplicates']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection
+from django.http import HttpResponse
+from rdmo.projects.exports import Export
+
+from ..validators import add_validation_header, render_validation_errors
+from .datacite import DataCiteExport
+from .madmp import MaDMPExport
+from .mixins import PreloadValuesMixin
+from .radar.exports import RadarExport
+
+
+class BundleDataCiteExport(PreloadValuesMixin, DataCiteExport):
+    pass
+
+
+class BundleRadarExport(PreloadValuesMixin, RadarExport):
+    pass
+
+
+class BundleMaDMPExport(PreloadValuesMixin, MaDMPExport):
+    pass
+
+
+class BundleExport(Export):
+
+    # writes the DataCite XML, the RADAR XML and the maDMP JSON of a project into one ZIP file,
+    # the values of the project are loaded with one query and shared by the three exports,
+    # which then build their documents concurrently
+    exports = [
+        ('datacite', BundleDataCiteExport),
+        ('radar', BundleRadarExport),
+        ('madmp', BundleMaDMPExport)
+    ]
+
+    def render(self):
+        response = HttpResponse(content_type='application/zip')
+        response['Content-Disposition'] = 'filename="%s.zip"' % self.project.title
+
+        exports = []
+        values_index = None
+        for directory, export_class in self.exports:
+            export = export_class(self.key, self.label, self.class_name)
+            # the exports are also used without a request, e.g. by management commands
+            export.request = getattr(self, 'request', None)
+            export.project = self.project
+            export.snapshot = self.snapshot
+
+            values_index = export.preload_values(values_index)
+            exports.append((directory, export))
+
+        with ThreadPoolExecutor(max_workers=len(exports)) as executor:
+            results = list(executor.map(self.get_documents, [export for directory, export in exports]))
+
+        # the ZIP file is written by this thread only, with one directory for every format
+        zip_file = zipfile.ZipFile(response, 'w')
+        validation_errors = {}
+        for (directory, export), (documents, errors) in zip(exports, results):
+            for file_name, document in documents:
+                zip_file.writestr('{}/{}'.format(directory, file_name), document)
+
+            validation_errors.update({
+                '{}/{}'.format(directory, file_name): file_errors for file_name, file_errors in errors.items()
+            })
+
+        if validation_errors:
+            zip_file.writestr('validation.txt', render_validation_errors(validation_errors))
+
+        return add_validation_header(response, validation_errors)
+
+    def get_documents(self, export):
+        try:
+            return export.get_documents()
+        finally:
+            # the values are preloaded, but a query in the worker thread would open its own connection
+            connection.close()
@@ -0,0 +1,72 @@
+from urllib.parse import urlsplit
+
+import requests
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+
+from .utils import get_fingerprint
+
+
+class CircuitOpenError(requests.ConnectionError):
+
+    # raised instead of sending a request, the request never reaches the service
+    def __init__(self, url):
+        super().__init__(_('%s is not available at the moment, please try again later.') % urlsplit(url).netloc)
+
+
+class CircuitBreaker(object):
+
+    # counts the failed requests to a host in the cache, so that the state is shared by all processes,
+    # after threshold failures within window seconds the circuit opens and the requests fail right away,
+    # after timeout seconds a single trial request is let through, to check if the service recovered
+    def __init__(self, url, threshold=5, window=60, timeout=30):
+        scheme, netloc = urlsplit(url)[:2]
+        self.cache_key = 'rdmo_plugins.circuit.{}'.format(get_fingerprint([scheme, netloc]))
+        self.threshold = threshold
+        self.window = window
+        self.timeout = timeout
+
+    def allow(self):
+        if not self.threshold:
+            return True
+
+        state = cache.get_many([self.cache_key + '.open', self.cache_key + '.half_open'])
+        if state.get(self.cache_key + '.open'):
+            return False
+        elif state.get(self.cache_key + '.half_open'):
+            # only the first request gets through, the others fail until the trial succeeded
+            return cache.add(self.cache_key + '.trial', True, self.timeout)
+        else:
+            return True
+
+    def success(self):
+        if not self.threshold:
+            return
+
+        state = cache.get_many([self.cache_key + '.half_open', self.cache_key + '.failures'])
+        if state.get(self.cache_key + '.half_open'):
+            cache.delete_many([
+                self.cache_key + '.half_open',
+                self.cache_key + '.trial',
+                self.cache_key + '.failures'
+            ])
+        elif state.get(self.cache_key + '.failures'):
+            # the failures are only counted, while they follow each other
+            cache.delete(self.cache_key + '.failures')
+
+    def failure(self):
+        if not self.threshold:
+            return
+
+        failures_key = self.cache_key + '.failures'
+        cache.add(failures_key, 0, self.window)
+        try:
+            failures = cache.incr(failures_key)
+        except ValueError:
+            # the counter expired in the meantime
+            failures = 1
+
+        if failures >= self.threshold or cache.get(self.cache_key + '.half_open'):
+            cache.set(self.cache_key + '.open', True, self.timeout)
+            cache.set(self.cache_key + '.half_open', True, None)
+            cache.delete_many([self.cache_key + '.trial', failures_key])
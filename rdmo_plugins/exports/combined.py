@@ -0,0 +1,180 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django import forms
+from django.conf import settings
+from django.shortcuts import redirect, render, reverse
+from django.utils.translation import gettext_lazy as _
+
+from rdmo.core.plugins import get_plugin
+from rdmo.projects.exports import Export
+
+from . import publishing
+
+logger = logging.getLogger(__name__)
+
+
+class CombinedExportProvider(Export):
+
+    # pushes the same datasets to several export providers (e.g. RADAR and Zenodo) at once, the providers
+    # use the access tokens from the token store or the session, so they need to be authorized before
+
+    class Form(forms.Form):
+
+        datasets = forms.MultipleChoiceField(label=_('Select one or more datasets of your project'),
+                                             widget=forms.CheckboxSelectMultiple, required=False)
+        sync = forms.BooleanField(label=_('Export only the datasets which changed since the last export'),
+                                  required=False)
+        workspace = forms.CharField(label=_('Select a workspace in RADAR'), required=False)
+
+        def __init__(self, *args, **kwargs):
+            dataset_choices = kwargs.pop('dataset_choices')
+            workspace_choices = kwargs.pop('workspace_choices')
+
+            super().__init__(*args, **kwargs)
+
+            self.fields['datasets'].choices = [(set_index, label) for set_index, label, url in dataset_choices]
+
+            if workspace_choices:
+                self.fields['workspace'].required = True
+                self.fields['workspace'].widget = forms.RadioSelect(choices=workspace_choices)
+            else:
+                del self.fields['workspace']
+
+        def clean(self):
+            cleaned_data = super().clean()
+
+            if cleaned_data.get('sync'):
+                cleaned_data['datasets'] = [str(set_index) for set_index, label in self.fields['datasets'].choices]
+
+            if not cleaned_data.get('datasets'):
+                self.add_error('datasets', _('Please select at least one dataset.'))
+
+            return cleaned_data
+
+    def render(self):
+        targets = self.get_targets()
+
+        form = self.Form(
+            dataset_choices=self.get_dataset_choices(targets),
+            workspace_choices=self.get_workspace_choices(targets)
+        )
+
+        return render(self.request, 'plugins/exports_combined.html', {
+            'form': form,
+            'targets': self.get_target_status(targets)
+        }, status=200)
+
+    def submit(self):
+        targets = self.get_targets()
+        dataset_choices = self.get_dataset_choices(targets)
+
+        form = self.Form(
+            self.request.POST,
+            dataset_choices=dataset_choices,
+            workspace_choices=self.get_workspace_choices(targets)
+        )
+
+        if 'cancel' in self.request.POST:
+            return redirect('project', self.project.id)
+
+        if not form.is_valid():
+            return render(self.request, 'plugins/exports_combined.html', {
+                'form': form,
+                'targets': self.get_target_status(targets)
+            }, status=200)
+
+        set_indexes = [int(set_index) for set_index in form.cleaned_data['datasets']]
+        options = {
+            'workspace': form.cleaned_data.get('workspace'),
+            'sync': form.cleaned_data['sync']
+        }
+
+        results, sends = [], []
+        values_index = None
+        for target in targets:
+            result = {'label': target.label, 'datasets': []}
+            results.append(result)
+
+            access_token = target.get_access_token(self.request)
+            if not access_token:
+                result['error'] = _('RDMO is not authorized for this repository yet, please use this export once:')
+                result['url'] = reverse('project_export', args=[self.project.id, target.key])
+            elif hasattr(target, 'load_workspace_choices') and not options['workspace']:
+                # the workspace field is left out of the form, if the workspaces could not be loaded
+                result['error'] = _('The workspaces could not be loaded from RADAR, please try again later.')
+            elif target.publish_in_background(self.request):
+                publishing.enqueue(publishing.create_job(target, set_indexes, options))
+                result['queued'] = True
+                result['url'] = reverse('project_export', args=[self.project.id, target.key])
+            else:
+                # the values of the project are loaded once and used for the metadata of all targets
+                values_index = target.preload_values(values_index)
+                target.store_in_session(self.request, 'dataset_choices_key', target.get_dataset_choices()[0])
+
+                requests_list, pending = target.prepare_requests(set_indexes, options)
+                sends.append((target, result, access_token, requests_list, pending))
+
+        # the requests to the different targets are sent concurrently
+        def send(args):
+            target, result, access_token, requests_list, pending = args
+            return target.send_requests(access_token, requests_list) if requests_list else []
+
+        with ThreadPoolExecutor(max_workers=max(len(sends), 1)) as executor:
+            responses_list = list(executor.map(send, sends))
+
+        dataset_labels = {set_index: label for set_index, label, url in dataset_choices}
+        for (target, result, access_token, requests_list, pending), responses in zip(sends, responses_list):
+            if responses and all(getattr(response, 'status_code', None) == 401 for response in responses):
+                target.delete_tokens(self.request)
+
+            project_id, result['datasets'] = target.save_results(self.request, [
+                (data, response) for (method, url, data, idempotency_key), response in zip(requests_list, responses)
+            ])
+
+            for set_index in pending:
+                result['datasets'].append({
+                    'title': dataset_labels.get(set_index),
+                    'error': _('The last export of the dataset did not finish yet.')
+                })
+
+        return render(self.request, 'plugins/exports_combined_results.html', {
+            'targets': results,
+            'project_id': self.project.id
+        }, status=200)
+
+    def get_targets(self):
+        targets = []
+        for key in self.provider_settings.get('targets', ['radar', 'zenodo']):
+            target = get_plugin('PROJECT_EXPORTS', key)
+            if target is None:
+                logger.warning('export %s is not configured in PROJECT_EXPORTS', key)
+                continue
+
+            target.request = self.request
+            target.project = self.project
+            target.snapshot = self.snapshot
+            targets.append(target)
+
+        return targets
+
+    def get_dataset_choices(self, targets):
+        return targets[0].get_dataset_choices()[1] if targets else []
+
+    def get_workspace_choices(self, targets):
+        # only RADAR has workspaces, the provider module is not imported here, so that it is only
+        # loaded if RADAR is one of the targets
+        for target in targets:
+            if hasattr(target, 'load_workspace_choices'):
+                return target.load_workspace_choices(self.request)
+
+    def get_target_status(self, targets):
+        return [{
+            'label': target.label,
+            'authorized': bool(target.get_access_token(self.request)),
+            'url': reverse('project_export', args=[self.project.id, target.key])
+        } for target in targets]
+
+    @property
+    def provider_settings(self):
+        return getattr(settings, 'COMBINED_PROVIDER', {})
@@ -1,122 +1,27 @@
+import json
+import os
 import zipfile
 from collections import defaultdict
 
-from django.http import HttpResponse
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from rdmo.core.exports import prettify_xml
 from rdmo.core.renderers import BaseXMLRenderer
 from rdmo.projects.exports import Export
 
+from ..options import OptionMap
+from ..validators import add_validation_header, render_validation_errors, validate_xml
+
 
 class DataCiteExport(Export):
 
-    identifier_type_options = {
-        'identifier_type/doi': 'DOI',
-        'identifier_type/other': 'OTHER'
-    }
-
-    language_options = {
-        'language/en': 'en-US',
-        'language/de': 'de-de'
-    }
-
-    name_type_options = {
-        'name_type/personal': 'Personal',
-        'name_type/organizational': 'Organizational'
-    }
-
-    name_identifier_scheme_options = {
-        'name_identifier_scheme/orcid': 'ORCID',
-        'name_identifier_scheme/insi': 'INSI',
-        'name_identifier_scheme/ror': 'ROR',
-        'name_identifier_scheme/grid': 'GRID'
-    }
-
-    contributor_type_options = {
-        'contributor_type/contact_persion': 'ContactPerson',
-        'contributor_type/data_collector': 'DataCollector',
-        'contributor_type/data_curator': 'DataCurator',
-        'contributor_type/data_manager': 'DataManager',
-        'contributor_type/distributor': 'Distributor',
-        'contributor_type/editor': 'Editor',
-        'contributor_type/hosting_institution': 'HostingInstitution',
-        'contributor_type/producer': 'Producer',
-        'contributor_type/project_leader': 'ProjectLeader',
-        'contributor_type/project_manager': 'ProjectManager',
-        'contributor_type/project_member': 'ProjectMember',
-        'contributor_type/registration_agency': 'RegistrationAgency',
-        'contributor_type/registration_authority': 'RegistrationAuthority',
-        'contributor_type/related_person': 'RelatedPerson',
-        'contributor_type/researcher': 'Researcher',
-        'contributor_type/research_group': 'ResearchGroup',
-        'contributor_type/rights_holder': 'RightsHolder',
-        'contributor_type/sponsor': 'Sponsor',
-        'contributor_type/supervisor': 'Supervisor',
-        'contributor_type/work_package_leader': 'WorkPackageLeader',
-        'contributor_type/other': 'Other'
-    }
-
-    resource_type_general_options = {
-        'resource_type_general/audiovisual': 'Audiovisual',
-        'resource_type_general/collection': 'Collection',
-        'resource_type_general/data_paper': 'DataPaper',
-        'resource_type_general/dataset': 'Dataset',
-        'resource_type_general/event': 'Event',
-        'resource_type_general/image': 'Image',
-        'resource_type_general/interactive_resource': 'InteractiveResource',
-        'resource_type_general/model': 'Model',
-        'resource_type_general/physical_object': 'PhysicalObject',
-        'resource_type_general/service': 'Service',
-        'resource_type_general/software': 'Software',
-        'resource_type_general/sound': 'Sound',
-        'resource_type_general/text': 'Text',
-        'resource_type_general/workflow': 'Workflow',
-        'resource_type_general/other': 'Other'
-    }
-
-    rights_uri_options = {
-        'dataset_license_types/71': 'https://creativecommons.org/licenses/by/4.0/',
-        'dataset_license_types/73': 'https://creativecommons.org/licenses/by-nc/4.0/',
-        'dataset_license_types/74': 'https://creativecommons.org/licenses/by-nd/4.0/',
-        'dataset_license_types/75': 'https://creativecommons.org/licenses/by-sa/4.0/',
-        'dataset_license_types/cc0': 'https://creativecommons.org/publicdomain/zero/1.0/deed.de'
-    }
-
-    relation_type_options = {
-        'relation_type/is_cited_by': 'IsCitedBy',
-        'relation_type/cites': 'Cites',
-        'relation_type/is_supplement_to': 'IsSupplementTo',
-        'relation_type/is_supplemented_by': 'IsSupplementedBy',
-        'relation_type/is_continued_by': 'IsContinuedBy',
-        'relation_type/continues': 'Continues',
-        'relation_type/describes': 'Describes',
-        'relation_type/is_described_by': 'IsDescribedBy',
-        'relation_type/has_metadata': 'HasMetadata',
-        'relation_type/is_metadata_for': 'IsMetadataFor',
-        'relation_type/has_version': 'HasVersion',
-        'relation_type/is_version_of': 'IsVersionOf',
-        'relation_type/is_new_version_of': 'IsNewVersionOf',
-        'relation_type/is_previous_version_of': 'IsPreviousVersionOf',
-        'relation_type/is_part_of': 'IsPartOf',
-        'relation_type/has_part': 'HasPart',
-        'relation_type/is_published_in': 'IsPublishedIn',
-        'relation_type/is_referenced_by': 'IsReferencedBy',
-        'relation_type/references': 'References',
-        'relation_type/is_documented_by': 'IsDocumentedBy',
-        'relation_type/documents': 'Documents',
-        'relation_type/is_compiled_by': 'IsCompiledBy',
-        'relation_type/Compiles': 'Compiles',
-        'relation_type/is_variant_form_of': 'IsVariantFormOf',
-        'relation_type/is_original_form_of': 'IsOriginalFormOf',
-        'relation_type/is_identical_to': 'IsIdenticalTo',
-        'relation_type/is_reviewed_by': 'IsReviewedBy',
-        'relation_type/reviews': 'Reviews',
-        'relation_type/is_derived_from': 'IsDerivedFrom',
-        'relation_type/is_source_of': 'IsSourceOf',
-        'relation_type/is_required_by': 'IsRequiredBy',
-        'relation_type/requires': 'Requires',
-        'relation_type/obsoletes': 'Obsoletes',
-        'relation_type/is_obsoleted_by': 'IsObsoletedBy'
-    }
+    identifier_type_options = OptionMap('identifier_type', 'datacite')
+    language_options = OptionMap('language', 'datacite')
+    name_type_options = OptionMap('name_type', 'datacite')
+    name_identifier_scheme_options = OptionMap('name_identifier_scheme', 'datacite')
+    contributor_type_options = OptionMap('contributor_type', 'datacite')
+    resource_type_general_options = OptionMap('resource_type_general', 'datacite')
+    rights_uri_options = OptionMap('dataset_license_types', 'datacite')
+    relation_type_options = OptionMap('relation_type', 'datacite')
 
     class Renderer(BaseXMLRenderer):
 
@@ -330,154 +235,171 @@ class DataCiteExport(Export):
         response = HttpResponse(content_type='application/zip')
         response['Content-Disposition'] = 'filename="%s.zip"' % self.project.title
 
-        zip_file = zipfile.ZipFile(response, 'w')
-        for dataset in self.get_datasets():
-            xmldata = self.Renderer().render(dataset)
-            zip_file.writestr(dataset.get('file_name'), prettify_xml(xmldata))
-
-        return response
-
-    def get_datasets(self):
-        datasets = []
-        for rdmo_dataset in self.get_set('project/dataset/id'):
-            set_index = rdmo_dataset.set_index
-            dataset = defaultdict(list)
-
-            # file_name
-            dataset['file_name'] = '{}.xml'.format(
-                self.get_text('project/dataset/identifier', set_index=set_index) or
-                self.get_text('project/dataset/id', set_index=set_index) or
-                str(set_index + 1)
-            )
+        documents, validation_errors = self.get_documents()
 
-            # identifier
-            identifier = self.get_text('project/dataset/identifier', set_index=set_index)
-            if identifier:
-                dataset['identifier'] = identifier
-                dataset['identifierType'] = \
-                    self.get_option(self.identifier_type_options, 'project/dataset/identifier_type', set_index=set_index) or \
-                    self.get_option(self.identifier_type_options, 'project/dataset/pids/system', set_index=set_index) or \
-                    'OTHER'
-            else:
-                dataset['identifier'] = self.get_text('project/dataset/id', set_index=set_index)
-                dataset['identifierType'] = 'OTHER'
+        zip_file = zipfile.ZipFile(response, 'w')
+        for file_name, document in documents:
+            zip_file.writestr(file_name, document)
 
-            # creators
-            for creator_set in self.get_set('project/dataset/creator/name', set_prefix=str(set_index)):
-                creator = self.get_name('project/dataset/creator',
-                                        set_prefix=creator_set.set_prefix, set_index=creator_set.set_index)
-                if creator:
-                    dataset['creators'].append(creator)
+        if validation_errors:
+            zip_file.writestr('validation.txt', render_validation_errors(validation_errors))
 
-            # titles
-            dataset['titles'] = [{
-                'title':
-                    self.get_text('project/dataset/title', set_index=set_index) or
-                    self.get_text('project/dataset/id', set_index=set_index) or
-                    'Dataset #{}'.format(set_index + 1)
-            }]
+        return add_validation_header(response, validation_errors)
 
-            # publisher
-            publisher = \
-                self.get_text('project/dataset/publisher', set_index=set_index) or \
-                self.get_text('project/dataset/preservation/repository', set_index=set_index)
-            if publisher:
-                dataset['publisher'] = publisher
-
-            # publication_year
-            dataset['publicationYear'] = self.get_year('project/dataset/data_publication_date', set_index=set_index)
-
-            # subjects
-            subjects = \
-                self.get_values('project/dataset/subject', set_index=set_index) or \
-                self.get_values('project/research_field/title', set_index=set_index)
-            if subjects:
-                dataset['subjects'] = [{
-                    'subject': subject.value
-                } for subject in subjects]
+    def get_documents(self):
+        # returns the (file_name, document) pairs and the validation errors per file_name,
+        # so that the documents can be written into the ZIP of this export or of the BundleExport
+        documents = []
+        validation_errors = {}
+        for dataset in self.get_datasets():
+            xmldata = self.Renderer().render(dataset)
+            documents.append((dataset.get('file_name'), prettify_xml(xmldata)))
 
-            # contributors
-            for contributor_set in self.get_set('project/dataset/contributor/name', set_prefix=str(set_index)):
-                contributor = self.get_name('project/dataset/contributor',
-                                            set_prefix=contributor_set.set_prefix, set_index=contributor_set.set_index)
-                if contributor:
-                    dataset['contributors'].append(contributor)
+            errors = validate_xml('datacite', xmldata)
+            if errors:
+                validation_errors[dataset.get('file_name')] = errors
 
-            # dates
-            dataset['created'] =  \
-                self.get_timestamp('project/dataset/date/created', set_index=set_index)
-            dataset['issued'] =  \
-                self.get_timestamp('project/dataset/date/issued', set_index=set_index) or \
-                self.get_timestamp('project/dataset/data_publication_date', set_index=set_index)
+        return documents, validation_errors
 
-            # language
-            dataset['language'] = self.get_option(self.language_options, 'project/dataset/language', set_index=set_index)
+    def get_datasets(self):
+        return [self.get_dataset(rdmo_dataset.set_index) for rdmo_dataset in self.get_set('project/dataset/id')]
+
+    def get_dataset(self, set_index):
+        dataset = defaultdict(list)
+
+        # file_name
+        dataset['file_name'] = '{}.xml'.format(
+            self.get_text('project/dataset/identifier', set_index=set_index) or
+            self.get_text('project/dataset/id', set_index=set_index) or
+            str(set_index + 1)
+        )
+
+        # identifier
+        identifier = self.get_text('project/dataset/identifier', set_index=set_index)
+        if identifier:
+            dataset['identifier'] = identifier
+            dataset['identifierType'] = \
+                self.get_option(self.identifier_type_options, 'project/dataset/identifier_type', set_index=set_index) or \
+                self.get_option(self.identifier_type_options, 'project/dataset/pids/system', set_index=set_index) or \
+                'OTHER'
+        else:
+            dataset['identifier'] = self.get_text('project/dataset/id', set_index=set_index)
+            dataset['identifierType'] = 'OTHER'
+
+        # creators
+        for creator_set in self.get_set('project/dataset/creator/name', set_prefix=str(set_index)):
+            creator = self.get_name('project/dataset/creator',
+                                    set_prefix=creator_set.set_prefix, set_index=creator_set.set_index)
+            if creator:
+                dataset['creators'].append(creator)
+
+        # titles
+        dataset['titles'] = [{
+            'title':
+                self.get_text('project/dataset/title', set_index=set_index) or
+                self.get_text('project/dataset/id', set_index=set_index) or
+                'Dataset #{}'.format(set_index + 1)
+        }]
+
+        # publisher
+        publisher = \
+            self.get_text('project/dataset/publisher', set_index=set_index) or \
+            self.get_text('project/dataset/preservation/repository', set_index=set_index)
+        if publisher:
+            dataset['publisher'] = publisher
+
+        # publication_year
+        dataset['publicationYear'] = self.get_year('project/dataset/data_publication_date', set_index=set_index)
+
+        # subjects
+        subjects = \
+            self.get_values('project/dataset/subject', set_index=set_index) or \
+            self.get_values('project/research_field/title', set_index=set_index)
+        if subjects:
+            dataset['subjects'] = [{
+                'subject': subject.value
+            } for subject in subjects]
+
+        # contributors
+        for contributor_set in self.get_set('project/dataset/contributor/name', set_prefix=str(set_index)):
+            contributor = self.get_name('project/dataset/contributor',
+                                        set_prefix=contributor_set.set_prefix, set_index=contributor_set.set_index)
+            if contributor:
+                dataset['contributors'].append(contributor)
+
+        # dates
+        dataset['created'] =  \
+            self.get_timestamp('project/dataset/date/created', set_index=set_index)
+        dataset['issued'] =  \
+            self.get_timestamp('project/dataset/date/issued', set_index=set_index) or \
+            self.get_timestamp('project/dataset/data_publication_date', set_index=set_index)
+
+        # language
+        dataset['language'] = self.get_option(self.language_options, 'project/dataset/language', set_index=set_index)
+
+        # resource_type
+        resource_type = self.get_text('project/dataset/resource_type', set_index=set_index)
+        if resource_type:
+            dataset['resourceType'] = resource_type
+            dataset['resourceTypeGeneral'] = \
+                self.get_option(self.resource_type_general_options, 'project/dataset/resource_type_general', set_index=set_index)
+
+        # alternate_identifiers
+        for alternate_identifier_set in self.get_set('project/dataset/alternate_identifier/identifier', set_prefix=str(set_index)):
+            dataset['alternateIdentifiers'].append({
+                'alternateIdentifier': self.get_text('project/dataset/alternate_identifier/identifier',
+                                                     set_prefix=alternate_identifier_set.set_prefix,
+                                                     set_index=alternate_identifier_set.set_index),
+                'alternateIdentifierType': self.get_option(self.identifier_type_options,
+                                                           'project/dataset/alternate_identifier/identifier_type',
+                                                           set_prefix=alternate_identifier_set.set_prefix,
+                                                           set_index=alternate_identifier_set.set_index)
+            })
 
-            # resource_type
-            resource_type = self.get_text('project/dataset/resource_type', set_index=set_index)
-            if resource_type:
-                dataset['resourceType'] = resource_type
-                dataset['resourceTypeGeneral'] = \
-                    self.get_option(self.resource_type_general_options, 'project/dataset/resource_type_general', set_index=set_index)
-
-            # alternate_identifiers
-            for alternate_identifier_set in self.get_set('project/dataset/alternate_identifier/identifier', set_prefix=str(set_index)):
-                dataset['alternateIdentifiers'].append({
-                    'alternateIdentifier': self.get_text('project/dataset/alternate_identifier/identifier',
-                                                         set_prefix=alternate_identifier_set.set_prefix,
-                                                         set_index=alternate_identifier_set.set_index),
-                    'alternateIdentifierType': self.get_option(self.identifier_type_options,
-                                                               'project/dataset/alternate_identifier/identifier_type',
-                                                               set_prefix=alternate_identifier_set.set_prefix,
-                                                               set_index=alternate_identifier_set.set_index)
-                })
+        # related_identifiers
+        for related_identifier_set in self.get_set('project/dataset/related_identifier/identifier', set_prefix=str(set_index)):
+            dataset['relatedIdentifiers'].append({
+                'relatedIdentifier': self.get_text('project/dataset/related_identifier/identifier',
+                                                   set_prefix=related_identifier_set.set_prefix,
+                                                   set_index=related_identifier_set.set_index),
+                'relatedIdentifierType': self.get_option(self.identifier_type_options,
+                                                         'project/dataset/related_identifier/identifier_type',
+                                                         set_prefix=related_identifier_set.set_prefix,
+                                                         set_index=related_identifier_set.set_index),
+                'relationType': self.get_option(self.relation_type_options,
+                                                'project/dataset/related_identifier/relation_type',
+                                                set_prefix=related_identifier_set.set_prefix,
+                                                set_index=related_identifier_set.set_index)
+            })
 
-            # related_identifiers
-            for related_identifier_set in self.get_set('project/dataset/related_identifier/identifier', set_prefix=str(set_index)):
-                dataset['relatedIdentifiers'].append({
-                    'relatedIdentifier': self.get_text('project/dataset/related_identifier/identifier',
-                                                       set_prefix=related_identifier_set.set_prefix,
-                                                       set_index=related_identifier_set.set_index),
-                    'relatedIdentifierType': self.get_option(self.identifier_type_options,
-                                                             'project/dataset/related_identifier/identifier_type',
-                                                             set_prefix=related_identifier_set.set_prefix,
-                                                             set_index=related_identifier_set.set_index),
-                    'relationType': self.get_option(self.relation_type_options,
-                                                    'project/dataset/related_identifier/relation_type',
-                                                    set_prefix=related_identifier_set.set_prefix,
-                                                    set_index=related_identifier_set.set_index)
+        # rights
+        for rights in self.get_values('project/dataset/sharing/conditions', set_index=set_index):
+            if rights.option:
+                dataset['rightsList'].append({
+                    'rights': rights.value,
+                    'rightsURI': self.rights_uri_options.get(rights.option.uri_path)
                 })
 
-            # rights
-            for rights in self.get_values('project/dataset/sharing/conditions', set_index=set_index):
-                if rights.option:
-                    dataset['rightsList'].append({
-                        'rights': rights.value,
-                        'rightsURI': self.rights_uri_options.get(rights.option.path)
-                    })
-
-            # description
-            description = self.get_text('project/dataset/description', set_index=set_index)
-            if description:
-                dataset['descriptions'] = [{
-                    'description': description,
-                    'descriptionType': 'Abstract'
-                }]
-
-            # funding_references
-            for funder in self.get_set('project/funder/id'):
-                dataset['fundingReferences'].append({
-                    'funderName': self.get_text('project/funder/name', set_index=funder.set_index),
-                    'funderIdentifier': self.get_text('project/funder/name_identifier', set_index=funder.set_index),
-                    'funderIdentifierType': self.get_option(self.name_identifier_scheme_options, 'project/funder/name_identifier_scheme', set_index=funder.set_index),
-                    'awardURI': self.get_text('project/funder/programme/url', set_index=funder.set_index),
-                    'awardNumber': self.get_text('project/funder/programme/number', set_index=funder.set_index),
-                    'awardTitle': self.get_text('project/funder/programme/title', set_index=funder.set_index)
-                })
+        # description
+        description = self.get_text('project/dataset/description', set_index=set_index)
+        if description:
+            dataset['descriptions'] = [{
+                'description': description,
+                'descriptionType': 'Abstract'
+            }]
 
-            datasets.append(dataset)
+        # funding_references
+        for funder in self.get_set('project/funder/id'):
+            dataset['fundingReferences'].append({
+                'funderName': self.get_text('project/funder/name', set_index=funder.set_index),
+                'funderIdentifier': self.get_text('project/funder/name_identifier', set_index=funder.set_index),
+                'funderIdentifierType': self.get_option(self.name_identifier_scheme_options, 'project/funder/name_identifier_scheme', set_index=funder.set_index),
+                'awardURI': self.get_text('project/funder/programme/url', set_index=funder.set_index),
+                'awardNumber': self.get_text('project/funder/programme/number', set_index=funder.set_index),
+                'awardTitle': self.get_text('project/funder/programme/title', set_index=funder.set_index)
+            })
 
-        return datasets
+        return dataset
 
     def get_name(self, attribute, set_prefix='', set_index=0):
         name_text = self.get_text(attribute + '/name', set_prefix=set_prefix, set_index=set_index)
@@ -525,3 +447,130 @@ class DataCiteExport(Export):
             return name
         else:
             return None
+
+
+class DataCiteJSONExport(DataCiteExport):
+
+    # exports the datasets in the JSON format of the DataCite REST API, the dataset dicts of the
+    # DataCiteExport are mapped to the attributes directly, without rendering and parsing XML,
+    # a single dataset is exported using ?set_index=<set_index>, otherwise all datasets are streamed
+
+    content_type = 'application/vnd.api+json'
+
+    def render(self):
+        request = getattr(self, 'request', None)
+        set_index = request.GET.get('set_index') if request else None
+
+        if set_index is not None:
+            try:
+                dataset = next(
+                    self.get_dataset(rdmo_dataset.set_index) for rdmo_dataset in self.get_set('project/dataset/id')
+                    if str(rdmo_dataset.set_index) == set_index
+                )
+            except StopIteration:
+                raise Http404
+
+            response = HttpResponse(json.dumps({'data': self.get_data(dataset)}, indent=2),
+                                    content_type=self.content_type)
+            response['Content-Disposition'] = 'filename="%s.json"' % os.path.splitext(dataset['file_name'])[0]
+            return response
+
+        if request is None:
+            # e.g. in the export_projects management command, which needs the content of the response
+            response = HttpResponse(''.join(self.stream_datasets()), content_type=self.content_type)
+        else:
+            response = StreamingHttpResponse(self.stream_datasets(), content_type=self.content_type)
+
+        response['Content-Disposition'] = 'filename="%s.json"' % self.project.title
+        return response
+
+    def stream_datasets(self):
+        # the datasets are computed and serialized one after another, while the response is sent
+        yield '{"data": ['
+        for i, rdmo_dataset in enumerate(self.get_set('project/dataset/id')):
+            if i > 0:
+                yield ','
+            yield json.dumps(self.get_data(self.get_dataset(rdmo_dataset.set_index)))
+        yield ']}'
+
+    def get_data(self, dataset):
+        attributes = {
+            'identifiers': [{
+                'identifier': dataset.get('identifier'),
+                'identifierType': dataset.get('identifierType')
+            }],
+            'creators': [self.get_name_attributes(creator) for creator in dataset.get('creators', [])],
+            'titles': dataset.get('titles'),
+            'publisher': dataset.get('publisher'),
+            'publicationYear': dataset.get('publicationYear'),
+            'subjects': dataset.get('subjects'),
+            'contributors': [
+                dict(self.get_name_attributes(contributor), contributorType=contributor.get('contributorType'))
+                for contributor in dataset.get('contributors', [])
+            ],
+            'dates': [
+                {'date': dataset.get(key), 'dateType': date_type}
+                for key, date_type in [('created', 'Created'), ('issued', 'Issued')] if dataset.get(key)
+            ],
+            'language': dataset.get('language'),
+            'alternateIdentifiers': dataset.get('alternateIdentifiers'),
+            'relatedIdentifiers': dataset.get('relatedIdentifiers'),
+            'rightsList': [{
+                'rights': rights.get('rights'),
+                'rightsUri': rights.get('rightsURI')
+            } for rights in dataset.get('rightsList', [])],
+            'descriptions': dataset.get('descriptions'),
+            'fundingReferences': [{
+                'funderName': funding_reference.get('funderName'),
+                'funderIdentifier': funding_reference.get('funderIdentifier'),
+                'funderIdentifierType': funding_reference.get('funderIdentifierType'),
+                'awardNumber': funding_reference.get('awardNumber'),
+                'awardUri': funding_reference.get('awardURI'),
+                'awardTitle': funding_reference.get('awardTitle')
+            } for funding_reference in dataset.get('fundingReferences', [])],
+            'schemaVersion': 'http://datacite.org/schema/kernel-4'
+        }
+
+        if dataset.get('identifierType') == 'DOI':
+            attributes['doi'] = dataset.get('identifier')
+
+        if dataset.get('resourceType'):
+            attributes['types'] = {
+                'resourceType': dataset.get('resourceType'),
+                'resourceTypeGeneral': dataset.get('resourceTypeGeneral')
+            }
+
+        return {
+            'type': 'dois',
+            'attributes': self.compact(attributes)
+        }
+
+    def get_name_attributes(self, name):
+        attributes = {
+            'name': name.get('name'),
+            'nameType': name.get('nameType'),
+            'givenName': name.get('givenName'),
+            'familyName': name.get('familyName'),
+            'affiliation': [{
+                'name': affiliation.get('affiliation')
+            } for affiliation in name.get('affiliations', [])]
+        }
+
+        if name.get('nameIdentifier'):
+            attributes['nameIdentifiers'] = [{
+                'nameIdentifier': name.get('nameIdentifier'),
+                'nameIdentifierScheme': name.get('nameIdentifierScheme'),
+                'schemeUri': self.Renderer.scheme_uri.get(name.get('nameIdentifierScheme'))
+            }]
+
+        return attributes
+
+    def compact(self, data):
+        # empty values are left out, like the empty elements and attributes in the XML
+        if isinstance(data, dict):
+            data = {key: self.compact(value) for key, value in data.items()}
+            return {key: value for key, value in data.items() if value not in [None, '', [], {}]}
+        elif isinstance(data, list):
+            return [item for item in (self.compact(item) for item in data) if item not in [None, '', [], {}]]
+        else:
+            return data
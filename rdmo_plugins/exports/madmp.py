@@ -4,6 +4,9 @@ from collections import defaultdict
 from django.http import HttpResponse
 from rdmo.projects.exports import Export
 
+from ..options import OptionMap
+from ..validators import add_validation_header, validate_json
+
 
 class MaDMPExport(Export):
 
@@ -27,98 +30,16 @@ class MaDMPExport(Export):
         "ZMW", "ZWD"
     ]
 
-    language_options = {
-        # '': 'eng',
-        # '': 'deu'
-    }
-
-    data_access_options = {
-        'dataset_sharing_options/69': 'open',
-        'dataset_sharing_options/68': 'shared',
-        'dataset_sharing_options/67': 'shared',
-        'dataset_sharing_options/70': 'closed'
-    }
-
-    certified_with_options = {
-        # '': 'din31644',
-        # '': 'dini-zertifikat',
-        # '': 'dsa',
-        # '': 'iso16363',
-        # '': 'iso16919',
-        # '': 'trac',
-        # '': 'wds',
-        # '': 'coretrustseal'
-    }
-
-    pid_system_options = {
-        'pid_types/124': 'ark',
-        # '': 'arxiv',
-        # '': 'bibcode',
-        'pid_types/123': 'doi',
-        # '': 'ean13',
-        # '': 'eissn',
-        # '': 'handle',
-        # '': 'igsn',
-        # '': 'isbn',
-        # '': 'issn',
-        # '': 'istc',
-        # '': 'lissn',
-        # '': 'lsid',
-        # '': 'pmid',
-        'pid_types/122': 'purl',
-        # '': 'upc',
-        # '': 'url',
-        'pid_types/120': 'urn',
-        'pid_types/154': 'other',
-        'pid_types/121': 'other'
-    }
-
-    license_ref_options = {
-        'dataset_license_types/71': 'https://creativecommons.org/licenses/by/4.0/',
-        'dataset_license_types/73': 'https://creativecommons.org/licenses/by-nc/4.0/',
-        'dataset_license_types/74': 'https://creativecommons.org/licenses/by-nd/4.0/',
-        'dataset_license_types/75': 'https://creativecommons.org/licenses/by-sa/4.0/',
-        'dataset_license_types/cc0': 'https://creativecommons.org/publicdomain/zero/1.0/deed.de'
-    }
-
-    person_id_type_options = {
-        # '': 'orcid',
-        # '': 'isni',
-        # '': 'openid',
-        # '': 'other'
-    }
-
-    dataset_id_type_options = {
-        # '': 'handle',
-        # '': 'doi',
-        # '': 'ark',
-        # '': 'url',
-        # '': 'other'
-    }
-
-    dmp_id_type_options = {
-        # '': 'handle',
-        # '': 'doi',
-        # '': 'ark',
-        # '': 'url',
-        # '': 'other'
-    }
-
-    funder_id_type_options = {
-        # '': 'fundref',
-        # '': 'url',
-        # '': 'other'
-    }
-
-    grant_id_type_options = {
-        # '': 'url',
-        # '': 'other'
-    }
-
-    metadata_standard_id_options = {
-        # '': 'url',
-        # '': 'other'
-    }
+    # the codes of the options are defined in options.json, the repositories of certified_with
+    # (e.g. 'coretrustseal') have no options in RDMO yet, so the option set is empty for now
+    language_options = OptionMap('language', 'madmp')
+    data_access_options = OptionMap('dataset_sharing_options', 'madmp')
+    certified_with_options = OptionMap('certified_with', 'madmp')
+    pid_system_options = OptionMap('pid_types', 'madmp')
+    license_ref_options = OptionMap('dataset_license_types', 'madmp')
+    person_id_type_options = OptionMap('name_identifier_scheme', 'madmp')
+    dataset_id_type_options = OptionMap('identifier_type', 'madmp')
+    dmp_id_type_options = OptionMap('identifier_type', 'madmp')
 
     yes_no_unknown = {
         True: 'yes',
@@ -127,11 +48,25 @@ class MaDMPExport(Export):
     }
 
     def render(self):
-        response = HttpResponse(json.dumps({
+        # an invalid maDMP is exported anyway, the violations are flagged in a header, like for the ZIP exports
+        # (DataCite, RADAR and the bundle), which also contain them in a validation.txt
+        documents, validation_errors = self.get_documents()
+        file_name, document = documents[0]
+
+        response = HttpResponse(document, content_type='application/json')
+        response['Content-Disposition'] = 'filename="%s"' % file_name
+        return add_validation_header(response, validation_errors)
+
+    def get_documents(self):
+        # returns the maDMP as (file_name, document) pair and the validation errors, like the XML exports
+        data = {
             'dmp': self.get_dmp()
-        }, indent=2), content_type='application/json')
-        response['Content-Disposition'] = 'filename="%s.json"' % self.project.title
-        return response
+        }
+
+        file_name = '%s.json' % self.project.title
+        errors = validate_json('madmp', data)
+
+        return [(file_name, json.dumps(data, indent=2))], {file_name: errors} if errors else {}
 
     def get_dmp(self):
         # dmp/title, dmp/created, dmp/modified, dmp/language
@@ -204,7 +139,7 @@ class MaDMPExport(Export):
         if dmp_id:
             contributor['dmp_id'] = {
                 'identifier': dmp_id,
-                'type': self.get_option(self.dmp_id_type_option, 'project/dmp/identifier_type', default='other')
+                'type': self.get_option(self.dmp_id_type_options, 'project/dmp/identifier_type', default='other')
             }
 
         # dmp/dataset/ethical_issues_description
@@ -337,12 +272,12 @@ class MaDMPExport(Export):
         distribution_after['data_access'] = 'open' if (distribution_during.get('data_access') == 'open') else 'closed'
 
         # dmp/dataset/distribution/certified_with
-        certified_with = self.get_option(self.certified_with_options, 'project/dataset/preservation/certification', dataset.set_index)
+        certified_with = self.get_option(self.certified_with_options, 'project/dataset/preservation/certification', set_index=dataset.set_index)
         if certified_with:
             distribution_after['certified_with'] = certified_with
 
         # dmp/dataset/distribution/pid_system
-        pid_system = self.get_option(self.pid_system_options, 'project/dataset/pids/system', dataset.set_index)
+        pid_system = self.get_option(self.pid_system_options, 'project/dataset/pids/system', set_index=dataset.set_index)
         if pid_system:
             distribution_after['pid_system'] = pid_system
 
@@ -354,7 +289,7 @@ class MaDMPExport(Export):
             }
 
         # dmp/dataset/distribution/license_ref
-        license_ref = self.get_option(self.license_ref_options, 'project/dataset/sharing/conditions', dataset.set_index)
+        license_ref = self.get_option(self.license_ref_options, 'project/dataset/sharing/conditions', set_index=dataset.set_index)
         if license_ref:
             license = {
                 'license_ref': license_ref
@@ -383,7 +318,7 @@ class MaDMPExport(Export):
             dmp_dataset['keyword'] = keywords
 
         # dmp/dataset/language
-        language = self.get_option(self.language_options, 'project/dataset/language', dataset.set_index)
+        language = self.get_option(self.language_options, 'project/dataset/language', set_index=dataset.set_index)
         if language:
             dmp_dataset['language'] = language
 
@@ -0,0 +1,580 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.shortcuts import redirect, render
+from django.utils.translation import gettext_lazy as _
+
+from rdmo.domain.models import Attribute
+from rdmo.projects.models import Project, Value
+from rdmo.services.providers import OauthProviderMixin
+
+from . import publishing
+from .circuits import CircuitBreaker, CircuitOpenError
+from .utils import (Fernet, cache_is_shared, decrypt, encrypt, get_fingerprint, get_idempotency_key,
+                    get_payload_hash, get_rate_limiter, get_session)
+
+logger = logging.getLogger(__name__)
+
+# the attributes which are used by the providers (e.g. project/dataset/radar_id) are cached per process,
+# the cache is cleared, when an attribute is saved or deleted
+_attributes = {}
+_attributes_lock = threading.Lock()
+
+
+def get_attributes(paths):
+    with _attributes_lock:
+        attributes = {path: _attributes[path] for path in paths if path in _attributes}
+
+    missing_paths = [path for path in paths if path not in attributes]
+    if missing_paths:
+        # attributes which do not exist are not cached, so that they are found once they are imported
+        missing_attributes = {
+            attribute.path: attribute for attribute in Attribute.objects.filter(path__in=missing_paths)
+        }
+        with _attributes_lock:
+            _attributes.update(missing_attributes)
+        attributes.update(missing_attributes)
+
+    return attributes
+
+
+@receiver(post_save, sender=Attribute)
+@receiver(post_delete, sender=Attribute)
+def clear_attributes(sender, **kwargs):
+    with _attributes_lock:
+        _attributes.clear()
+
+
+class PreloadValuesMixin(object):
+
+    # after preload_values, get_set and get_values are answered from the values of the project, which
+    # were loaded with one query, the loaded values can be shared between several exports of a project
+    values_index = None
+
+    def preload_values(self, values_index=None):
+        if values_index is None:
+            values_index = defaultdict(list)
+
+            values = self.project.values.filter(snapshot=self.snapshot) \
+                                        .select_related('attribute', 'option') \
+                                        .order_by('set_index', 'collection_index')
+            for value in values:
+                if value.attribute is not None:
+                    values_index[(value.attribute.path, value.set_prefix)].append(value)
+                    values_index[(value.attribute.path, value.set_prefix, value.set_index)].append(value)
+
+        self.values_index = values_index
+        return values_index
+
+    def get_set(self, path, set_prefix=''):
+        if self.values_index is None:
+            return super().get_set(path, set_prefix=set_prefix)
+
+        return self.values_index.get((path, set_prefix), [])
+
+    def get_values(self, path, set_prefix='', set_index=0):
+        if self.values_index is None:
+            return super().get_values(path, set_prefix=set_prefix, set_index=set_index)
+
+        return self.values_index.get((path, set_prefix, set_index), [])
+
+
+class OauthSessionProviderMixin(OauthProviderMixin):
+
+    # the get and post methods of the OauthProviderMixin are overridden to use a pooled
+    # session per host and the timeouts from the settings of the provider (e.g. RADAR_PROVIDER)
+
+    # the attribute which holds the url of an exported dataset, shown next to the dataset in the form
+    dataset_url_path = None
+
+    @property
+    def provider_settings(self):
+        raise NotImplementedError
+
+    @property
+    def timeout(self):
+        return (
+            self.provider_settings.get('connect_timeout', 5),
+            self.provider_settings.get('read_timeout', 30)
+        )
+
+    def get_session(self, url):
+        return get_session(
+            url,
+            pool_size=self.provider_settings.get('pool_size', 10),
+            retries=self.provider_settings.get('retries', 3),
+            backoff_factor=self.provider_settings.get('backoff_factor', 0.5)
+        )
+
+    def get(self, request, url):
+        return self.send(request, 'get', url)
+
+    def post(self, request, url, data):
+        return self.send(request, 'post', url, data)
+
+    def put(self, request, url, data):
+        return self.send(request, 'put', url, data)
+
+    def send(self, request, method, url, data=None):
+        # get access token from the token store or the session
+        access_token = self.get_access_token(request)
+        if access_token:
+            # if the access_token is available send the request to the upstream service
+            logger.debug('%s: %s %s', method, url, data)
+
+            try:
+                response = self.send_request(method, url, json=data,
+                                             headers=self.get_request_headers(access_token, method, url, data))
+            except requests.RequestException as e:
+                return self.render_request_error(request, method, url, e)
+
+            if response.status_code == 401:
+                logger.warning('%s forbidden: %s (%s)', method, response.content, response.status_code)
+                self.delete_tokens(request)
+            else:
+                try:
+                    response.raise_for_status()
+                    return getattr(self, '{}_success'.format(method))(request, response)
+
+                except requests.HTTPError:
+                    logger.warning('%s error: %s (%s)', method, response.content, response.status_code)
+
+                    return render(request, 'core/error.html', {
+                        'title': _('OAuth error'),
+                        'errors': [_('Something went wrong: %s') % self.get_error_message(response)]
+                    }, status=200)
+
+        # if the above did not work authorize first
+        self.store_in_session(request, 'request', (method, url, data))
+        return self.authorize(request)
+
+    def send_many(self, request, requests_list, resend, success='post_many_success'):
+        # send several (method, url, data, idempotency_key) requests concurrently and pass the results
+        # to the success method, the idempotency_key can be None, see get_request_headers,
+        # resend is the (name, args) of the method of the provider, which prepared the requests
+        access_token = self.get_access_token(request)
+        if access_token:
+            responses = self.send_requests(access_token, requests_list)
+
+            if not all(getattr(response, 'status_code', None) == 401 for response in responses):
+                return getattr(self, success)(request, [
+                    (data, response) for (method, url, data, idempotency_key), response
+                    in zip(requests_list, responses)
+                ])
+
+            self.delete_tokens(request)
+
+        # if the above did not work authorize first, the payloads are not stored in the session, but only
+        # the project and the method which prepared the requests, the callback calls it again to send them
+        self.release_requests(request)
+        name, args = resend
+        self.store_in_session(request, 'request', ('many', None, {
+            'project_id': self.project.id,
+            'name': name,
+            'args': args
+        }))
+        return self.authorize(request)
+
+    def resend_many(self, request, stored_request):
+        # the provider is created by the callback view, so the project and the request need to be set,
+        # before the requests are prepared again
+        try:
+            self.project = Project.objects.filter_user(request.user).get(pk=stored_request['project_id'])
+        except Project.DoesNotExist:
+            return render(request, 'core/error.html', {
+                'title': _('OAuth authorization successful'),
+                'errors': [_('But the project could not be found.')]
+            }, status=200)
+
+        self.snapshot = None
+        self.request = request
+        return getattr(self, stored_request['name'])(*stored_request['args'])
+
+    def send_datasets(self, set_indexes, options):
+        # prepares the requests for the datasets and sends them, this is called again by the callback,
+        # if the user needs to authorize first
+        requests_list, pending = self.prepare_requests(set_indexes, options)
+
+        if pending:
+            self.release_requests(self.request)
+            return self.render_pending(pending)
+
+        # all datasets, also a single one, are sent by send_many and handled by post_many_success
+        if requests_list:
+            return self.send_many(self.request, requests_list, ('send_datasets', [set_indexes, options]))
+        else:
+            return self.post_many_success(self.request, [])
+
+    def send_requests(self, access_token, requests_list):
+        # uses a bounded pool of threads and the rate limit of the provider, exceptions are returned
+        # in place of the response, so that the other requests are still sent
+        def send(args):
+            method, url, data, idempotency_key = args
+            headers = self.get_request_headers(access_token, method, url, data, idempotency_key)
+            rate_limiter = get_rate_limiter(url, self.provider_settings.get('rate_limit', 5))
+
+            logger.debug('%s: %s %s', method, url, data)
+            try:
+                return self.send_request(method, url, json=data, headers=headers, rate_limiter=rate_limiter)
+            except requests.RequestException as e:
+                logger.warning('%s failed: %s (%s)', method, url, e)
+                return e
+
+        with ThreadPoolExecutor(max_workers=self.provider_settings.get('max_workers', 4)) as executor:
+            return list(executor.map(send, requests_list))
+
+    def send_request(self, method, url, session=None, rate_limiter=None, **kwargs):
+        # all requests to the services (including the token requests) go through the circuit breaker
+        # of the host, CircuitOpenError is raised right away while the circuit is open
+        circuit_breaker = self.get_circuit_breaker(url)
+        if not circuit_breaker.allow():
+            raise CircuitOpenError(url)
+
+        if rate_limiter is not None:
+            rate_limiter.wait()
+
+        kwargs.setdefault('timeout', self.timeout)
+        try:
+            response = (session or self.get_session(url)).request(method, url, **kwargs)
+        except requests.RequestException:
+            circuit_breaker.failure()
+            raise
+
+        self.record_response(circuit_breaker, response)
+        return response
+
+    def is_retriable(self, response):
+        # connection errors, timeouts and errors of an overloaded service can be retried later
+        return isinstance(response, Exception) or response.status_code in [429, 500, 502, 503, 504]
+
+    def get_circuit_breaker(self, url):
+        return CircuitBreaker(
+            url,
+            threshold=self.provider_settings.get('circuit_threshold', 5),
+            window=self.provider_settings.get('circuit_window', 60),
+            timeout=self.provider_settings.get('circuit_timeout', 30)
+        )
+
+    def record_response(self, circuit_breaker, response):
+        # other errors than the retriable ones (e.g. an invalid dataset) mean that the service is up
+        if self.is_retriable(response):
+            circuit_breaker.failure()
+        else:
+            circuit_breaker.success()
+
+    def publish_in_background(self, request):
+        if not self.provider_settings.get('background', False):
+            return False
+
+        # the status of the jobs is stored in the cache, which needs to be shared between the processes
+        if not cache_is_shared():
+            logger.warning('%s: background is ignored, since no shared cache is configured in CACHES', self.key)
+            return False
+
+        # the worker has no access to the session, so an access token needs to be in the token store
+        return self.token_store_enabled and self.get_tokens(self.get_tokens_cache_key(request)) is not None
+
+    def enqueue_publishing(self, set_indexes, options):
+        publishing.enqueue(publishing.create_job(self, set_indexes, options))
+        return redirect('project_export', self.project.id, self.key)
+
+    def publish(self, set_indexes, options):
+        # called by the worker in rdmo_plugins.exports.publishing, with self.request being a JobRequest,
+        # returns the list of datasets, datasets which failed temporarily are marked with retry
+        access_token = self.get_access_token(self.request)
+        if not access_token:
+            raise publishing.PublishingError(_('The authorization expired, please export the datasets again.'))
+
+        dataset_choices_key, dataset_choices = self.get_dataset_choices()
+        self.store_in_session(self.request, 'dataset_choices_key', dataset_choices_key)
+
+        requests_list, pending = self.prepare_requests(set_indexes, options)
+
+        results = []
+        if requests_list:
+            responses = self.send_requests(access_token, requests_list)
+            results = [(data, response) for (method, url, data, idempotency_key), response
+                       in zip(requests_list, responses)]
+
+        project_id, datasets = self.save_results(self.request, results)
+
+        if pending:
+            dataset_labels = {set_index: label for set_index, label, url in dataset_choices}
+            for set_index in pending:
+                datasets.append({
+                    'set_index': set_index,
+                    'title': dataset_labels.get(set_index),
+                    'error': _('The last export of the dataset did not finish yet.'),
+                    'retry': True
+                })
+
+        return datasets
+
+    def prepare_requests(self, set_indexes, options):
+        # returns the list of (method, url, data, idempotency_key) requests for the datasets and a list
+        # of datasets which can not be sent right now, the data needed by save_results is stored in the session
+        raise NotImplementedError
+
+    def release_requests(self, request):
+        # called when the requests from prepare_requests are not sent, removes the data from the session
+        raise NotImplementedError
+
+    def render_pending(self, pending):
+        # renders the error for the datasets which can not be sent right now
+        raise NotImplementedError
+
+    def save_results(self, request, results):
+        # saves the results of the requests from prepare_requests and returns the project_id
+        # and a list of dicts (title, url, error, ...) for each dataset
+        raise NotImplementedError
+
+    def callback(self, request):
+        # same as OauthProviderMixin.callback, but using the pooled session,
+        # and put requests and lists of requests can be repeated after the authorization
+        if request.GET.get('state') != self.pop_from_session(request, 'state'):
+            return render(request, 'core/error.html', {
+                'title': _('OAuth authorization not successful'),
+                'errors': [_('State parameter did not match.')]
+            }, status=200)
+
+        url = self.token_url + '?' + urlencode(self.get_callback_params(request))
+
+        try:
+            response = self.send_request('post', url, data=self.get_callback_data(request),
+                                         auth=self.get_callback_auth(request),
+                                         headers=self.get_callback_headers(request))
+        except requests.RequestException as e:
+            return self.render_request_error(request, 'post', self.token_url, e)
+
+        try:
+            response.raise_for_status()
+        except requests.HTTPError as e:
+            logger.error('callback error: %s (%s)', response.content, response.status_code)
+            raise e
+
+        response_data = response.json()
+
+        # store access token in session, and the access and refresh tokens in the token store
+        self.store_in_session(request, 'access_token', response_data.get('access_token'))
+        self.store_tokens(self.get_tokens_cache_key(request), response_data)
+
+        # get the request from the session and send it again
+        stored_request = self.pop_from_session(request, 'request')
+        if stored_request:
+            method, url, data = stored_request
+            if method == 'many':
+                return self.resend_many(request, data)
+            elif method in ['get', 'post', 'put']:
+                return self.send(request, method, url, data)
+
+        return render(request, 'core/error.html', {
+            'title': _('OAuth authorization successful'),
+            'errors': [_('But no redirect could be found.')]
+        }, status=200)
+
+    @property
+    def token_store_enabled(self):
+        return Fernet is not None and self.provider_settings.get('store_tokens', True)
+
+    @property
+    def token_secret(self):
+        return 'rdmo_plugins.tokens:' + getattr(settings, 'PLUGINS_TOKEN_SECRET', settings.SECRET_KEY)
+
+    def get_tokens_cache_key(self, request):
+        # the tokens are stored per user, provider and token_url
+        return 'rdmo_plugins.tokens.{}.{}'.format(
+            get_fingerprint([self.class_name, self.key, self.token_url]), request.user.pk
+        )
+
+    def get_access_token(self, request):
+        # the access and refresh tokens of the user are stored encrypted in the cache, so that they can be
+        # used for several exports without the authorization, the access token is refreshed shortly before
+        # it expires, if the token store is not available the access token is taken from the session
+        if self.token_store_enabled:
+            cache_key = self.get_tokens_cache_key(request)
+            tokens = self.get_tokens(cache_key)
+            if tokens:
+                expires_in = tokens['expires_at'] - time.time() if tokens.get('expires_at') else None
+
+                if expires_in is None or expires_in > self.provider_settings.get('token_refresh_margin', 300):
+                    return tokens['access_token']
+
+                elif tokens.get('refresh_token'):
+                    if expires_in > 0:
+                        # the access token is still valid, so it is used while it is refreshed in the background
+                        if cache.add(cache_key + '.refresh', True, self.timeout[1]):
+                            threading.Thread(target=self.refresh_tokens, args=(cache_key, tokens),
+                                             daemon=True).start()
+                        return tokens['access_token']
+                    else:
+                        tokens = self.refresh_tokens(cache_key, tokens)
+                        if tokens:
+                            return tokens['access_token']
+
+        return self.get_from_session(request, 'access_token')
+
+    def get_tokens(self, cache_key):
+        token = cache.get(cache_key)
+        return decrypt(token, self.token_secret) if token else None
+
+    def store_tokens(self, cache_key, response_data):
+        if not self.token_store_enabled or not response_data.get('access_token'):
+            return None
+
+        tokens = {
+            'access_token': response_data['access_token'],
+            'refresh_token': response_data.get('refresh_token'),
+            'expires_at': time.time() + response_data['expires_in'] if response_data.get('expires_in') else None
+        }
+
+        # without a refresh token, the tokens are kept only as long as the access token is valid
+        if tokens['refresh_token']:
+            timeout = self.provider_settings.get('token_timeout', 30 * 24 * 60 * 60)
+        else:
+            timeout = response_data.get('expires_in')
+
+        cache.set(cache_key, encrypt(tokens, self.token_secret), timeout)
+        return tokens
+
+    def refresh_tokens(self, cache_key, tokens):
+        url = self.token_url + '?' + urlencode(self.get_refresh_params(tokens['refresh_token']))
+
+        try:
+            response = self.send_request('post', url, data=self.get_refresh_data(tokens['refresh_token']),
+                                         auth=self.get_callback_auth(None),
+                                         headers=self.get_callback_headers(None))
+            response.raise_for_status()
+        except requests.RequestException as e:
+            # the user needs to authorize again, once the access token expired
+            logger.warning('refresh failed: %s (%s)', self.token_url, e)
+            return None
+        finally:
+            cache.delete(cache_key + '.refresh')
+
+        response_data = response.json()
+        if not response_data.get('refresh_token'):
+            # some services issue a new refresh token only once in a while
+            response_data['refresh_token'] = tokens['refresh_token']
+
+        return self.store_tokens(cache_key, response_data)
+
+    def delete_tokens(self, request):
+        self.pop_from_session(request, 'access_token')
+        cache.delete(self.get_tokens_cache_key(request))
+
+    def get_refresh_params(self, refresh_token):
+        return {}
+
+    def get_refresh_data(self, refresh_token):
+        return {}
+
+    def put_success(self, request, response):
+        raise NotImplementedError
+
+    def post_many_success(self, request, results):
+        raise NotImplementedError
+
+    def get_request_headers(self, access_token, method, url, data, idempotency_key=None):
+        headers = self.get_authorization_headers(access_token)
+
+        if method == 'post':
+            # the key is the same when the request is sent again (e.g. after the authorization or a timeout),
+            # so that services which support it will not create a second resource, if no key was computed
+            # by prepare_requests, it is derived from the url and the payload hash, which leaves out values
+            # that change with every export (e.g. the dates in the technical metadata of RADAR)
+            headers['Idempotency-Key'] = idempotency_key or get_idempotency_key(url, self.get_payload_hash(data))
+
+        return headers
+
+    def get_payload_hash(self, data):
+        return get_payload_hash(data)
+
+    def get_dataset_choices(self):
+        # returns the datasets of the project as (set_index, label, url) tuples, where url is the text
+        # of dataset_url_path (e.g. project/dataset/radar_url) for the dataset, the list is kept in the cache
+        # using a fingerprint of the dataset values, so that it is only built again if they change
+        paths = ['project/dataset/id'] + ([self.dataset_url_path] if self.dataset_url_path else [])
+        values = self.project.values.filter(snapshot=self.snapshot, set_prefix='', attribute__path__in=paths)
+
+        fingerprint = values.aggregate(count=Count('id'), updated=Max('updated'))
+        cache_key = 'rdmo_plugins.dataset_choices.{}.{}'.format(self.project.id, get_fingerprint([
+            paths, fingerprint['count'], fingerprint['updated'].isoformat() if fingerprint['updated'] else None
+        ]))
+
+        dataset_choices = cache.get(cache_key)
+        if dataset_choices is None:
+            labels, urls = {}, {}
+            for value in values.select_related('attribute', 'option').order_by('set_index', 'collection_index'):
+                if value.attribute.path == 'project/dataset/id':
+                    labels.setdefault(value.set_index, value.value)
+                else:
+                    urls.setdefault(value.set_index, value.text or None)
+
+            dataset_choices = [(set_index, label, urls.get(set_index)) for set_index, label in labels.items()]
+            cache.set(cache_key, dataset_choices, self.provider_settings.get('dataset_choices_timeout', 3600))
+
+        return cache_key, dataset_choices
+
+    def get_cached_dataset_choices(self, request):
+        # only the cache key is stored in the session, the list is empty if it was evicted from the cache
+        cache_key = self.get_from_session(request, 'dataset_choices_key')
+        return (cache.get(cache_key) if cache_key else None) or []
+
+    def save_dataset_values(self, project_id, dataset_values):
+        # dataset_values maps the set_index of a dataset to a dict of attribute paths and texts,
+        # e.g. {0: {'project/dataset/radar_id': '...'}}, the current values are loaded with one query,
+        # but every value is saved on its own, so that the signals of the values (e.g. of the
+        # project updated handlers) are sent, the values are only saved if the text changed
+        attributes = get_attributes({path for texts in dataset_values.values() for path in texts})
+        if not attributes:
+            return
+
+        with transaction.atomic():
+            values = Value.objects.filter(
+                project_id=project_id,
+                snapshot=None,
+                set_prefix='',
+                set_index__in=dataset_values.keys(),
+                attribute__in=attributes.values()
+            )
+            values = {(value.attribute_id, value.set_index): value for value in values}
+
+            for set_index, texts in dataset_values.items():
+                for path, text in texts.items():
+                    attribute = attributes.get(path)
+                    if attribute is None:
+                        continue
+
+                    value = values.get((attribute.id, set_index))
+                    if value is None:
+                        value = Value(project_id=project_id, attribute=attribute, set_index=set_index)
+                    elif value.text == text:
+                        continue
+
+                    value.text = text
+                    value.save()
+
+    def render_request_error(self, request, method, url, exception):
+        logger.warning('%s failed: %s (%s)', method, url, exception)
+
+        if isinstance(exception, CircuitOpenError):
+            return render(request, 'core/error.html', {
+                'title': _('Service unavailable'),
+                'errors': [str(exception)]
+            }, status=200)
+
+        return render(request, 'core/error.html', {
+            'title': _('Connection error'),
+            'errors': [_('The service could not be reached: %s') % exception]
+        }, status=200)
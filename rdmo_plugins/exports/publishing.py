@@ -0,0 +1,194 @@
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Min
+from django.utils.timezone import now
+
+from rdmo.core.plugins import get_plugin
+
+from ..models import PublishingJob
+
+logger = logging.getLogger(__name__)
+
+# the datasets are pushed to RADAR or Zenodo by a worker thread, so that the web request only enqueues the job,
+# the jobs are stored in the database and claimed by the worker of one of the processes, so they are not lost,
+# when a process is restarted, the worker uses the tokens from the token store, which needs a shared cache,
+# since the job can be run by another process than the one which received the request
+
+QUEUED = PublishingJob.QUEUED
+RUNNING = PublishingJob.RUNNING
+SENT = PublishingJob.SENT
+FAILED = PublishingJob.FAILED
+
+_worker = None
+_worker_lock = threading.Lock()
+_wakeup = threading.Event()
+
+
+class PublishingError(Exception):
+    pass
+
+
+class JobRequest(object):
+
+    # stands in for the request of the user, when a provider is used by the worker
+    def __init__(self, user, language_code):
+        self.user = user
+        self.LANGUAGE_CODE = language_code
+        self.session = {}
+
+
+def get_jobs_settings():
+    return {
+        'poll_interval': 5,                   # seconds between the checks for jobs, which are queued by other processes
+        'job_timeout': 3600,                  # seconds after which a running job, which is not updated, has failed
+        'job_retention': 7 * 24 * 60 * 60,    # seconds the finished jobs are kept
+        **getattr(settings, 'PLUGINS_JOBS', {})
+    }
+
+
+def create_job(provider, set_indexes, options):
+    return PublishingJob(
+        provider_key=provider.key,
+        project=provider.project,
+        user=provider.request.user,
+        language_code=provider.request.LANGUAGE_CODE,
+        set_indexes=set_indexes,
+        options=options
+    )
+
+
+def get_jobs(provider_key, project_id, max_jobs=20):
+    jobs = list(PublishingJob.objects.filter(provider_key=provider_key, project_id=project_id)[:max_jobs])
+
+    # the jobs, which were queued before a restart, are picked up, once the export page is shown again
+    if any(job.status == QUEUED for job in jobs):
+        start_worker()
+
+    return jobs
+
+
+def enqueue(job, delay=0):
+    job.next_attempt = now() + timedelta(seconds=delay)
+    update_job(job, QUEUED)
+
+    start_worker()
+    _wakeup.set()
+
+
+def start_worker():
+    global _worker
+
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=run_worker, name='rdmo_plugins.publishing', daemon=True)
+            _worker.start()
+
+
+def run_worker():
+    global _worker
+
+    jobs_settings = get_jobs_settings()
+    try:
+        recover_jobs(jobs_settings)
+    finally:
+        close_old_connections()
+
+    while True:
+        _wakeup.clear()
+
+        try:
+            job = claim_job()
+            if job is not None:
+                try:
+                    run_job(job)
+                except Exception as e:
+                    logger.exception('publishing failed: %s', job.id)
+                    update_job(job, FAILED, error=str(e))
+                continue
+
+            # the worker stops, once no job is queued anymore, this is checked while the lock is held,
+            # so that a job, which is enqueued at the same time, is either seen here or starts a new worker
+            with _worker_lock:
+                next_attempt = PublishingJob.objects.filter(status=QUEUED) \
+                                                    .aggregate(Min('next_attempt'))['next_attempt__min']
+                if next_attempt is None:
+                    _worker = None
+                    return
+        finally:
+            close_old_connections()
+
+        delay = (next_attempt - now()).total_seconds()
+        _wakeup.wait(min(max(delay, 0), jobs_settings['poll_interval']))
+
+
+def claim_job():
+    # the next due job is claimed with a conditional update, so that it is only run by one worker,
+    # even if the workers of several processes look for jobs at the same time
+    for job in PublishingJob.objects.filter(status=QUEUED, next_attempt__lte=now()).order_by('next_attempt')[:10]:
+        if PublishingJob.objects.filter(pk=job.pk, status=QUEUED).update(status=RUNNING, updated=now()):
+            job.status = RUNNING
+            return job
+
+
+def recover_jobs(jobs_settings):
+    # jobs which were running, when their process was stopped, are failed, once they were not updated
+    # for job_timeout seconds, they are not sent again, since some of the datasets were sent already
+    PublishingJob.objects.filter(
+        status=RUNNING,
+        updated__lt=now() - timedelta(seconds=jobs_settings['job_timeout'])
+    ).update(status=FAILED, error='The export was interrupted, please export the datasets again.', updated=now())
+
+    PublishingJob.objects.filter(
+        status__in=[SENT, FAILED],
+        updated__lt=now() - timedelta(seconds=jobs_settings['job_retention'])
+    ).delete()
+
+
+def run_job(job):
+    provider = get_plugin('PROJECT_EXPORTS', job.provider_key)
+    if provider is None:
+        return update_job(job, FAILED, error='Provider {} not found.'.format(job.provider_key))
+
+    provider.project = job.project
+    provider.request = JobRequest(job.user, job.language_code)
+
+    job.attempts += 1
+
+    try:
+        datasets = provider.publish(job.set_indexes, job.options)
+    except PublishingError as e:
+        return update_job(job, FAILED, error=str(e))
+
+    # the datasets of this attempt replace the ones of the previous attempt
+    datasets = [{
+        'set_index': dataset.get('set_index'),
+        'title': str(dataset.get('title') or ''),
+        'url': dataset.get('url'),
+        'unchanged': dataset.get('unchanged', False),
+        'error': str(dataset['error']) if dataset.get('error') else None,
+        'retry': dataset.get('retry', False)
+    } for dataset in datasets]
+    set_indexes = {dataset['set_index'] for dataset in datasets}
+    job.datasets = [dataset for dataset in job.datasets if dataset['set_index'] not in set_indexes] + datasets
+
+    retry = [dataset['set_index'] for dataset in datasets if dataset['retry']]
+    max_attempts = provider.provider_settings.get('max_attempts', 5)
+    if retry and job.attempts < max_attempts:
+        # the failed datasets are sent again, with an exponentially growing delay
+        job.set_indexes = retry
+        enqueue(job, provider.provider_settings.get('backoff', 30) * 2 ** (job.attempts - 1))
+    elif any(dataset['error'] for dataset in job.datasets):
+        update_job(job, FAILED)
+    else:
+        update_job(job, SENT)
+
+
+def update_job(job, status, error=None):
+    job.status = status
+    job.error = error
+    job.updated = now()
+    job.save()
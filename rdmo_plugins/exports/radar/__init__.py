@@ -1,2 +1,22 @@
-from .exports import RadarExport
-from .providers import RadarExportProvider
+import sys
+from importlib import import_module
+
+# the modules are only imported when the class is used for the first time (e.g. when RDMO runs the export),
+# so that the RADAR XML export does not load the provider with the forms, the OAuth mixins and requests
+_classes = {
+    'RadarExport': '.exports',
+    'RadarExportProvider': '.providers'
+}
+
+
+def __getattr__(name):
+    if name in _classes:
+        return getattr(import_module(_classes[name], __name__), name)
+
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+
+
+if sys.version_info < (3, 7):
+    # module level __getattr__ is not supported before Python 3.7
+    from .exports import RadarExport  # noqa: F401
+    from .providers import RadarExportProvider  # noqa: F401
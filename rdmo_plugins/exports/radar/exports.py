@@ -5,6 +5,7 @@ from django.http import HttpResponse
 from rdmo.core.exports import prettify_xml
 from rdmo.projects.exports import Export
 
+from ...validators import add_validation_header, render_validation_errors, validate_xml
 from .mixins import RadarMixin
 from .renderers import RadarExportRenderer
 
@@ -15,7 +16,21 @@ class RadarExport(RadarMixin, Export):
         response = HttpResponse(content_type='application/zip')
         response['Content-Disposition'] = 'filename="%s.zip"' % self.project.title
 
+        documents, validation_errors = self.get_documents()
+
         zip_file = zipfile.ZipFile(response, 'w')
+        for file_name, document in documents:
+            zip_file.writestr(file_name, document)
+
+        if validation_errors:
+            zip_file.writestr('validation.txt', render_validation_errors(validation_errors))
+
+        return add_validation_header(response, validation_errors)
+
+    def get_documents(self):
+        # same as DataCiteExport.get_documents, one RADAR XML file per dataset
+        documents = []
+        validation_errors = {}
         for rdmo_dataset in self.get_set('project/dataset/id'):
             set_index = rdmo_dataset.set_index
 
@@ -27,6 +42,10 @@ class RadarExport(RadarMixin, Export):
 
             dataset = self.get_dataset(set_index)
             xmldata = RadarExportRenderer().render(dataset)
-            zip_file.writestr(file_name, prettify_xml(xmldata))
+            documents.append((file_name, prettify_xml(xmldata)))
+
+            errors = validate_xml('radar', xmldata)
+            if errors:
+                validation_errors[file_name] = errors
 
-        return response
+        return documents, validation_errors
@@ -1,104 +1,227 @@
+import logging
 import time
 
+import requests
 from django import forms
 from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
 from django.shortcuts import redirect, render
 from django.utils.translation import gettext_lazy as _
 from django.utils.safestring import mark_safe
 
-from rdmo.domain.models import Attribute
+from rdmo.core.xml import parse_xml_string
 from rdmo.projects.exports import Export
-from rdmo.projects.models import Value
-from rdmo.services.providers import OauthProviderMixin
-
+from rdmo.projects.models import Project
+from rdmo.projects.utils import save_import_values
+
+from ...imports.radar import RadarImport
+from .. import publishing
+from ..circuits import CircuitOpenError
+from ..mixins import OauthSessionProviderMixin, PreloadValuesMixin
+from ..utils import get_idempotency_key
 from .mixins import RadarMixin
-
-
-class RadarExportProvider(RadarMixin, Export, OauthProviderMixin):
+from .renderers import RadarExportRenderer
+
+logger = logging.getLogger(__name__)
+
+
+class RadarExportProvider(RadarMixin, PreloadValuesMixin, Export, OauthSessionProviderMixin):
+
+    dataset_url_path = 'project/dataset/radar_url'
+
+    # the attributes of a dataset, which are set by the RadarImport, and refreshed from RADAR, without
+    # the id of the dataset, the funders and the fallbacks, which are only used if the attribute above is missing
+    pull_paths = [
+        'project/dataset/identifier',
+        'project/dataset/identifier_type',
+        'project/dataset/title',
+        'project/dataset/description',
+        'project/dataset/language',
+        'project/dataset/resource_type',
+        'project/dataset/resource_type_general',
+        'project/dataset/subject',
+        'project/dataset/publisher',
+        'project/dataset/created',
+        'project/dataset/issued',
+        'project/dataset/sharing/conditions',
+        'project/dataset/sharing/rights_holder',
+        'project/dataset/data_source',
+        'project/dataset/creator/name',
+        'project/dataset/creator/name_identifier',
+        'project/dataset/creator/name_identifier_scheme',
+        'project/dataset/creator/affiliation',
+        'project/dataset/contributor/contributor_type',
+        'project/dataset/contributor/name',
+        'project/dataset/contributor/name_identifier',
+        'project/dataset/contributor/name_identifier_scheme',
+        'project/dataset/contributor/affiliation',
+        'project/dataset/alternate_identifier/identifier',
+        'project/dataset/alternate_identifier/identifier_type',
+        'project/dataset/related_identifier/identifier',
+        'project/dataset/related_identifier/identifier_type',
+        'project/dataset/related_identifier/relation_type'
+    ]
 
     class Form(forms.Form):
 
-        dataset = forms.CharField(label=_('Select dataset of your project'))
+        datasets = forms.MultipleChoiceField(label=_('Select datasets of your project'),
+                                             widget=forms.CheckboxSelectMultiple, required=False)
+        all_datasets = forms.BooleanField(label=_('Export all datasets'), required=False)
+        sync = forms.BooleanField(label=_('Export only the datasets which changed since the last export'),
+                                  required=False)
         workspace = forms.CharField(label=_('Select a workspace in RADAR'))
 
         def __init__(self, *args, **kwargs):
             dataset_choices = kwargs.pop('dataset_choices')
             workspace_choices = kwargs.pop('workspace_choices')
-            radar_urls = kwargs.pop('radar_urls')
 
             super().__init__(*args, **kwargs)
 
             dataset_choices_with_radar_urls = []
-            for dataset, radar_url in zip(dataset_choices, radar_urls):
-                set_index, label = dataset
+            for set_index, label, radar_url in dataset_choices:
                 if radar_url is not None:
                     label += ' (Already exported to RADAR: <a href="{radar_url}" target="_blank">{radar_url}</a>)'.format(radar_url=radar_url)
                 dataset_choices_with_radar_urls.append((set_index, mark_safe(label)))
 
-            self.fields['dataset'].widget = forms.RadioSelect(choices=dataset_choices_with_radar_urls)
+            self.fields['datasets'].choices = dataset_choices_with_radar_urls
             self.fields['workspace'].widget = forms.RadioSelect(choices=workspace_choices)
 
+        def clean(self):
+            cleaned_data = super().clean()
+
+            if cleaned_data.get('all_datasets') or cleaned_data.get('sync'):
+                cleaned_data['datasets'] = [str(set_index) for set_index, label in self.fields['datasets'].choices]
+
+            if not cleaned_data.get('datasets'):
+                self.add_error('datasets', _('Please select at least one dataset.'))
+
+            return cleaned_data
+
     def render(self):
-        datasets = self.get_set('project/dataset/id')
-        dataset_choices = [(dataset.set_index, dataset.value) for dataset in datasets]
-        radar_urls = [self.get_text('project/dataset/radar_url', set_index=dataset.set_index) for dataset in datasets]
+        # the dataset choices are kept in the cache, only their cache key is stored in the session
+        dataset_choices_key, dataset_choices = self.get_dataset_choices()
 
-        self.store_in_session(self.request, 'dataset_choices', dataset_choices)
-        self.store_in_session(self.request, 'radar_urls', radar_urls)
+        self.store_in_session(self.request, 'dataset_choices_key', dataset_choices_key)
         self.store_in_session(self.request, 'project_id', self.project.id)
 
         if self.pop_from_session(self.request, 'get') is True:
             workspace_choices = self.get_from_session(self.request, 'workspace_choices')
-            form = self.Form(
-                dataset_choices=dataset_choices,
-                workspace_choices=workspace_choices,
-                radar_urls=radar_urls
-            )
-            return render(self.request, 'plugins/exports_radar.html', {'form': form}, status=200)
         else:
-            # run the oauth get request to obtain the workspace_choices
-            url = self.get_get_url()
-            return self.get(self.request, url)
+            if 'refresh' in self.request.GET:
+                cache.delete(self.get_workspace_cache_key(self.request))
+
+            workspace_choices = cache.get(self.get_workspace_cache_key(self.request))
+            if workspace_choices is None:
+                # run the oauth get request to obtain the workspace_choices
+                url = self.get_get_url()
+                return self.get(self.request, url)
+            else:
+                self.store_in_session(self.request, 'workspace_choices', workspace_choices)
+
+        form = self.Form(
+            dataset_choices=dataset_choices,
+            workspace_choices=workspace_choices
+        )
+        return render(self.request, 'plugins/exports_radar.html', {
+            'form': form,
+            'jobs': publishing.get_jobs(self.key, self.project.id)
+        }, status=200)
 
     def submit(self):
-        dataset_choices = self.get_from_session(self.request, 'dataset_choices')
+        dataset_choices = self.get_cached_dataset_choices(self.request) or self.get_dataset_choices()[1]
         workspace_choices = self.get_from_session(self.request, 'workspace_choices')
-        radar_urls = self.get_from_session(self.request, 'radar_urls')
 
         form = self.Form(
             self.request.POST,
             dataset_choices=dataset_choices,
-            workspace_choices=workspace_choices,
-            radar_urls=radar_urls
+            workspace_choices=workspace_choices
         )
 
         if 'cancel' in self.request.POST:
             return redirect('project', self.project.id)
 
+        if 'pull' in self.request.POST:
+            return self.pull_datasets()
+
         if form.is_valid():
-            self.store_in_session(self.request, 'set_index', form.cleaned_data['dataset'])
+            set_indexes = [int(set_index) for set_index in form.cleaned_data['datasets']]
+            options = {
+                'workspace': form.cleaned_data['workspace'],
+                'sync': form.cleaned_data['sync']
+            }
+
+            if self.publish_in_background(self.request):
+                return self.enqueue_publishing(set_indexes, options)
 
-            url = self.get_post_url(form.cleaned_data['workspace'])
-            data = self.get_post_data(form.cleaned_data['dataset'])
-            return self.post(self.request, url, data)
+            return self.send_datasets(set_indexes, options)
         else:
-            return render(self.request, 'plugins/exports_radar.html', {'form': form}, status=200)
+            return render(self.request, 'plugins/exports_radar.html', {
+                'form': form,
+                'jobs': publishing.get_jobs(self.key, self.project.id)
+            }, status=200)
 
     def get_get_url(self):
         return '{}/radar/api/workspaces'.format(self.radar_url)
 
     def get_success(self, request, response):
-        workspace_choices = [
-            (workspace.get('id'), workspace.get('descriptiveMetadata', {}).get('title'))
-            for workspace in response.json().get('data', [])
-        ]
+        workspace_choices = self.cache_workspace_choices(request, response)
+
         self.store_in_session(request, 'get', True)
         self.store_in_session(request, 'workspace_choices', workspace_choices)
         return redirect('project_export', self.get_from_session(request, 'project_id'), self.key)
 
+    def cache_workspace_choices(self, request, response):
+        workspace_choices = [
+            (workspace.get('id'), workspace.get('descriptiveMetadata', {}).get('title'))
+            for workspace in self.get_workspaces(request, response)
+        ]
+        cache.set(self.get_workspace_cache_key(request), workspace_choices, self.workspace_cache_timeout)
+        return workspace_choices
+
+    def load_workspace_choices(self, request):
+        # returns the cached workspaces or fetches them with the stored access token, without the oauth
+        # redirect, None is returned if the user needs to authorize first
+        workspace_choices = cache.get(self.get_workspace_cache_key(request))
+        if workspace_choices is None:
+            access_token = self.get_access_token(request)
+            if access_token:
+                url = self.get_get_url()
+                try:
+                    response = self.send_request('get', url, headers=self.get_authorization_headers(access_token))
+                    response.raise_for_status()
+                    workspace_choices = self.cache_workspace_choices(request, response)
+                except requests.RequestException as e:
+                    logger.warning('get failed: %s (%s)', url, e)
+
+        return workspace_choices
+
+    def get_workspaces(self, request, response):
+        # users can be members of many workspaces, so the following pages
+        # are fetched with the same access token, until no next link is given
+        headers = self.get_authorization_headers(self.get_access_token(request))
+
+        for page in range(self.workspace_max_pages):
+            data = response.json()
+            yield from data.get('data', [])
+
+            next_url = response.links.get('next', {}).get('url') or data.get('links', {}).get('next')
+            if not next_url:
+                break
+
+            response = self.send_request('get', next_url, headers=headers)
+            response.raise_for_status()
+
+    def get_workspace_cache_key(self, request):
+        return 'rdmo_plugins.radar.workspaces.{}'.format(request.user.pk)
+
     def get_post_url(self, workspace_id):
         return '{}/radar/api/workspaces/{}/datasets'.format(self.radar_url, workspace_id)
 
+    def get_put_url(self, radar_id):
+        return '{}/radar/api/datasets/{}'.format(self.radar_url, radar_id)
+
     def get_post_data(self, set_index):
         now = int(time.time())
         email = self.request.user.email
@@ -118,52 +241,307 @@ class RadarExportProvider(RadarMixin, Export, OauthProviderMixin):
             'descriptiveMetadata': dataset
         }
 
-    def post_success(self, request, response):
-        radar_id = response.json().get('id')
-        if radar_id:
-            project_id = self.get_from_session(self.request, 'project_id')
-            set_index = self.get_from_session(self.request, 'set_index')
+    def prepare_requests(self, set_indexes, options):
+        post_url = self.get_post_url(options['workspace'])
+
+        # datasets which were exported before are updated, instead of creating a new dataset in RADAR
+        radar_ids = {
+            value.set_index: value.text
+            for value in self.get_set('project/dataset/radar_id') if value.text
+        }
 
-            if request.LANGUAGE_CODE == 'de':
-                radar_url = '{}/radar/de/dataset/{}'.format(self.radar_url, radar_id)
+        # the hash of the last payload which was pushed for a dataset, to skip unchanged datasets
+        radar_hashes = {
+            value.set_index: value.text
+            for value in self.get_set('project/dataset/radar_hash') if value.text
+        }
+
+        requests_list = []
+        sent, unchanged, pending = [], [], []
+        hashes = {}
+        for set_index in set_indexes:
+            data = self.get_post_data(set_index)
+            hashes[set_index] = self.get_payload_hash(data)
+
+            if options.get('sync') and set_index in radar_ids \
+                    and radar_hashes.get(set_index) == hashes[set_index]:
+                unchanged.append(set_index)
+                continue
+
+            # the key only depends on the project, the dataset, the workspace and the payload hash,
+            # so that it is the same, when the unchanged dataset is sent again after the pending_timeout
+            idempotency_key = get_idempotency_key(post_url, [self.project.id, set_index, hashes[set_index]])
+
+            if set_index in radar_ids:
+                requests_list.append(('put', self.get_put_url(radar_ids[set_index]), data, None))
+            elif self.claim_dataset(set_index, idempotency_key):
+                requests_list.append(('post', post_url, data, idempotency_key))
             else:
-                radar_url = '{}/radar/en/dataset/{}'.format(self.radar_url, radar_id)
-
-            try:
-                attribute = Attribute.objects.get(path='project/dataset/radar_id')
-                value, created = Value.objects.get_or_create(
-                    attribute=attribute,
-                    project_id=project_id,
-                    set_index=set_index
-                )
-                value.text = radar_id
-                value.save()
-            except Attribute.DoesNotExist:
-                pass
-
-            try:
-                attribute = Attribute.objects.get(path='project/dataset/radar_url')
-                value, created = Value.objects.get_or_create(
-                    attribute=attribute,
-                    project_id=project_id,
-                    set_index=set_index
-                )
-                value.text = radar_url
-                value.save()
-            except Attribute.DoesNotExist:
-                pass
-
-            return redirect(radar_url)
-        else:
-            return render(request, 'core/error.html', {
+                pending.append(set_index)
+                continue
+
+            sent.append(set_index)
+
+        # dicts with integer keys are stored as lists, since the session is serialized as JSON
+        self.store_in_session(self.request, 'set_indexes', sent)
+        self.store_in_session(self.request, 'unchanged', unchanged)
+        self.store_in_session(self.request, 'radar_ids', list(radar_ids.items()))
+        self.store_in_session(self.request, 'radar_hashes', list(hashes.items()))
+        self.store_in_session(self.request, 'project_id', self.project.id)
+
+        return requests_list, pending
+
+    def release_requests(self, request):
+        for set_index in self.pop_from_session(request, 'set_indexes') or []:
+            self.release_dataset(set_index)
+
+        for key in ['unchanged', 'radar_ids', 'radar_hashes']:
+            self.pop_from_session(request, key)
+
+    def render_pending(self, pending):
+        dataset_choices = self.get_cached_dataset_choices(self.request) or self.get_dataset_choices()[1]
+        dataset_labels = {set_index: label for set_index, label, radar_url in dataset_choices}
+        return render(self.request, 'core/error.html', {
+            'title': _('RADAR error'),
+            'errors': [
+                _('The last export of "%s" did not finish. Please check if the dataset was created '
+                  'in RADAR, before you try again later.') % dataset_labels.get(set_index)
+                for set_index in pending
+            ]
+        }, status=200)
+
+    def post_many_success(self, request, results):
+        project_id, datasets = self.save_results(request, results)
+
+        if len(datasets) == 1 and datasets[0].get('url') and not datasets[0].get('unchanged'):
+            return redirect(datasets[0]['url'])
+
+        return render(request, 'plugins/exports_radar_results.html', {
+            'datasets': datasets,
+            'project_id': project_id
+        }, status=200)
+
+    def save_results(self, request, results):
+        project_id = self.get_from_session(request, 'project_id')
+        set_indexes = self.pop_from_session(request, 'set_indexes')
+        unchanged = self.pop_from_session(request, 'unchanged') or []
+        radar_ids = dict(self.pop_from_session(request, 'radar_ids') or [])
+        radar_hashes = dict(self.pop_from_session(request, 'radar_hashes') or [])
+        dataset_labels = {
+            set_index: label for set_index, label, radar_url in self.get_cached_dataset_choices(request)
+        }
+
+        datasets = []
+        radar_values = {}
+        for set_index, (data, response) in zip(set_indexes, results):
+            dataset = {'set_index': set_index, 'title': dataset_labels.get(set_index)}
+            if isinstance(response, CircuitOpenError):
+                # the request was not sent at all
+                self.release_dataset(set_index, project_id)
+                dataset['error'] = str(response)
+            elif isinstance(response, Exception):
+                # the dataset could have been created, even if the response did not arrive,
+                # so the dataset stays claimed, until the pending_timeout has passed
+                dataset['error'] = str(response)
+            else:
+                self.release_dataset(set_index, project_id)
+
+                if response.ok:
+                    radar_id = radar_ids.get(set_index) or response.json().get('id')
+                    if radar_id:
+                        dataset['url'] = self.get_radar_dataset_url(request, radar_id)
+                        radar_values[set_index] = {
+                            'project/dataset/radar_id': radar_id,
+                            'project/dataset/radar_url': dataset['url'],
+                            'project/dataset/radar_hash': radar_hashes.get(set_index)
+                        }
+                    else:
+                        dataset['error'] = _('The ID of the new dataset could not be retrieved.')
+                else:
+                    try:
+                        dataset['error'] = self.get_error_message(response)
+                    except ValueError:
+                        dataset['error'] = '{} {}'.format(response.status_code, response.reason)
+
+            if dataset.get('error'):
+                dataset['retry'] = self.is_retriable(response)
+
+            datasets.append(dataset)
+
+        for set_index in unchanged:
+            datasets.append({
+                'set_index': set_index,
+                'title': dataset_labels.get(set_index),
+                'url': self.get_radar_dataset_url(request, radar_ids.get(set_index)),
+                'unchanged': True
+            })
+
+        self.save_dataset_values(project_id, radar_values)
+
+        return project_id, datasets
+
+    def pull_datasets(self):
+        # fetch the current metadata of all datasets, which were exported to RADAR before, concurrently
+        radar_ids = {
+            value.set_index: value.text
+            for value in self.get_set('project/dataset/radar_id') if value.text
+        }
+
+        if not radar_ids:
+            return render(self.request, 'core/error.html', {
                 'title': _('RADAR error'),
-                'errors': [_('The ID of the new dataset could not be retrieved.')]
+                'errors': [_('None of the datasets was exported to RADAR yet.')]
             }, status=200)
 
+        self.store_in_session(self.request, 'set_indexes', list(radar_ids.keys()))
+        self.store_in_session(self.request, 'radar_ids', list(radar_ids.items()))
+        self.store_in_session(self.request, 'project_id', self.project.id)
+
+        # a dataset is fetched from the same url, which is used to update it
+        return self.send_many(self.request, [
+            ('get', self.get_put_url(radar_id), None, None) for radar_id in radar_ids.values()
+        ], ('pull_datasets', []), 'pull_many_success')
+
+    def pull_many_success(self, request, results):
+        project = Project.objects.get(pk=self.get_from_session(request, 'project_id'))
+        set_indexes = self.pop_from_session(request, 'set_indexes')
+        radar_ids = dict(self.pop_from_session(request, 'radar_ids') or [])
+
+        # the metadata is rendered as RADAR XML in memory and mapped to values by the RadarImport
+        radar_import = RadarImport('radar', 'RADAR', 'rdmo_plugins.imports.radar.RadarImport')
+        radar_import.current_project = project
+
+        datasets = []
+        for set_index, (data, response) in zip(set_indexes, results):
+            dataset = {
+                'set_index': set_index,
+                'url': self.get_radar_dataset_url(request, radar_ids.get(set_index))
+            }
+
+            if isinstance(response, Exception):
+                dataset['error'] = str(response)
+            elif not response.ok:
+                try:
+                    dataset['error'] = self.get_error_message(response)
+                except ValueError:
+                    dataset['error'] = '{} {}'.format(response.status_code, response.reason)
+            else:
+                descriptive_metadata = response.json().get('descriptiveMetadata') or {}
+                dataset['title'] = descriptive_metadata.get('title')
+
+                # the funders belong to the project and not to the dataset, so they are not refreshed
+                descriptive_metadata.pop('fundingReferences', None)
+
+                if not descriptive_metadata:
+                    # nothing is imported, so that the values of the dataset are kept
+                    dataset['error'] = _('RADAR returned no metadata for the dataset.')
+                else:
+                    root = parse_xml_string(RadarExportRenderer().render(descriptive_metadata))
+                    if root is None:
+                        dataset['error'] = _('The metadata from RADAR could not be read.')
+                    else:
+                        radar_import.process_document(root, set_index)
+
+            datasets.append(dataset)
+
+        # the id of the dataset is kept, even if the title was changed in RADAR
+        values = [
+            value for value in radar_import.values
+            if value.attribute and value.attribute.path != 'project/dataset/id'
+        ]
+        # the values, which were removed in RADAR, are only deleted for the datasets with a title,
+        # since the title is mandatory in RADAR and metadata without it was not understood by the import
+        set_indexes = [
+            dataset['set_index'] for dataset in datasets
+            if dataset.get('title') and not dataset.get('error')
+        ]
+        self.save_import_values(project, values, set_indexes)
+
+        return render(request, 'plugins/exports_radar_results.html', {
+            'datasets': datasets,
+            'project_id': project.id,
+            'pulled': True
+        }, status=200)
+
+    def save_import_values(self, project, values, set_indexes):
+        # existing values are updated and new values are created, like for an import into an existing project,
+        # the values of the refreshed datasets, which are not in the metadata from RADAR anymore, are deleted
+        keys = {(value.attribute.id, value.set_prefix, value.set_index, value.collection_index) for value in values}
+
+        with transaction.atomic():
+            removed_values = project.values.filter(snapshot=None, attribute__path__in=self.pull_paths).filter(
+                Q(set_prefix='', set_index__in=set_indexes) |
+                Q(set_prefix__in=[str(set_index) for set_index in set_indexes])
+            )
+            for value in removed_values:
+                if (value.attribute_id, value.set_prefix, value.set_index, value.collection_index) not in keys:
+                    value.delete()
+
+            current_values = {
+                (value.attribute_id, value.set_prefix, value.set_index, value.collection_index): value
+                for value in project.values.filter(snapshot=None, attribute__in={value.attribute for value in values})
+            }
+
+            checked = []
+            for value in values:
+                value.current = current_values.get((value.attribute.id, value.set_prefix,
+                                                    value.set_index, value.collection_index))
+                checked.append('{value.attribute.uri}[{value.set_prefix}][{value.set_index}][{value.collection_index}]'
+                               .format(value=value))
+
+            save_import_values(project, values, checked)
+
+    def claim_dataset(self, set_index, idempotency_key):
+        # a dataset is claimed in the cache before it is created, so that it is not created a second time,
+        # when the first request timed out, but reached RADAR, no request is sent for the dataset, until the
+        # claim is released or the pending_timeout has passed, since RADAR might not honour the Idempotency-Key,
+        # other processes (e.g. other gunicorn workers) only see the claim if the cache is shared
+        return cache.add(self.get_pending_cache_key(self.project.id, set_index), idempotency_key,
+                         self.pending_timeout)
+
+    def release_dataset(self, set_index, project_id=None):
+        cache.delete(self.get_pending_cache_key(project_id or self.project.id, set_index))
+
+    def get_pending_cache_key(self, project_id, set_index):
+        return 'rdmo_plugins.radar.pending.{}.{}'.format(project_id, set_index)
+
+    def get_radar_dataset_url(self, request, radar_id):
+        if request.LANGUAGE_CODE == 'de':
+            return '{}/radar/de/dataset/{}'.format(self.radar_url, radar_id)
+        else:
+            return '{}/radar/en/dataset/{}'.format(self.radar_url, radar_id)
+
+    def get_payload_hash(self, data):
+        # the dates in the technical metadata are set to the time of the export, and are left out
+        technical_metadata = {
+            key: value for key, value in data.get('technicalMetadata', {}).items()
+            if key not in ['archiveDate', 'publishDate']
+        }
+        return super().get_payload_hash({
+            'technicalMetadata': technical_metadata,
+            'descriptiveMetadata': data.get('descriptiveMetadata')
+        })
+
+    @property
+    def provider_settings(self):
+        return settings.RADAR_PROVIDER
+
     @property
     def radar_url(self):
         return settings.RADAR_PROVIDER['radar_url'].strip('/')
 
+    @property
+    def workspace_cache_timeout(self):
+        return settings.RADAR_PROVIDER.get('workspace_cache_timeout', 600)
+
+    @property
+    def workspace_max_pages(self):
+        return settings.RADAR_PROVIDER.get('workspace_max_pages', 100)
+
+    @property
+    def pending_timeout(self):
+        return settings.RADAR_PROVIDER.get('pending_timeout', 600)
+
     @property
     def authorize_url(self):
         return '{}/radar-backend/oauth/authorize'.format(self.radar_url)
@@ -199,6 +577,12 @@ class RadarExportProvider(RadarMixin, Export, OauthProviderMixin):
             'code': request.GET.get('code')
         }
 
+    def get_refresh_params(self, refresh_token):
+        return {
+            'grant_type': 'refresh_token',
+            'refresh_token': refresh_token
+        }
+
     def get_callback_auth(self, request):
         return (self.client_id, self.client_secret)
 
@@ -0,0 +1,174 @@
+from functools import lru_cache
+
+from defusedcsv import csv
+
+from .datacite import DataCiteExport
+from .madmp import MaDMPExport
+from .mixins import PreloadValuesMixin
+
+# the columns of the dataset table, list columns are joined for CSV and stored as lists in Parquet
+columns = [
+    ('project_id', 'int'),
+    ('project_title', 'string'),
+    ('set_index', 'int'),
+    ('identifier', 'string'),
+    ('identifier_type', 'string'),
+    ('title', 'string'),
+    ('publisher', 'string'),
+    ('repository', 'string'),
+    ('publication_year', 'string'),
+    ('created', 'string'),
+    ('issued', 'string'),
+    ('language', 'string'),
+    ('resource_type', 'string'),
+    ('resource_type_general', 'string'),
+    ('licenses', 'list'),
+    ('license_uris', 'list'),
+    ('subjects', 'list'),
+    ('keywords', 'list'),
+    ('formats', 'list'),
+    ('creators', 'list'),
+    ('contributors', 'list'),
+    ('funders', 'list'),
+    ('data_access', 'string'),
+    ('certified_with', 'string'),
+    ('pid_system', 'string'),
+    ('personal_data', 'string'),
+    ('sensitive_data', 'string')
+]
+
+
+@lru_cache(maxsize=None)
+def get_pyarrow():
+    # pyarrow is only needed for Parquet files and imported when the first one is written
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        return pyarrow
+    except ImportError:
+        return None
+
+
+class TabularDataCiteExport(PreloadValuesMixin, DataCiteExport):
+    pass
+
+
+class TabularMaDMPExport(PreloadValuesMixin, MaDMPExport):
+    pass
+
+
+def get_dataset_rows(project, snapshot=None):
+    # flattens the DataCite and the maDMP dataset of every dataset of the project into one row,
+    # the values of the project are loaded with one query and shared by both exports
+    datacite_export = TabularDataCiteExport('datacite', 'datacite', None)
+    madmp_export = TabularMaDMPExport('madmp', 'madmp', None)
+
+    values_index = None
+    for export in [datacite_export, madmp_export]:
+        export.project = project
+        export.snapshot = snapshot
+        values_index = export.preload_values(values_index)
+
+    for rdmo_dataset in datacite_export.get_set('project/dataset/id'):
+        dataset = datacite_export.get_dataset(rdmo_dataset.set_index)
+        dmp_dataset = madmp_export.get_dataset(rdmo_dataset)
+
+        distributions = {distribution.get('title'): distribution for distribution in dmp_dataset['distribution']}
+        during = distributions.get('Storage during the project', {})
+        after = distributions.get('Preservation after the project', {})
+
+        yield {
+            'project_id': project.id,
+            'project_title': project.title,
+            'set_index': rdmo_dataset.set_index,
+            'identifier': dataset.get('identifier'),
+            'identifier_type': dataset.get('identifierType'),
+            'title': dataset['titles'][0]['title'],
+            'publisher': dataset.get('publisher'),
+            'repository': after.get('host', {}).get('title'),
+            'publication_year': dataset.get('publicationYear'),
+            'created': dataset.get('created'),
+            'issued': dataset.get('issued'),
+            'language': dataset.get('language'),
+            'resource_type': dataset.get('resourceType'),
+            'resource_type_general': dataset.get('resourceTypeGeneral'),
+            'licenses': [rights['rights'] for rights in dataset['rightsList']],
+            'license_uris': [rights['rightsURI'] for rights in dataset['rightsList'] if rights['rightsURI']],
+            'subjects': [subject['subject'] for subject in dataset['subjects']],
+            'keywords': dmp_dataset.get('keyword', []),
+            'formats': during.get('format', []),
+            'creators': [creator['name'] for creator in dataset['creators']],
+            'contributors': [contributor['name'] for contributor in dataset['contributors']],
+            'funders': [funder['funderName'] for funder in dataset['fundingReferences'] if funder['funderName']],
+            'data_access': during.get('data_access'),
+            'certified_with': after.get('certified_with'),
+            'pid_system': after.get('pid_system'),
+            'personal_data': dmp_dataset.get('personal_data'),
+            'sensitive_data': dmp_dataset.get('sensitive_data')
+        }
+
+
+class CSVTableWriter(object):
+
+    # writes every row right away, list columns are joined with the separator
+    def __init__(self, file, delimiter=',', separator='; '):
+        self.writer = csv.writer(file, delimiter=delimiter)
+        self.writer.writerow([name for name, column_type in columns])
+        self.separator = separator
+
+    def write(self, row):
+        self.writer.writerow([
+            self.separator.join(str(item) for item in row[name]) if column_type == 'list' else row[name]
+            for name, column_type in columns
+        ])
+
+    def close(self):
+        pass
+
+
+class ParquetTableWriter(object):
+
+    # collects the rows column by column and writes a row group, every time batch_size rows were collected,
+    # so that only one batch is kept in memory
+    def __init__(self, file, batch_size=10000):
+        self.pyarrow = get_pyarrow()
+        if self.pyarrow is None:
+            raise ImportError('pyarrow is needed to write Parquet files, please install "rdmo-plugins[parquet]".')
+
+        types = {
+            'int': self.pyarrow.int64(),
+            'string': self.pyarrow.string(),
+            'list': self.pyarrow.list_(self.pyarrow.string())
+        }
+        self.schema = self.pyarrow.schema([(name, types[column_type]) for name, column_type in columns])
+        self.writer = self.pyarrow.parquet.ParquetWriter(file, self.schema)
+        self.batch_size = batch_size
+        self.batch = {name: [] for name, column_type in columns}
+        self.length = 0
+
+    def write(self, row):
+        for name, column_type in columns:
+            value = row[name]
+            if column_type == 'list':
+                self.batch[name].append([str(item) for item in value])
+            elif column_type == 'string':
+                self.batch[name].append(None if value is None else str(value))
+            else:
+                self.batch[name].append(value)
+
+        self.length += 1
+        if self.length >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.length:
+            self.writer.write_table(self.pyarrow.Table.from_arrays([
+                self.pyarrow.array(self.batch[field.name], type=field.type) for field in self.schema
+            ], schema=self.schema))
+
+            self.batch = {name: [] for name, column_type in columns}
+            self.length = 0
+
+    def close(self):
+        self.flush()
+        self.writer.close()
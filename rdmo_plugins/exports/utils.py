@@ -0,0 +1,132 @@
+import base64
+import hashlib
+import json
+import threading
+import time
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:
+    Fernet = None
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+_rate_limiters = {}
+
+# caches which are not shared between processes
+LOCAL_CACHE_BACKENDS = [
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache'
+]
+
+
+def get_session(url, pool_size=10, retries=3, backoff_factor=0.5):
+    # one pooled, keep-alive session is created per target host and process and shared
+    # between all requests (and threads), so that the TCP and TLS handshakes are done only once
+    scheme, netloc = urlsplit(url)[:2]
+    key = (scheme, netloc, pool_size, retries, backoff_factor)
+
+    with _sessions_lock:
+        if key not in _sessions:
+            # only idempotent requests are retried, so that a failed POST never creates a dataset twice
+            retry = Retry(total=retries, backoff_factor=backoff_factor,
+                          status_forcelist=(502, 503, 504), raise_on_status=False)
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+
+            session = requests.Session()
+            session.mount('{}://{}'.format(scheme, netloc), adapter)
+            _sessions[key] = session
+
+        return _sessions[key]
+
+
+def get_idempotency_key(url, data):
+    return hashlib.sha256(json.dumps([url, data], sort_keys=True).encode()).hexdigest()
+
+
+def get_payload_hash(data):
+    # the payload is serialized canonically (sorted keys, no whitespace), so that the hash
+    # only changes if the content changes
+    return hashlib.sha256(json.dumps(data, sort_keys=True, separators=(',', ':')).encode()).hexdigest()
+
+
+def get_fingerprint(data):
+    # a short hash, which is used as part of cache keys
+    return get_payload_hash(data)[:16]
+
+
+@lru_cache(maxsize=None)
+def get_fernet(secret):
+    # the key for the symmetric encryption is derived from the secret (e.g. the SECRET_KEY)
+    return Fernet(base64.urlsafe_b64encode(hashlib.sha256(secret.encode()).digest()))
+
+
+def encrypt(data, secret):
+    return get_fernet(secret).encrypt(json.dumps(data).encode()).decode()
+
+
+def decrypt(token, secret):
+    # returns None if the token was encrypted using a different secret or was altered
+    try:
+        return json.loads(get_fernet(secret).decrypt(token.encode()))
+    except (InvalidToken, ValueError):
+        return None
+
+
+class FileStream(object):
+
+    # wraps an open django file, so that requests sends it with a Content-Length header,
+    # but reads it from the storage in chunks instead of loading it into memory
+    def __init__(self, file, chunk_size):
+        self.file = file
+        self.chunk_size = chunk_size
+
+    def __len__(self):
+        return self.file.size
+
+    def __iter__(self):
+        return self.file.chunks(self.chunk_size)
+
+
+class RateLimiter(object):
+
+    # spaces the requests to one host evenly, so that no more than rate requests per second are sent,
+    # wait is called by the worker threads right before a request is sent
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0
+        self.next_time = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_time - now
+            self.next_time = max(now, self.next_time) + self.interval
+
+        if delay > 0:
+            time.sleep(delay)
+
+
+def get_rate_limiter(url, rate):
+    # the rate limiter is shared by all requests to the host in this process
+    scheme, netloc = urlsplit(url)[:2]
+    key = (scheme, netloc, rate)
+
+    with _sessions_lock:
+        if key not in _rate_limiters:
+            _rate_limiters[key] = RateLimiter(rate)
+
+        return _rate_limiters[key]
+
+
+def cache_is_shared():
+    return settings.CACHES[DEFAULT_CACHE_ALIAS]['BACKEND'] not in LOCAL_CACHE_BACKENDS
@@ -1,68 +1,291 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
 
+import requests
 from django import forms
 from django.conf import settings
+from django.db.models import Q
 from django.shortcuts import reverse, redirect, render
 from django.utils.translation import gettext_lazy as _
 
-from rdmo.projects.exports import Export
-from rdmo.services.providers import OauthProviderMixin
+from rdmo.core.constants import VALUE_TYPE_FILE
+from rdmo.core.exports import prettify_xml
+from rdmo.projects.models import Value
 
-logger = logging.getLogger(__name__)
+from . import publishing
+from .datacite import DataCiteExport
+from .mixins import OauthSessionProviderMixin, PreloadValuesMixin
+from .utils import FileStream, get_session
 
+logger = logging.getLogger(__name__)
 
-class ZenodoExportProvider(OauthProviderMixin, Export):
 
-    authorize_url = 'https://sandbox.zenodo.org/oauth/authorize'
-    token_url = 'https://sandbox.zenodo.org/oauth/token'
-    deposit_url = 'https://sandbox.zenodo.org/api/deposit/depositions'
+class ZenodoExportProvider(OauthSessionProviderMixin, PreloadValuesMixin, DataCiteExport):
 
     class Form(forms.Form):
 
-        dataset = forms.CharField(label=_('Select dataset of your project'))
+        datasets = forms.MultipleChoiceField(label=_('Select one or more datasets of your project'),
+                                             widget=forms.CheckboxSelectMultiple, required=False)
+        sync = forms.BooleanField(label=_('Export only the datasets which changed since the last export'),
+                                  required=False)
 
         def __init__(self, *args, **kwargs):
             dataset_choices = kwargs.pop('dataset_choices')
             super().__init__(*args, **kwargs)
 
-            self.fields['dataset'].widget = forms.RadioSelect(choices=dataset_choices)
+            self.fields['datasets'].choices = [(set_index, label) for set_index, label, zenodo_url in dataset_choices]
+
+        def clean(self):
+            cleaned_data = super().clean()
+
+            if cleaned_data.get('sync'):
+                cleaned_data['datasets'] = [str(set_index) for set_index, label in self.fields['datasets'].choices]
+
+            if not cleaned_data.get('datasets'):
+                self.add_error('datasets', _('Please select at least one dataset.'))
+
+            return cleaned_data
 
     def render(self):
-        datasets = self.get_set('project/dataset/id')
-        dataset_choices = [(dataset.set_index, dataset.value)for dataset in datasets]
+        # the dataset choices are kept in the cache, only their cache key is stored in the session
+        dataset_choices_key, dataset_choices = self.get_dataset_choices()
 
-        self.store_in_session(self.request, 'dataset_choices', dataset_choices)
+        self.store_in_session(self.request, 'dataset_choices_key', dataset_choices_key)
 
         form = self.Form(
             dataset_choices=dataset_choices
         )
 
-        return render(self.request, 'plugins/exports_zenodo.html', {'form': form}, status=200)
+        return render(self.request, 'plugins/exports_zenodo.html', {
+            'form': form,
+            'jobs': publishing.get_jobs(self.key, self.project.id)
+        }, status=200)
 
     def submit(self):
-        dataset_choices = self.get_from_session(self.request, 'dataset_choices')
+        dataset_choices = self.get_cached_dataset_choices(self.request) or self.get_dataset_choices()[1]
         form = self.Form(self.request.POST, dataset_choices=dataset_choices)
 
         if 'cancel' in self.request.POST:
             return redirect('project', self.project.id)
 
         if form.is_valid():
-            url = self.get_post_url()
-            data = self.get_post_data(form.cleaned_data['dataset'])
-            return self.post(self.request, url, data)
-        else:
-            return render(self.request, 'plugins/exports_zenodo.html', {'form': form}, status=200)
+            set_indexes = [int(set_index) for set_index in form.cleaned_data['datasets']]
+            options = {
+                'sync': form.cleaned_data['sync']
+            }
 
-    def post_success(self, request, response):
-        zenodo_url = response.json().get('links', {}).get('html')
-        if zenodo_url:
-            return redirect(zenodo_url)
+            if self.publish_in_background(self.request):
+                return self.enqueue_publishing(set_indexes, options)
+
+            return self.send_datasets(set_indexes, options)
         else:
-            return render(request, 'core/error.html', {
-                'title': _('ZENODO error'),
-                'errors': [_('The URL of the new dataset could not be retrieved.')]
+            return render(self.request, 'plugins/exports_zenodo.html', {
+                'form': form,
+                'jobs': publishing.get_jobs(self.key, self.project.id)
             }, status=200)
 
+    def prepare_requests(self, set_indexes, options):
+        # depositions which were created before are updated, unchanged ones are skipped when syncing
+        zenodo_ids = {value.set_index: value.text for value in self.get_set('project/dataset/zenodo_id') if value.text}
+        zenodo_urls = {value.set_index: value.text for value in self.get_set('project/dataset/zenodo_url')}
+        zenodo_hashes = {value.set_index: value.text for value in self.get_set('project/dataset/zenodo_hash')}
+
+        requests_list = []
+        sent, unchanged, uploads = [], [], []
+        hashes = {}
+        for set_index in set_indexes:
+            data = self.get_post_data(set_index)
+            dataset_uploads = self.get_uploads(set_index)
+            hashes[set_index] = self.get_payload_hash([data, dataset_uploads])
+
+            if options.get('sync') and set_index in zenodo_ids \
+                    and zenodo_hashes.get(set_index) == hashes[set_index]:
+                unchanged.append((set_index, data['metadata']['title'], zenodo_urls.get(set_index)))
+                continue
+
+            if set_index in zenodo_ids:
+                requests_list.append(('put', self.get_put_url(zenodo_ids[set_index]), data, None))
+            else:
+                requests_list.append(('post', self.get_post_url(), data, None))
+
+            sent.append(set_index)
+            uploads.append(dataset_uploads)
+
+        # the files are uploaded after the depositions were created, which can be after the
+        # oauth callback, so only the rendered DataCite XML and the ids of the values are stored
+        self.store_in_session(self.request, 'set_indexes', sent)
+        self.store_in_session(self.request, 'unchanged', unchanged)
+        self.store_in_session(self.request, 'zenodo_hashes', list(hashes.items()))
+        self.store_in_session(self.request, 'uploads', uploads)
+        self.store_in_session(self.request, 'project_id', self.project.id)
+
+        return requests_list, []
+
+    def release_requests(self, request):
+        for key in ['set_indexes', 'unchanged', 'zenodo_hashes', 'uploads']:
+            self.pop_from_session(request, key)
+
+    def post_many_success(self, request, results):
+        project_id, depositions = self.save_results(request, results)
+
+        if len(depositions) == 1 and depositions[0].get('url') and not depositions[0].get('error') \
+                and not depositions[0].get('unchanged'):
+            return redirect(depositions[0]['url'])
+
+        return render(request, 'plugins/exports_zenodo_results.html', {
+            'depositions': depositions,
+            'project_id': project_id
+        }, status=200)
+
+    def save_results(self, request, results):
+        project_id = self.get_from_session(request, 'project_id')
+        set_indexes = self.pop_from_session(request, 'set_indexes') or [None] * len(results)
+        unchanged = self.pop_from_session(request, 'unchanged') or []
+        zenodo_hashes = dict(self.pop_from_session(request, 'zenodo_hashes') or [])
+        uploads = self.pop_from_session(request, 'uploads') or [None] * len(results)
+
+        depositions = []
+        buckets = []
+        zenodo_values = {}
+        for set_index, (data, response), dataset_uploads in zip(set_indexes, results, uploads):
+            deposition = {'set_index': set_index, 'title': data['metadata']['title']}
+            if isinstance(response, Exception):
+                deposition['error'] = str(response)
+
+                # Zenodo does not support idempotency keys, so only requests which did not reach Zenodo are retried
+                deposition['retry'] = isinstance(response, requests.ConnectionError)
+            elif response.ok:
+                response_data = response.json()
+                links = response_data.get('links', {})
+                deposition['url'] = links.get('html')
+                buckets.append((set_index, deposition, (links.get('bucket'), dataset_uploads)))
+
+                if set_index is not None:
+                    zenodo_values[set_index] = {
+                        'project/dataset/zenodo_id': str(response_data.get('id')),
+                        'project/dataset/zenodo_url': deposition['url'],
+                        'project/dataset/zenodo_hash': zenodo_hashes.get(set_index)
+                    }
+            else:
+                try:
+                    deposition['error'] = self.get_error_message(response)
+                except ValueError:
+                    deposition['error'] = '{} {}'.format(response.status_code, response.reason)
+                deposition['retry'] = self.is_retriable(response)
+
+            depositions.append(deposition)
+
+        # the files of all new depositions are uploaded using the same pool of threads
+        upload_errors = self.upload_files(request, [bucket for set_index, deposition, bucket in buckets])
+        for (set_index, deposition, bucket), errors in zip(buckets, upload_errors):
+            if errors:
+                deposition['error'] = ', '.join(errors)
+
+                # the hash is not stored, so that the deposition is sent again with the next sync
+                if set_index in zenodo_values:
+                    zenodo_values[set_index]['project/dataset/zenodo_hash'] = ''
+
+        for set_index, title, zenodo_url in unchanged:
+            depositions.append({
+                'set_index': set_index,
+                'title': title,
+                'url': zenodo_url,
+                'unchanged': True
+            })
+
+        self.save_dataset_values(project_id, zenodo_values)
+
+        return project_id, depositions
+
+    def get_uploads(self, set_index):
+        dataset = self.get_dataset(set_index)
+        xml = prettify_xml(self.Renderer().render(dataset)).decode()
+
+        # the file values of the dataset itself and of its nested sets
+        value_ids = list(Value.objects.filter(
+            project=self.project,
+            snapshot=self.snapshot,
+            value_type=VALUE_TYPE_FILE,
+            attribute__path__startswith='project/dataset/'
+        ).filter(
+            Q(set_prefix='', set_index=set_index) | Q(set_prefix=str(set_index))
+        ).exclude(file='').values_list('id', flat=True))
+
+        return {
+            'xml': (dataset['file_name'], xml),
+            'values': value_ids
+        }
+
+    def upload_files(self, request, buckets):
+        # buckets is a list of (bucket_url, uploads) tuples, one for each deposition, all files are
+        # uploaded concurrently and streamed from the storage, a list of errors is returned for each bucket
+        headers = self.get_authorization_headers(self.get_access_token(request))
+        chunk_size = self.provider_settings.get('upload_chunk_size', 1024 * 1024)
+
+        value_ids = [value_id for bucket_url, uploads in buckets if uploads for value_id in uploads['values']]
+        values = Value.objects.in_bulk(value_ids)
+
+        tasks = []
+        for index, (bucket_url, uploads) in enumerate(buckets):
+            if bucket_url and uploads:
+                file_name, xml = uploads['xml']
+                tasks.append((index, bucket_url, file_name, xml.encode(), None))
+
+                for value_id in uploads['values']:
+                    value = values.get(value_id)
+                    if value is not None and value.file:
+                        tasks.append((index, bucket_url, value.file_name, None, value))
+
+        def upload(task):
+            index, bucket_url, file_name, content, value = task
+            url = '{}/{}'.format(bucket_url, quote(file_name))
+
+            # the uploads are not retried, since a stream which was read already can not be sent again
+            session = get_session(url, pool_size=self.provider_settings.get('pool_size', 10), retries=0)
+
+            logger.debug('put: %s', url)
+            try:
+                if value is None:
+                    response = self.send_request('put', url, session=session, data=content, headers=headers)
+                else:
+                    with value.file.open('rb') as file:
+                        response = self.send_request('put', url, session=session, data=FileStream(file, chunk_size),
+                                                     headers=headers)
+                response.raise_for_status()
+            except (requests.RequestException, OSError) as e:
+                logger.warning('put failed: %s (%s)', url, e)
+                return index, '{}: {}'.format(file_name, e)
+
+        errors = [[] for bucket in buckets]
+        with ThreadPoolExecutor(max_workers=self.provider_settings.get('max_workers', 4)) as executor:
+            for result in executor.map(upload, tasks):
+                if result is not None:
+                    index, error = result
+                    errors[index].append(error)
+
+        return errors
+
+    @property
+    def provider_settings(self):
+        return settings.ZENODO_PROVIDER
+
+    @property
+    def zenodo_url(self):
+        return settings.ZENODO_PROVIDER.get('zenodo_url', 'https://sandbox.zenodo.org').strip('/')
+
+    @property
+    def authorize_url(self):
+        return '{}/oauth/authorize'.format(self.zenodo_url)
+
+    @property
+    def token_url(self):
+        return '{}/oauth/token'.format(self.zenodo_url)
+
+    @property
+    def deposit_url(self):
+        return '{}/api/deposit/depositions'.format(self.zenodo_url)
+
     @property
     def client_id(self):
         return settings.ZENODO_PROVIDER['client_id']
@@ -78,6 +301,9 @@ class ZenodoExportProvider(OauthProviderMixin, Export):
     def get_post_url(self):
         return self.deposit_url
 
+    def get_put_url(self, zenodo_id):
+        return '{}/{}'.format(self.deposit_url, zenodo_id)
+
     def get_post_data(self, set_index):
         title =  \
             self.get_text('project/dataset/title', set_index=set_index) or \
@@ -112,5 +338,13 @@ class ZenodoExportProvider(OauthProviderMixin, Export):
             'code': request.GET.get('code')
         }
 
+    def get_refresh_data(self, refresh_token):
+        return {
+            'client_id': self.client_id,
+            'client_secret': self.client_secret,
+            'grant_type': 'refresh_token',
+            'refresh_token': refresh_token
+        }
+
     def get_error_message(self, response):
         return response.json().get('errors')
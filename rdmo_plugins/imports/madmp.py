@@ -1,10 +1,15 @@
 import json
 import mimetypes
 
+from django.core.exceptions import ValidationError
+from django.utils.translation import gettext_lazy as _
 from rdmo.projects.imports import Import
 from rdmo.projects.models import Project, Value
 from rdmo.questions.models import Catalog
 
+from ..options import OptionMap
+from ..validators import validate_json
+
 
 class MaDMPImport(Import):
 
@@ -14,10 +19,7 @@ class MaDMPImport(Import):
         'unknown': '0'
     }
 
-    language_options = {
-        # 'eng': '',
-        # 'deu': ''
-    }
+    language_options = OptionMap('language', 'madmp')
 
     def check(self):
         if mimetypes.guess_type('application/json'):
@@ -29,9 +31,16 @@ class MaDMPImport(Import):
                 return False
 
             if self.dmp:
+                # the file is validated in process, so that the violations are shown to the user
+                self.data = data
                 return True
 
     def process(self):
+        # reject invalid files before any values are processed
+        errors = validate_json('madmp', self.data)
+        if errors:
+            raise ValidationError([_('The file is not a valid maDMP file.')] + errors)
+
         if self.current_project is None:
             self.catalog = Catalog.objects.first()
 
@@ -125,7 +134,7 @@ class MaDMPImport(Import):
             # dmp/dataset/language
             if dmp_dataset.get('language'):
                 attribute = self.get_attribute('https://rdmorganiser.github.io/terms/domain/project/dataset/language')
-                option = self.get_option(self.language_options.get(self.dmp_dataset.get('language')))
+                option = self.get_option(self.language_options.get_uri(dmp_dataset.get('language')))
                 self.values.append(Value(
                     attribute=attribute,
                     set_index=set_index,
@@ -212,7 +221,7 @@ class MaDMPImport(Import):
         if self.dmp.get('language'):
             self.values.append(Value(
                 attribute=self.get_attribute('https://rdmorganiser.github.io/terms/domain/project/language'),
-                option=self.get_option(self.language_options.get(self.dmp.get('language')))
+                option=self.get_option(self.language_options.get_uri(self.dmp.get('language')))
             ))
 
         # dmp/project
@@ -0,0 +1,82 @@
+import hashlib
+import logging
+from functools import lru_cache
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max
+
+from rdmo.projects.models import Project
+
+from ..exports.utils import cache_is_shared
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def check_cache():
+    # the values are saved by the import view of RDMO, after the row lock of the project was released,
+    # so only the reservations in the cache prevent a second import from getting the same set_index,
+    # without a shared cache this is logged once per process
+    if not cache_is_shared():
+        logger.warning('No shared cache is configured in CACHES, concurrent imports into the same project, '
+                       'which are handled by different processes, can get the same set_index.')
+
+
+class SetIndexMixin(object):
+
+    # the values of an import are only saved after the user confirmed them,
+    # so the allocated set_index needs to be reserved until then
+    set_index_reservation_timeout = 3600
+
+    # an object with an allocate(path, count) method, which replaces the allocation below,
+    # e.g. in the import_metadata command, which allocates the set_index for many files at once
+    set_index_allocator = None
+
+    def get_next_set_index(self, path, count=1):
+        if self.set_index_allocator is not None:
+            return self.set_index_allocator.allocate(path, count)
+
+        check_cache()
+
+        # allocate count consecutive set_index for the sets with the given path and return the first one,
+        # the maximum is computed with a single aggregate query and the row of the project is locked
+        # while the allocation is reserved in the cache, so that concurrent imports never collide,
+        # the reservations are only seen by other processes if a shared cache (e.g. Redis or Memcached)
+        # is configured in CACHES, with the default LocMemCache only the imports of one process are safe
+        cache_key = 'rdmo_plugins.set_index.{}.{}'.format(self.current_project.pk, path)
+
+        # process is called again when the import is confirmed, and the keys of the checked values
+        # contain the set_index, so the same upload needs to get the same allocation, the reservation
+        # is bound to the name and the content of the file, so that a different file, which is uploaded
+        # (or imported by import_metadata) with the same name, gets a new set_index
+        import_cache_key = '{}.{}'.format(cache_key, self.get_file_hash())
+
+        with transaction.atomic():
+            Project.objects.select_for_update().only('pk').get(pk=self.current_project.pk)
+
+            values = self.current_project.values.filter(snapshot=None, attribute__path=path)
+
+            # the reservation is dropped once values were saved with it, e.g. if the same file
+            # is imported a second time after the first import was confirmed
+            set_index = cache.get(import_cache_key)
+            if set_index is not None and values.filter(set_index=set_index).exists():
+                set_index = None
+
+            if set_index is None:
+                set_index_max = values.aggregate(Max('set_index'))['set_index__max']
+
+                set_index = 0 if set_index_max is None else set_index_max + 1
+                set_index = max(set_index, cache.get(cache_key, 0))
+
+                cache.set(cache_key, set_index + count, self.set_index_reservation_timeout)
+                cache.set(import_cache_key, set_index, self.set_index_reservation_timeout)
+
+        return set_index
+
+    def get_file_hash(self):
+        file_hash = hashlib.sha1(str(self.file_name).encode())
+        with open(self.file_name, 'rb') as f:
+            for chunk in iter(lambda: f.read(65536), b''):
+                file_hash.update(chunk)
+        return file_hash.hexdigest()
@@ -0,0 +1,48 @@
+from collections import defaultdict
+
+_import_plans = {}
+
+
+# an ImportPlan maps the (namespaced) tags of the top level nodes of a document to the handler
+# methods of an import plugin, it walks the children of the root node once and dispatches every
+# node to its handler, instead of querying the tree with one ElementPath expression per element
+class ImportPlan(object):
+
+    def __init__(self, namespace, handlers):
+        self.prefix = '{{{}}}'.format(namespace) if namespace else ''
+        self.handlers = {self.prefix + tag: handler for tag, handler in handlers.items()}
+
+    def dispatch(self, plugin, root):
+        for node in root:
+            handler = self.handlers.get(node.tag)
+            if handler is not None:
+                getattr(plugin, handler)(node)
+
+    def children(self, node):
+        # group the children of a node by their tag, stripped from the namespace of the plan,
+        # nodes from other namespaces (or comments and processing instructions) are skipped
+        children = NodeChildren()
+        for child in node:
+            if isinstance(child.tag, str) and child.tag.startswith(self.prefix):
+                children[child.tag[len(self.prefix):]].append(child)
+        return children
+
+
+class NodeChildren(defaultdict):
+
+    def __init__(self):
+        super().__init__(list)
+
+    def first(self, tag, **attrib):
+        for node in self.get(tag, []):
+            if all(node.attrib.get(key) == value for key, value in attrib.items()):
+                return node
+
+
+def get_import_plan(plugin_class, namespace):
+    # the compiled plan only depends on the plugin class and the namespace of the document,
+    # so it is created once per process and shared between all instances of the plugin
+    key = (plugin_class, namespace)
+    if key not in _import_plans:
+        _import_plans[key] = ImportPlan(namespace, plugin_class.import_plan)
+    return _import_plans[key]
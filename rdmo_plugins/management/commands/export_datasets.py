@@ -0,0 +1,58 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from rdmo.projects.models import Project
+
+from ...exports.tabular import CSVTableWriter, ParquetTableWriter, get_dataset_rows, get_pyarrow
+
+
+class Command(BaseCommand):
+
+    help = 'Exports the metadata of the datasets of all projects as one table, as CSV or as Parquet file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='Path of the CSV or Parquet file')
+        parser.add_argument('--format', choices=['csv', 'parquet'],
+                            help='Format of the file [default: from the file extension, otherwise csv]')
+        parser.add_argument('--project', type=int, nargs='+', help='Export only the projects with these ids')
+        parser.add_argument('--batch-size', type=int, default=10000,
+                            help='Number of rows per row group of the Parquet file [default: 10000]')
+        parser.add_argument('--delimiter', default=',', help='Delimiter of the CSV file [default: ,]')
+
+    def handle(self, *args, **options):
+        file_format = options['format'] or ('parquet' if options['output'].endswith('.parquet') else 'csv')
+        if file_format == 'parquet' and get_pyarrow() is None:
+            raise CommandError('pyarrow is needed to write Parquet files, please install "rdmo-plugins[parquet]".')
+
+        projects = Project.objects.order_by('id')
+        if options['project']:
+            projects = projects.filter(id__in=options['project'])
+
+        projects_count = rows_count = 0
+        start = time.perf_counter()
+
+        if file_format == 'csv':
+            f = open(options['output'], 'w', newline='')
+            writer = CSVTableWriter(f, delimiter=options['delimiter'])
+        else:
+            f = open(options['output'], 'wb')
+            writer = ParquetTableWriter(f, batch_size=options['batch_size'])
+
+        with f:
+            try:
+                # the projects are loaded one by one, so that only the values of one project are kept in memory
+                for project in projects.iterator():
+                    for row in get_dataset_rows(project):
+                        writer.write(row)
+                        rows_count += 1
+
+                    projects_count += 1
+                    if projects_count % 100 == 0:
+                        self.stdout.write('{} projects, {} datasets'.format(projects_count, rows_count))
+            finally:
+                writer.close()
+
+        self.stdout.write(self.style.SUCCESS('{} datasets of {} projects exported to {} in {:.1f}s'.format(
+            rows_count, projects_count, options['output'], time.perf_counter() - start
+        )))
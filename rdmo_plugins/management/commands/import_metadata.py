@@ -0,0 +1,311 @@
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.contrib.sites.models import Site
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.db.models import Max
+
+from rdmo.core.utils import import_class
+from rdmo.projects.models import Membership, Project
+from rdmo.projects.utils import save_import_values
+
+logger = logging.getLogger(__name__)
+
+import_plugins = [
+    ('datacite', 'rdmo_plugins.imports.datacite.DataCiteImport'),
+    ('radar', 'rdmo_plugins.imports.radar.RadarImport'),
+    ('madmp', 'rdmo_plugins.imports.madmp.MaDMPImport')
+]
+
+# the import plugins load all attributes and options when they are created,
+# so every worker process creates them only once and reuses them for all files
+_plugins = None
+
+
+def init_worker():
+    import django
+    django.setup()
+
+    # the connections of the parent process must not be shared with the workers
+    connections.close_all()
+
+
+def get_plugins():
+    global _plugins
+    if _plugins is None:
+        _plugins = [import_class(class_name)(key, key, class_name) for key, class_name in import_plugins]
+    return _plugins
+
+
+class SetIndexAllocator(object):
+
+    # allocates the set_index for all files of one project as a running offset per path, starting after
+    # the maximum set_index in the database, it is only used by the main process, when the values are saved,
+    # since the reservations in the cache of the import plugins would not be seen by the other files
+    # (e.g. with the DummyCache) or be shared between the worker processes
+    def __init__(self, project):
+        self.project = project
+        self.next_set_index = {}
+
+    def allocate(self, path, count=1):
+        if path not in self.next_set_index:
+            set_index_max = self.project.values.filter(
+                snapshot=None,
+                attribute__path=path
+            ).aggregate(Max('set_index'))['set_index__max']
+
+            self.next_set_index[path] = 0 if set_index_max is None else set_index_max + 1
+
+        set_index = self.next_set_index[path]
+        self.next_set_index[path] += count
+        return set_index
+
+
+class FileSetIndexAllocator(object):
+
+    # allocates the set_index of one file starting at 0 for every path, the files of a project are parsed
+    # concurrently, so the values are moved to the set_index of the project by shift_set_indexes later
+    def __init__(self):
+        self.counts = {}
+
+    def allocate(self, path, count=1):
+        set_index = self.counts.get(path, 0)
+        self.counts[path] = set_index + count
+        return set_index
+
+
+def shift_set_indexes(values, offsets):
+    # the values of a set (e.g. project/dataset/title) are moved by the offset of the path of the set
+    # (e.g. project/dataset/id), the values nested in a set use its set_index as set_prefix
+    set_offsets = {path.rsplit('/', 1)[0] + '/': offset for path, offset in offsets.items()}
+
+    for value in values:
+        if value.attribute is None:
+            continue
+
+        for set_path, offset in set_offsets.items():
+            if value.attribute.path.startswith(set_path):
+                if value.set_prefix:
+                    set_prefix = value.set_prefix.split('|')
+                    set_prefix[0] = str(int(set_prefix[0]) + offset)
+                    value.set_prefix = '|'.join(set_prefix)
+                else:
+                    value.set_index += offset
+                break
+
+
+def parse_file(project_id, file_name):
+    # every file is parsed on its own, so that the files of one project are parsed by all workers,
+    # the set_index is only allocated, when the values are saved by the main process
+    current_project = Project.objects.get(pk=project_id) if project_id else None
+    set_index_allocator = FileSetIndexAllocator() if current_project else None
+
+    try:
+        for plugin in get_plugins():
+            plugin.file_name = file_name
+            plugin.current_project = current_project
+            plugin.set_index_allocator = set_index_allocator
+            plugin.project = None
+            plugin.values = []
+            plugin.snapshots = []
+            plugin.tasks = []
+            plugin.views = []
+
+            if plugin.check():
+                plugin.process()
+                counts = set_index_allocator.counts if set_index_allocator else {}
+                return file_name, plugin.key, plugin.project, plugin.values, counts, None
+        else:
+            return file_name, None, None, [], {}, 'Files of this type cannot be imported.'
+
+    except Exception as e:
+        return file_name, None, None, [], {}, '{}: {}'.format(e.__class__.__name__, e)
+
+
+class Command(BaseCommand):
+
+    help = 'Imports a directory of DataCite, RADAR and maDMP files. ' \
+           'Files in <directory>/<project_id>/ are imported into the project with this id, ' \
+           'other maDMP files create new projects.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', help='Directory with the metadata files')
+        parser.add_argument('--project', type=int, help='Import all files into the project with this id')
+        parser.add_argument('--user', help='Username of the owner of newly created projects')
+        parser.add_argument('--processes', type=int, default=os.cpu_count(),
+                            help='Number of worker processes [default: number of CPUs]')
+        parser.add_argument('--state', help='File to store the progress of the import '
+                                            '[default: <directory>/.import_metadata.json]')
+
+    def handle(self, *args, **options):
+        self.directory = Path(options['directory'])
+        if not self.directory.is_dir():
+            raise CommandError('{} is not a directory.'.format(self.directory))
+
+        self.user = None
+        if options['user']:
+            try:
+                self.user = get_user_model().objects.get(username=options['user'])
+            except get_user_model().DoesNotExist:
+                raise CommandError('A user with the username "{}" was not found.'.format(options['user']))
+
+        self.state_path = Path(options['state']) if options['state'] else self.directory / '.import_metadata.json'
+        self.state = self.read_state()
+
+        groups = self.get_groups(options['project'])
+        total = sum(len(file_names) for file_names in groups.values())
+        skipped = sum(1 for entry in self.state.values() if entry.get('status') == 'imported')
+
+        self.stdout.write('Importing {} files ({} already imported)'.format(total, skipped))
+
+        self.imported = self.failed = self.values = 0
+        start = time.perf_counter()
+
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=options['processes'], initializer=init_worker) as executor:
+            futures = {
+                executor.submit(parse_file, group_key[0], file_name): group_key
+                for group_key, file_names in groups.items() for file_name in file_names
+            }
+
+            # the results are collected per project and saved, once all files of the project were parsed
+            results = {group_key: [] for group_key in groups}
+            for future in as_completed(futures):
+                group_key = futures[future]
+                results[group_key].append(future.result())
+                if len(results[group_key]) < len(groups[group_key]):
+                    continue
+
+                project_id, _ = group_key
+                self.save_results(project_id, sorted(results.pop(group_key), key=lambda result: result[0]))
+                self.write_state()
+
+                done = self.imported + self.failed
+                elapsed = time.perf_counter() - start
+                self.stdout.write('[{}/{}] {:.1f} files/s, {} imported, {} failed'.format(
+                    done, total, done / elapsed, self.imported, self.failed
+                ))
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            '{} files imported, {} failed, {} values in {:.1f}s ({:.1f} files/s, {:.1f} values/s)'.format(
+                self.imported, self.failed, self.values, elapsed,
+                self.imported / elapsed if elapsed else 0, self.values / elapsed if elapsed else 0
+            )
+        ))
+        if self.failed:
+            self.stdout.write(self.style.WARNING(
+                'Run the command again to retry the failed files, see {} for the errors.'.format(self.state_path)
+            ))
+
+    def get_groups(self, project_id):
+        # group the files by target project, files which were imported before are skipped
+        groups = {}
+        for path in sorted(self.directory.rglob('*')):
+            if not path.is_file() or path == self.state_path or path.name.startswith('.'):
+                continue
+
+            relative_path = path.relative_to(self.directory)
+            if self.state.get(str(relative_path), {}).get('status') == 'imported':
+                continue
+
+            if project_id:
+                key = (project_id, None)
+            elif len(relative_path.parts) > 1 and relative_path.parts[0].isdigit():
+                key = (int(relative_path.parts[0]), None)
+            else:
+                # every file without a project creates a new project and gets its own group
+                key = (None, str(relative_path))
+
+            groups.setdefault(key, []).append(str(path))
+
+        return groups
+
+    def save_results(self, project_id, results):
+        errors = {file_name: error for file_name, key, project, values, counts, error in results if error}
+        imported = [
+            (file_name, key, project, values, counts)
+            for file_name, key, project, values, counts, error in results if not error
+        ]
+
+        try:
+            with transaction.atomic():
+                current_project = Project.objects.get(pk=project_id) if project_id else None
+                set_index_allocator = SetIndexAllocator(current_project) if current_project else None
+
+                for file_name, key, project, values, counts in imported:
+                    if current_project is None:
+                        current_project = self.create_project(project)
+
+                    if counts:
+                        shift_set_indexes(values, {
+                            path: set_index_allocator.allocate(path, count) for path, count in counts.items()
+                        })
+
+                    self.save_values(current_project, values)
+        except Exception as e:
+            logger.exception('Import into project %s failed', project_id)
+            errors.update({file_name: '{}: {}'.format(e.__class__.__name__, e) for file_name, *_ in imported})
+            imported = []
+
+        for file_name, key, project, values, counts in imported:
+            self.state[self.get_relative_path(file_name)] = {'status': 'imported', 'plugin': key}
+            self.imported += 1
+            self.values += len(values)
+
+        for file_name, error in errors.items():
+            self.state[self.get_relative_path(file_name)] = {'status': 'failed', 'error': error}
+            self.failed += 1
+            self.stderr.write('{}: {}'.format(file_name, error))
+
+    def create_project(self, project):
+        if project is None:
+            raise CommandError('Only maDMP files can be imported without a project.')
+
+        project.site = Site.objects.get_current()
+        project.save()
+
+        if self.user is not None:
+            Membership.objects.create(project=project, user=self.user, role='owner')
+
+        return project
+
+    def save_values(self, project, values):
+        current_values = {
+            (value.attribute_id, value.set_prefix, value.set_index, value.collection_index): value
+            for value in project.values.filter(snapshot=None)
+        }
+
+        checked = []
+        for value in values:
+            if value.attribute:
+                value.pk = None
+                value.current = current_values.get((value.attribute.id, value.set_prefix,
+                                                    value.set_index, value.collection_index))
+                checked.append('{value.attribute.uri}[{value.set_prefix}][{value.set_index}][{value.collection_index}]'
+                               .format(value=value))
+
+        save_import_values(project, values, checked)
+
+    def get_relative_path(self, file_name):
+        return str(Path(file_name).relative_to(self.directory))
+
+    def read_state(self):
+        try:
+            with self.state_path.open() as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def write_state(self):
+        # write to a temporary file first, so that an interrupted run never leaves a broken state file
+        tmp_path = self.state_path.with_name(self.state_path.name + '.tmp')
+        with tmp_path.open('w') as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
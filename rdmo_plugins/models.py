@@ -0,0 +1,50 @@
+import uuid
+
+from django.conf import settings
+from django.db import models
+from django.utils.timezone import now
+from django.utils.translation import gettext_lazy as _
+
+from rdmo.projects.models import Project
+
+
+class PublishingJob(models.Model):
+
+    # a job of the background worker in rdmo_plugins.exports.publishing, the jobs are stored in the database,
+    # so that they are shared by all processes and survive a restart of the process, which runs them
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (QUEUED, _('queued')),
+        (RUNNING, _('running')),
+        (SENT, _('sent')),
+        (FAILED, _('failed'))
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    provider_key = models.CharField(max_length=128)
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='+')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    language_code = models.CharField(max_length=16)
+    set_indexes = models.JSONField(default=list)
+    options = models.JSONField(default=dict)
+    status = models.CharField(max_length=8, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.IntegerField(default=0)
+    next_attempt = models.DateTimeField(default=now)
+    datasets = models.JSONField(default=list)
+    error = models.TextField(blank=True, null=True)
+    created = models.DateTimeField(default=now)
+    updated = models.DateTimeField(default=now)
+
+    class Meta:
+        ordering = ('-created', )
+        indexes = [
+            models.Index(fields=['status', 'next_attempt']),
+            models.Index(fields=['provider_key', 'project', 'created'])
+        ]
+
+    def __str__(self):
+        return '{} {} {}'.format(self.provider_key, self.project_id, self.status)
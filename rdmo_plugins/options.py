@@ -0,0 +1,72 @@
+import json
+import os
+from functools import lru_cache
+
+options_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'json', 'options.json')
+
+
+class OptionMap(object):
+
+    # maps the options of an option set (e.g. the contributor types) to the codes of a scheme
+    # (e.g. 'datacite' or 'radar') and back, the maps are compiled from options.json when they are
+    # used for the first time and then shared between all exports and imports of the process
+    def __init__(self, option_set, scheme):
+        self.option_set = option_set
+        self.scheme = scheme
+
+    @property
+    def maps(self):
+        return get_option_maps(self.option_set, self.scheme)
+
+    def get(self, path, default=None):
+        # the code for the path of an option, so that the map can be used like the dicts before
+        return self.maps['path_to_code'].get(path, default)
+
+    def get_code(self, uri, default=None):
+        return self.maps['uri_to_code'].get(uri, default)
+
+    def get_path(self, code, default=None):
+        return self.maps['code_to_path'].get(code, default)
+
+    def get_uri(self, code, default=None):
+        return self.maps['code_to_uri'].get(code, default)
+
+
+@lru_cache(maxsize=None)
+def get_options():
+    with open(options_path) as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=None)
+def get_option_maps(option_set, scheme):
+    options = get_options()[option_set]
+
+    maps = {
+        'path_to_code': {},
+        'uri_to_code': {},
+        'code_to_path': {},
+        'code_to_uri': {}
+    }
+
+    for path, codes in options['options'].items():
+        codes = codes.get(scheme)
+        if codes is None:
+            continue
+        elif not isinstance(codes, list):
+            codes = [codes]
+
+        # the first code is used by the exports (null if the option can not be exported),
+        # the other codes are alternative spellings, which are accepted by the imports as well
+        uri = options['uri_prefix'] + path
+        if codes[0] is not None:
+            maps['path_to_code'][path] = codes[0]
+            maps['uri_to_code'][uri] = codes[0]
+
+        for code in codes:
+            if code is not None:
+                # if several options share a code, the first one is used for the import
+                maps['code_to_path'].setdefault(code, path)
+                maps['code_to_uri'].setdefault(code, uri)
+
+    return maps
@@ -0,0 +1,178 @@
+import json
+import logging
+import os
+from functools import lru_cache
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+schema_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'xml', 'schemas')
+
+# the DataCite schema is included in the package, the RADAR schema is not publicly available
+# and RADAR documents are only validated if the path to the schema is set in PLUGINS_XML_SCHEMAS
+xml_schemas = {
+    'datacite': os.path.join(schema_dir, 'datacite', 'kernel-4.3', 'metadata.xsd')
+}
+
+# the schema of the RDA DMP Common Standard is not included either, maDMP documents
+# are only validated if the path to the schema is set in PLUGINS_JSON_SCHEMAS,
+# if PLUGINS_VALIDATION is enabled without it, a warning is logged once per process
+json_schemas = {}
+
+
+def validation_enabled():
+    return getattr(settings, 'PLUGINS_VALIDATION', False)
+
+
+@lru_cache(maxsize=None)
+def get_etree():
+    # lxml and jsonschema are only imported when a document is validated for the first time,
+    # so that they are not loaded by every process, which imports the plugins
+    try:
+        from lxml import etree
+        return etree
+    except ImportError:
+        return None
+
+
+@lru_cache(maxsize=None)
+def get_jsonschema():
+    try:
+        import jsonschema
+        return jsonschema
+    except ImportError:
+        return None
+
+
+@lru_cache(maxsize=None)
+def get_xml_schema(key):
+    # the schema is parsed and compiled only once per process,
+    # None is cached as well, so that a missing schema is only reported once
+    schema_path = getattr(settings, 'PLUGINS_XML_SCHEMAS', {}).get(key, xml_schemas.get(key))
+    if schema_path is None:
+        logger.warning('PLUGINS_VALIDATION is enabled, but no %s schema is configured in PLUGINS_XML_SCHEMAS, '
+                       '%s documents will not be validated.', key, key)
+        return None
+
+    etree = get_etree()
+    if etree is None:
+        logger.warning('lxml is not installed, %s documents will not be validated.', key)
+        return None
+
+    try:
+        # the parser must not load anything from the network, included schemas are resolved locally
+        parser = etree.XMLParser(no_network=True, resolve_entities=False)
+        return etree.XMLSchema(etree.parse(schema_path, parser))
+    except (OSError, etree.XMLSyntaxError, etree.XMLSchemaParseError) as e:
+        logger.warning('The %s schema at %s could not be loaded: %s', key, schema_path, e)
+        return None
+
+
+def get_xml_errors(schema, document):
+    # assertValid is used instead of validate, since the error_log
+    # of the schema is shared between threads, but the one of the exception is not
+    try:
+        schema.assertValid(document)
+        return []
+    except get_etree().DocumentInvalid as e:
+        return ['Line {}: {}'.format(error.line, error.message) for error in e.error_log]
+
+
+def validate_xml(key, xml):
+    if not validation_enabled():
+        return []
+
+    schema = get_xml_schema(key)
+    if schema is None:
+        return []
+
+    etree = get_etree()
+
+    if isinstance(xml, str):
+        xml = xml.encode()
+
+    try:
+        parser = etree.XMLParser(no_network=True, resolve_entities=False)
+        document = etree.fromstring(xml, parser)
+    except etree.XMLSyntaxError as e:
+        return [str(e)]
+
+    return get_xml_errors(schema, document)
+
+
+def validate_xml_file(key, file_name):
+    if not validation_enabled():
+        return []
+
+    schema = get_xml_schema(key)
+    if schema is None:
+        return []
+
+    etree = get_etree()
+
+    try:
+        parser = etree.XMLParser(no_network=True, resolve_entities=False)
+        document = etree.parse(file_name, parser)
+    except (OSError, etree.XMLSyntaxError) as e:
+        return [str(e)]
+
+    return get_xml_errors(schema, document)
+
+
+@lru_cache(maxsize=None)
+def get_json_validator(key):
+    # the schema is loaded and checked only once per process, the validator is reused for every document
+    schema_path = getattr(settings, 'PLUGINS_JSON_SCHEMAS', {}).get(key, json_schemas.get(key))
+    if schema_path is None:
+        logger.warning('PLUGINS_VALIDATION is enabled, but no %s schema is configured in PLUGINS_JSON_SCHEMAS, '
+                       '%s documents will not be validated.', key, key)
+        return None
+
+    jsonschema = get_jsonschema()
+    if jsonschema is None:
+        logger.warning('jsonschema is not installed, %s documents will not be validated.', key)
+        return None
+
+    try:
+        with open(schema_path) as f:
+            schema = json.load(f)
+
+        validator_class = jsonschema.validators.validator_for(schema)
+        validator_class.check_schema(schema)
+        return validator_class(schema)
+    except (OSError, ValueError, jsonschema.SchemaError) as e:
+        logger.warning('The %s schema at %s could not be loaded: %s', key, schema_path, e)
+        return None
+
+
+def validate_json(key, data):
+    if not validation_enabled():
+        return []
+
+    validator = get_json_validator(key)
+    if validator is None:
+        return []
+
+    return [
+        '{}: {}'.format('/'.join(str(part) for part in error.absolute_path) or '/', error.message)
+        for error in sorted(validator.iter_errors(data), key=lambda error: list(map(str, error.absolute_path)))
+    ]
+
+
+def render_validation_errors(validation_errors):
+    lines = []
+    for file_name, errors in validation_errors.items():
+        lines.append('{}:'.format(file_name))
+        lines += ['    {}'.format(error) for error in errors]
+        lines.append('')
+    return '\n'.join(lines)
+
+
+def add_validation_header(response, validation_errors):
+    # invalid documents are still exported, the number of violations is sent in a header,
+    # so that they can be recognized, e.g. by scripts which download the exports
+    count = sum(len(errors) for errors in validation_errors.values())
+    if count:
+        response['X-Validation-Errors'] = count
+    return response
@@ -25,5 +25,11 @@ setup(
         'Programming Language :: Python :: 3.5'
     ],
     packages=find_packages(),
-    include_package_data=True
+    include_package_data=True,
+    extras_require={
+        'validation': ['jsonschema', 'lxml'],
+        'tokens': ['cryptography'],
+        'parquet': ['pyarrow'],
+        'tests': ['pytest', 'pytest-django']
+    }
 )
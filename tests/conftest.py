@@ -0,0 +1,111 @@
+import re
+from pathlib import Path
+
+import pytest
+
+from django.core.cache import cache
+
+from rdmo.domain.models import Attribute
+from rdmo.options.models import Option
+from rdmo.projects.models import Project
+from rdmo.questions.models import Catalog
+
+from rdmo_plugins.options import get_options
+
+fixtures_dir = Path(__file__).parent / 'fixtures'
+plugins_dir = Path(__file__).parent.parent / 'rdmo_plugins'
+
+attribute_uri_prefix = 'https://rdmorganiser.github.io/terms'
+
+
+def get_attribute_paths():
+    # all attribute paths, which are used in the exports and imports of the plugins
+    paths = set()
+    for file_path in plugins_dir.rglob('*.py'):
+        for path in re.findall(r'[\'/](project/[a-z_/]+)', file_path.read_text()):
+            paths.add(path.rstrip('/'))
+    return sorted(paths)
+
+
+def create_attribute(path):
+    parent = None
+    for key in path.split('/'):
+        parent, created = Attribute.objects.get_or_create(uri_prefix=attribute_uri_prefix, key=key, parent=parent)
+    return parent
+
+
+def create_option(uri):
+    uri_prefix, uri_path = uri.split('/options/', 1)
+    option, created = Option.objects.get_or_create(uri_prefix=uri_prefix, uri_path=uri_path)
+    return option
+
+
+def serialize_values(values):
+    # the fields of the values, which are relevant for the import, in a stable order
+    return sorted([
+        [
+            value.attribute.uri if value.attribute else None,
+            value.set_prefix,
+            value.set_index,
+            value.collection_index,
+            value.text or '',
+            value.option.uri if value.option else None,
+            value.value_type
+        ] for value in values
+    ], key=lambda value: [str(field) for field in value])
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # the set_index reservations and the provider state are kept in the cache
+    cache.clear()
+
+
+@pytest.fixture
+def attributes(db):
+    return {path: create_attribute(path) for path in get_attribute_paths()}
+
+
+@pytest.fixture
+def options(db):
+    options = {}
+    for option_set in get_options().values():
+        for path in option_set['options']:
+            uri = option_set['uri_prefix'] + path
+            options[uri] = create_option(uri)
+    return options
+
+
+@pytest.fixture
+def project(db):
+    catalog = Catalog.objects.create(uri_prefix=attribute_uri_prefix, uri_path='catalog')
+    return Project.objects.create(title='Example project', catalog=catalog)
+
+
+@pytest.fixture
+def providers(settings):
+    settings.RADAR_PROVIDER = {
+        'radar_url': 'https://radar.example.org',
+        'client_id': 'radar-client',
+        'client_secret': 'radar-secret',
+        'redirect_uri': 'https://rdmo.example.org/services/oauth/radar/callback/',
+        'store_tokens': False,
+        'circuit_threshold': 2
+    }
+    settings.ZENODO_PROVIDER = {
+        'zenodo_url': 'https://zenodo.example.org',
+        'client_id': 'zenodo-client',
+        'client_secret': 'zenodo-secret',
+        'store_tokens': False,
+        'circuit_threshold': 2
+    }
+
+
+@pytest.fixture
+def http_request(rf, django_user_model):
+    # a request with a user and a plain dict as session, like the one which is passed to the plugins
+    request = rf.get('/')
+    request.user = django_user_model.objects.create_user('user', 'user@example.org', 'password')
+    request.session = {}
+    request.LANGUAGE_CODE = 'en'
+    return request
@@ -0,0 +1,20 @@
+import os
+import tempfile
+
+from rdmo.core.settings import *  # noqa: F401, F403
+
+SECRET_KEY = 'this is not a very secret key'
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:'
+    }
+}
+
+INSTALLED_APPS = ['rdmo_plugins'] + INSTALLED_APPS  # noqa: F405
+
+STATIC_ROOT = os.path.join(tempfile.gettempdir(), 'rdmo-plugins-tests', 'static')
+MEDIA_ROOT = os.path.join(tempfile.gettempdir(), 'rdmo-plugins-tests', 'media')
+
+ROOT_URLCONF = 'rdmo.core.urls'
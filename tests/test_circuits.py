@@ -0,0 +1,90 @@
+import pytest
+import requests
+
+from rdmo_plugins.exports.circuits import CircuitBreaker
+from rdmo_plugins.exports.radar import RadarExportProvider
+from rdmo_plugins.exports.zenodo import ZenodoExportProvider
+
+
+class Session(object):
+
+    # records the requests and fails with a connection error, like a service which is down
+    def __init__(self):
+        self.requests = []
+
+    def request(self, method, url, **kwargs):
+        self.requests.append((method, url))
+        raise requests.ConnectionError('connection refused')
+
+
+@pytest.fixture
+def session(monkeypatch):
+    session = Session()
+    monkeypatch.setattr('rdmo_plugins.exports.mixins.OauthSessionProviderMixin.get_session', lambda self, url: session)
+    monkeypatch.setattr('rdmo_plugins.exports.zenodo.get_session', lambda url, **kwargs: session)
+    return session
+
+
+@pytest.fixture
+def radar(providers, http_request, monkeypatch):
+    provider = RadarExportProvider('radar', 'RADAR', 'rdmo_plugins.exports.radar.RadarExportProvider')
+    provider.request = http_request
+    monkeypatch.setattr(provider, 'get_access_token', lambda request: 'token')
+    return provider
+
+
+@pytest.fixture
+def zenodo(providers, http_request, monkeypatch):
+    provider = ZenodoExportProvider('zenodo', 'Zenodo', 'rdmo_plugins.exports.zenodo.ZenodoExportProvider')
+    provider.request = http_request
+    monkeypatch.setattr(provider, 'get_access_token', lambda request: 'token')
+    return provider
+
+
+def test_circuit_breaker():
+    circuit_breaker = CircuitBreaker('https://radar.example.org/radar/api', threshold=2)
+    assert circuit_breaker.allow()
+
+    circuit_breaker.failure()
+    circuit_breaker.failure()
+    assert not circuit_breaker.allow()
+
+
+def test_circuit_breaker_success():
+    # a success resets the failures, so that only failures which follow each other open the circuit
+    circuit_breaker = CircuitBreaker('https://radar.example.org/radar/api', threshold=2)
+
+    circuit_breaker.failure()
+    circuit_breaker.success()
+    circuit_breaker.failure()
+    assert circuit_breaker.allow()
+
+    circuit_breaker.failure()
+    assert not circuit_breaker.allow()
+
+
+def test_load_workspace_choices(radar, http_request, session):
+    # the failures of the requests for the workspaces open the circuit, after that no request is sent
+    assert radar.load_workspace_choices(http_request) is None
+    assert radar.load_workspace_choices(http_request) is None
+    assert radar.load_workspace_choices(http_request) is None
+    assert len(session.requests) == 2
+
+
+def test_refresh_tokens(radar, session):
+    tokens = {'access_token': 'token', 'refresh_token': 'refresh'}
+    assert radar.refresh_tokens('tokens', tokens) is None
+    assert radar.refresh_tokens('tokens', tokens) is None
+    assert radar.refresh_tokens('tokens', tokens) is None
+    assert len(session.requests) == 2
+
+
+def test_upload_files(zenodo, http_request, session):
+    bucket_url = 'https://zenodo.example.org/api/files/bucket'
+    buckets = [(bucket_url, {'xml': ('dataset.xml', '<resource/>'), 'values': []})] * 3
+
+    zenodo.provider_settings['max_workers'] = 1
+    errors = zenodo.upload_files(http_request, buckets)
+    assert len(session.requests) == 2
+    assert 'connection refused' in errors[0][0]
+    assert 'not available' in errors[2][0]
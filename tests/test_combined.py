@@ -0,0 +1,50 @@
+import pytest
+
+from rdmo_plugins.exports import combined
+from rdmo_plugins.exports.combined import CombinedExportProvider
+from rdmo_plugins.exports.radar import RadarExportProvider
+from rdmo_plugins.exports.zenodo import ZenodoExportProvider
+
+
+@pytest.fixture
+def provider(providers, attributes, project, rf, http_request, monkeypatch):
+    project.values.create(attribute=attributes['project/dataset/id'], set_index=0, text='Dataset')
+
+    radar = RadarExportProvider('radar', 'RADAR', 'rdmo_plugins.exports.radar.RadarExportProvider')
+    zenodo = ZenodoExportProvider('zenodo', 'Zenodo', 'rdmo_plugins.exports.zenodo.ZenodoExportProvider')
+
+    provider = CombinedExportProvider('combined', 'Combined', 'rdmo_plugins.exports.combined.CombinedExportProvider')
+    provider.project = project
+    provider.snapshot = None
+    provider.request = rf.post('/', {'datasets': ['0']})
+    provider.request.user = http_request.user
+    provider.request.session = {}
+    provider.request.LANGUAGE_CODE = 'en'
+
+    # the targets are set up like in get_targets, without PROJECT_EXPORTS
+    for target in [radar, zenodo]:
+        target.request = provider.request
+        target.project = project
+        target.snapshot = None
+    monkeypatch.setattr(provider, 'get_targets', lambda: [radar, zenodo])
+
+    # the templates are not rendered, only the context is returned
+    monkeypatch.setattr(combined, 'render', lambda request, template, context, status: context)
+    return provider, radar, zenodo
+
+
+def test_submit_workspaces_missing(provider, monkeypatch):
+    provider, radar, zenodo = provider
+
+    # RADAR is authorized, but the workspaces could not be loaded (e.g. RADAR is down)
+    monkeypatch.setattr(radar, 'get_access_token', lambda request: 'token')
+    monkeypatch.setattr(radar, 'load_workspace_choices', lambda request: None)
+    monkeypatch.setattr(radar, 'prepare_requests', lambda set_indexes, options: pytest.fail('RADAR was not skipped'))
+    monkeypatch.setattr(zenodo, 'get_access_token', lambda request: None)
+
+    context = provider.submit()
+    radar_result, zenodo_result = context['targets']
+    assert radar_result['error'] == 'The workspaces could not be loaded from RADAR, please try again later.'
+    assert radar_result['datasets'] == []
+    assert zenodo_result['error'].startswith('RDMO is not authorized for this repository yet')
+    assert zenodo_result['url'] == '/projects/{}/export/zenodo/'.format(provider.project.id)
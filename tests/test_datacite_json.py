@@ -0,0 +1,232 @@
+import json
+
+import pytest
+
+from django.http import Http404
+
+from rdmo_plugins.exports.datacite import DataCiteJSONExport
+
+# a dataset, as it is computed by DataCiteExport.get_dataset, with the content of fixtures/datacite.xml
+dataset = {
+    'file_name': '10.5072/example.1234.xml',
+    'identifier': '10.5072/example.1234',
+    'identifierType': 'DOI',
+    'creators': [{
+        'name': 'Doe, Jane',
+        'nameType': 'Personal',
+        'givenName': 'Jane',
+        'familyName': 'Doe',
+        'nameIdentifier': '0000-0002-1825-0097',
+        'nameIdentifierScheme': 'ORCID',
+        'affiliations': [{'affiliation': 'University of Examples'}, {'affiliation': 'Institute of Samples'}]
+    }, {
+        'name': 'Example Research Group',
+        'nameType': 'Organizational'
+    }],
+    'titles': [{'title': 'Measurements of the example'}],
+    'publisher': 'Example Data Repository',
+    'publicationYear': '2021',
+    'subjects': [{'subject': 'Computer Science'}, {'subject': 'Physics'}],
+    'contributors': [{
+        'name': 'Roe, Richard',
+        'nameType': 'Personal',
+        'contributorType': 'DataCurator',
+        'nameIdentifier': '0000-0001-5109-3700',
+        'nameIdentifierScheme': 'ORCID',
+        'affiliations': [{'affiliation': 'University of Examples'}]
+    }, {
+        'name': 'Example Computing Centre',
+        'nameType': 'Organizational',
+        'contributorType': 'HostingInstitution',
+        'nameIdentifier': 'https://ror.org/05qj6w324',
+        'nameIdentifierScheme': 'ROR'
+    }],
+    'created': '2020-03-01',
+    'issued': '2021-01-15',
+    'language': 'en-US',
+    'resourceType': 'Measurements',
+    'resourceTypeGeneral': 'Dataset',
+    'alternateIdentifiers': [{
+        'alternateIdentifier': 'https://example.org/datasets/1234',
+        'alternateIdentifierType': 'URL'
+    }],
+    'relatedIdentifiers': [{
+        'relatedIdentifier': '10.5072/example.article',
+        'relatedIdentifierType': 'DOI',
+        'relationType': 'IsSupplementTo'
+    }],
+    'rightsList': [{
+        'rights': 'Creative Commons Attribution 4.0 International',
+        'rightsURI': 'https://creativecommons.org/licenses/by/4.0/'
+    }],
+    'descriptions': [{
+        'description': 'Measurements of the example, taken in 2020.',
+        'descriptionType': 'Abstract'
+    }],
+    'fundingReferences': [{
+        'funderName': 'Example Research Foundation',
+        'funderIdentifier': 'https://ror.org/018mejw64',
+        'funderIdentifierType': 'ROR',
+        'awardNumber': 'EX-42',
+        'awardURI': 'https://example.org/awards/42',
+        'awardTitle': 'Measuring examples'
+    }, {
+        'funderName': 'Example Ministry'
+    }]
+}
+
+# the same dataset in the JSON format of the DataCite REST API
+data_attributes = {
+    'doi': '10.5072/example.1234',
+    'identifiers': [{'identifier': '10.5072/example.1234', 'identifierType': 'DOI'}],
+    'creators': [{
+        'name': 'Doe, Jane',
+        'nameType': 'Personal',
+        'givenName': 'Jane',
+        'familyName': 'Doe',
+        'affiliation': [{'name': 'University of Examples'}, {'name': 'Institute of Samples'}],
+        'nameIdentifiers': [{
+            'nameIdentifier': '0000-0002-1825-0097',
+            'nameIdentifierScheme': 'ORCID',
+            'schemeUri': 'https://orcid.org'
+        }]
+    }, {
+        'name': 'Example Research Group',
+        'nameType': 'Organizational'
+    }],
+    'titles': [{'title': 'Measurements of the example'}],
+    'publisher': 'Example Data Repository',
+    'publicationYear': '2021',
+    'subjects': [{'subject': 'Computer Science'}, {'subject': 'Physics'}],
+    'contributors': [{
+        'name': 'Roe, Richard',
+        'nameType': 'Personal',
+        'contributorType': 'DataCurator',
+        'affiliation': [{'name': 'University of Examples'}],
+        'nameIdentifiers': [{
+            'nameIdentifier': '0000-0001-5109-3700',
+            'nameIdentifierScheme': 'ORCID',
+            'schemeUri': 'https://orcid.org'
+        }]
+    }, {
+        'name': 'Example Computing Centre',
+        'nameType': 'Organizational',
+        'contributorType': 'HostingInstitution',
+        'nameIdentifiers': [{
+            'nameIdentifier': 'https://ror.org/05qj6w324',
+            'nameIdentifierScheme': 'ROR',
+            'schemeUri': 'https://ror.org/'
+        }]
+    }],
+    'dates': [{'date': '2020-03-01', 'dateType': 'Created'}, {'date': '2021-01-15', 'dateType': 'Issued'}],
+    'language': 'en-US',
+    'types': {'resourceType': 'Measurements', 'resourceTypeGeneral': 'Dataset'},
+    'alternateIdentifiers': [{
+        'alternateIdentifier': 'https://example.org/datasets/1234',
+        'alternateIdentifierType': 'URL'
+    }],
+    'relatedIdentifiers': [{
+        'relatedIdentifier': '10.5072/example.article',
+        'relatedIdentifierType': 'DOI',
+        'relationType': 'IsSupplementTo'
+    }],
+    'rightsList': [{
+        'rights': 'Creative Commons Attribution 4.0 International',
+        'rightsUri': 'https://creativecommons.org/licenses/by/4.0/'
+    }],
+    'descriptions': [{
+        'description': 'Measurements of the example, taken in 2020.',
+        'descriptionType': 'Abstract'
+    }],
+    'fundingReferences': [{
+        'funderName': 'Example Research Foundation',
+        'funderIdentifier': 'https://ror.org/018mejw64',
+        'funderIdentifierType': 'ROR',
+        'awardNumber': 'EX-42',
+        'awardUri': 'https://example.org/awards/42',
+        'awardTitle': 'Measuring examples'
+    }, {
+        'funderName': 'Example Ministry'
+    }],
+    'schemaVersion': 'http://datacite.org/schema/kernel-4'
+}
+
+
+@pytest.fixture
+def export(attributes, project):
+    export = DataCiteJSONExport('datacite-json', 'DataCite JSON', None)
+    export.project = project
+    export.snapshot = None
+    return export
+
+
+@pytest.fixture
+def datasets(attributes, project):
+    for set_index, title in enumerate(['First dataset', 'Second dataset']):
+        project.values.create(attribute=attributes['project/dataset/id'], set_index=set_index, text=title)
+
+
+def test_get_data(export):
+    assert export.get_data(dataset) == {'type': 'dois', 'attributes': data_attributes}
+
+
+def test_get_data_empty(export):
+    # empty values are left out, and only DOIs are set as doi
+    data = export.get_data({
+        'identifier': 'dataset',
+        'identifierType': 'OTHER',
+        'titles': [{'title': 'Dataset'}],
+        'creators': [{'name': 'Example Research Group', 'nameType': 'Organizational', 'affiliations': []}],
+        'publisher': '',
+        'language': None
+    })
+    assert data == {'type': 'dois', 'attributes': {
+        'identifiers': [{'identifier': 'dataset', 'identifierType': 'OTHER'}],
+        'creators': [{'name': 'Example Research Group', 'nameType': 'Organizational'}],
+        'titles': [{'title': 'Dataset'}],
+        'schemaVersion': 'http://datacite.org/schema/kernel-4'
+    }}
+
+
+def test_render(export, datasets):
+    # without a request, e.g. in a management command, the datasets are written into one response
+    response = export.render()
+    assert response['Content-Type'] == 'application/vnd.api+json'
+    assert response['Content-Disposition'] == 'filename="Example project.json"'
+    assert [data['attributes']['titles'] for data in json.loads(response.content)['data']] == [
+        [{'title': 'First dataset'}],
+        [{'title': 'Second dataset'}]
+    ]
+
+
+def test_render_streaming(export, datasets, rf):
+    export.request = rf.get('/')
+
+    response = export.render()
+    assert response.streaming
+    assert len(json.loads(b''.join(response.streaming_content))['data']) == 2
+
+
+def test_render_set_index(export, datasets, rf):
+    export.request = rf.get('/', {'set_index': '1'})
+
+    response = export.render()
+    assert response['Content-Disposition'] == 'filename="Second dataset.json"'
+    assert json.loads(response.content)['data']['attributes']['titles'] == [{'title': 'Second dataset'}]
+
+
+def test_render_set_index_missing(export, datasets, rf):
+    export.request = rf.get('/', {'set_index': '2'})
+
+    with pytest.raises(Http404):
+        export.render()
+
+
+def test_rights(export, attributes, options, project):
+    # the URI of the license is taken from the option of the value
+    option = options['https://rdmorganiser.github.io/terms/options/dataset_license_types/71']
+    project.values.create(attribute=attributes['project/dataset/id'], set_index=0, text='Dataset')
+    project.values.create(attribute=attributes['project/dataset/sharing/conditions'], set_index=0, option=option)
+
+    data = export.get_data(export.get_dataset(0))
+    assert data['attributes']['rightsList'] == [{'rightsUri': 'https://creativecommons.org/licenses/by/4.0/'}]
@@ -0,0 +1,163 @@
+import json
+from concurrent.futures import Future
+from io import StringIO
+
+import pytest
+
+from django.core.management import call_command
+
+from rdmo.projects.models import Value
+
+from rdmo_plugins.management.commands import import_metadata
+
+from .conftest import fixtures_dir
+
+
+@pytest.fixture(autouse=True)
+def plugins():
+    # the plugins are cached per process, but load the attributes and options of the database of the test
+    import_metadata._plugins = None
+    yield
+    import_metadata._plugins = None
+
+
+@pytest.fixture
+def serial_executor(monkeypatch):
+    # the files are parsed in the process of the test, since the workers would not see the test database
+    monkeypatch.setattr(import_metadata, 'ProcessPoolExecutor', SerialExecutor)
+
+
+@pytest.fixture
+def dummy_cache(settings):
+    settings.CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache'
+        }
+    }
+
+
+class SerialExecutor(object):
+
+    def __init__(self, max_workers=None, initializer=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+def get_command(tmp_path):
+    command = import_metadata.Command()
+    command.directory = tmp_path
+    command.state = {}
+    command.imported = command.failed = command.values = 0
+    return command
+
+
+def import_files(tmp_path, project):
+    stdout = StringIO()
+    call_command('import_metadata', str(tmp_path), project=project.id, processes=1, stdout=stdout, stderr=StringIO())
+    return stdout.getvalue()
+
+
+def create_files(tmp_path, count):
+    # files with the same content, which are all imported into the same project
+    xml = (fixtures_dir / 'datacite.xml').read_text()
+    file_names = []
+    for i in range(count):
+        path = tmp_path / 'dataset-{}.xml'.format(i)
+        path.write_text(xml)
+        file_names.append(str(path))
+    return file_names
+
+
+def get_set_indexes(values, path):
+    return sorted(value.set_index for value in values if value.attribute and value.attribute.path == path)
+
+
+def test_parse_file(dummy_cache, attributes, options, project, tmp_path):
+    Value.objects.create(project=project, attribute=attributes['project/dataset/id'], set_index=0)
+
+    # every file is parsed on its own, so the set_index starts at 0 and the number of sets is returned
+    file_name, key, _, values, counts, error = import_metadata.parse_file(project.id, create_files(tmp_path, 1)[0])
+    assert (key, error) == ('datacite', None)
+    assert counts == {'project/dataset/id': 1, 'project/funder/id': 2}
+    assert get_set_indexes(values, 'project/dataset/id') == [0]
+
+
+def test_save_results(dummy_cache, attributes, options, project, tmp_path):
+    Value.objects.create(project=project, attribute=attributes['project/dataset/id'], set_index=0)
+    Value.objects.create(project=project, attribute=attributes['project/funder/id'], set_index=4)
+
+    results = [import_metadata.parse_file(project.id, file_name) for file_name in create_files(tmp_path, 3)]
+    get_command(tmp_path).save_results(project.id, results)
+
+    # without a shared cache, every file still gets its own dataset and funders
+    values = list(project.values.select_related('attribute'))
+    assert get_set_indexes(values, 'project/dataset/id') == [0, 1, 2, 3]
+    assert get_set_indexes(values, 'project/funder/id') == [4, 5, 6, 7, 8, 9, 10]
+
+    # the values nested in a dataset are moved together with the dataset
+    assert sorted({value.set_prefix for value in values if value.attribute.path == 'project/dataset/creator/name'}) \
+        == ['1', '2', '3']
+
+
+def test_handle(serial_executor, dummy_cache, attributes, options, project, tmp_path):
+    create_files(tmp_path, 3)
+
+    stdout = import_files(tmp_path, project)
+    assert '3 files imported, 0 failed' in stdout
+    assert get_set_indexes(project.values.select_related('attribute'), 'project/dataset/id') == [0, 1, 2]
+
+    state = json.loads((tmp_path / '.import_metadata.json').read_text())
+    assert state == {
+        'dataset-{}.xml'.format(i): {'status': 'imported', 'plugin': 'datacite'} for i in range(3)
+    }
+
+
+def test_handle_resume(serial_executor, dummy_cache, attributes, options, project, tmp_path):
+    create_files(tmp_path, 2)
+    import_files(tmp_path, project)
+
+    # the files, which were imported before, are skipped, new files are imported
+    create_files(tmp_path, 3)
+    stdout = import_files(tmp_path, project)
+    assert 'Importing 1 files (2 already imported)' in stdout
+    assert '1 files imported, 0 failed' in stdout
+    assert get_set_indexes(project.values.select_related('attribute'), 'project/dataset/id') == [0, 1, 2]
+
+
+def test_handle_rollback(serial_executor, dummy_cache, attributes, options, project, tmp_path, monkeypatch):
+    create_files(tmp_path, 3)
+
+    # the values of the second file can not be saved, so none of the files of the project are imported
+    save_values = import_metadata.Command.save_values
+    calls = []
+
+    def failing_save_values(self, project, values):
+        calls.append(project)
+        if len(calls) == 2:
+            raise ValueError('The values could not be saved.')
+        save_values(self, project, values)
+
+    monkeypatch.setattr(import_metadata.Command, 'save_values', failing_save_values)
+    stdout = import_files(tmp_path, project)
+    assert '0 files imported, 3 failed' in stdout
+    assert not project.values.exists()
+
+    state = json.loads((tmp_path / '.import_metadata.json').read_text())
+    assert {entry['status'] for entry in state.values()} == {'failed'}
+    assert state['dataset-0.xml']['error'] == 'ValueError: The values could not be saved.'
+
+    # the failed files are retried, when the command is run again
+    monkeypatch.setattr(import_metadata.Command, 'save_values', save_values)
+    stdout = import_files(tmp_path, project)
+    assert '3 files imported, 0 failed' in stdout
+    assert get_set_indexes(project.values.select_related('attribute'), 'project/dataset/id') == [0, 1, 2]
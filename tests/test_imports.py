@@ -0,0 +1,25 @@
+import json
+
+import pytest
+
+from rdmo_plugins.imports.datacite import DataCiteImport
+from rdmo_plugins.imports.radar import RadarImport
+
+from .conftest import fixtures_dir, serialize_values
+
+
+@pytest.mark.parametrize('import_class,file_name', [
+    (DataCiteImport, 'datacite'),
+    (RadarImport, 'radar')
+])
+def test_import(attributes, options, project, import_class, file_name):
+    import_plugin = import_class('import', 'Import', None)
+    import_plugin.current_project = project
+    import_plugin.file_name = str(fixtures_dir / '{}.xml'.format(file_name))
+
+    assert import_plugin.check()
+    import_plugin.process()
+
+    # the values were created with the imports before the import plans were used
+    with open(fixtures_dir / '{}_values.json'.format(file_name)) as f:
+        assert serialize_values(import_plugin.values) == json.load(f)
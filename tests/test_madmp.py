@@ -0,0 +1,158 @@
+import io
+import json
+import zipfile
+
+import pytest
+
+from django.core.exceptions import ValidationError
+
+from rdmo_plugins.exports.bundle import BundleExport
+from rdmo_plugins.exports.madmp import MaDMPExport
+from rdmo_plugins.imports.madmp import MaDMPImport
+from rdmo_plugins.validators import get_json_validator, get_xml_schema
+
+from .conftest import fixtures_dir
+
+
+@pytest.fixture(autouse=True)
+def validation(settings):
+    # the tests use a small schema, which only requires a title and at least one dataset
+    settings.PLUGINS_VALIDATION = True
+    settings.PLUGINS_JSON_SCHEMAS = {'madmp': str(fixtures_dir / 'madmp-schema.json')}
+    get_json_validator.cache_clear()
+    get_xml_schema.cache_clear()
+    yield
+    get_json_validator.cache_clear()
+    get_xml_schema.cache_clear()
+
+
+def test_export_invalid(attributes, project):
+    # the export is used without a request, e.g. by a management command
+    export = MaDMPExport('madmp', 'maDMP', None)
+    export.project = project
+
+    response = export.render()
+    assert response['Content-Type'] == 'application/json'
+    assert response['X-Validation-Errors'] == '1'
+    assert 'dataset' not in json.loads(response.content)['dmp']
+
+
+def test_export_valid(attributes, project):
+    project.values.create(attribute=attributes['project/dataset/id'], set_index=0, text='Dataset')
+
+    export = MaDMPExport('madmp', 'maDMP', None)
+    export.project = project
+
+    response = export.render()
+    assert 'X-Validation-Errors' not in response
+    assert len(json.loads(response.content)['dmp']['dataset']) == 1
+
+
+def test_export_language(attributes, options, project):
+    language = options['https://rdmo.jochenklar.dev/terms/options/language/de']
+    project.values.create(attribute=attributes['project/language'], option=language)
+    project.values.create(attribute=attributes['project/dataset/id'], set_index=0, text='Dataset')
+    project.values.create(attribute=attributes['project/dataset/language'], set_index=0, option=language)
+
+    export = MaDMPExport('madmp', 'maDMP', None)
+    export.project = project
+
+    dmp = json.loads(export.render().content)['dmp']
+    assert dmp['language'] == 'deu'
+    assert dmp['dataset'][0]['language'] == 'deu'
+
+
+def test_export_documents_invalid(attributes, project):
+    export = MaDMPExport('madmp', 'maDMP', None)
+    export.project = project
+
+    documents, validation_errors = export.get_documents()
+    assert [file_name for file_name, document in documents] == ['Example project.json']
+    assert list(validation_errors) == ['Example project.json']
+
+
+def test_bundle_invalid(attributes, project):
+    # the violations of the maDMP are handled like the ones of the XML files
+    export = BundleExport('bundle', 'Bundle', None)
+    export.project = project
+    export.snapshot = None
+
+    response = export.render()
+    zip_file = zipfile.ZipFile(io.BytesIO(response.content))
+    assert 'madmp/Example project.json' in zip_file.namelist()
+    assert zip_file.read('validation.txt').decode().startswith('madmp/Example project.json:\n')
+    assert response['X-Validation-Errors'] == '1'
+
+
+def test_bundle_valid(attributes, project, settings):
+    # the XML files of the bundle are not validated, since the dataset would not be a valid DataCite resource
+    settings.PLUGINS_XML_SCHEMAS = {'datacite': None}
+    project.values.create(attribute=attributes['project/dataset/id'], set_index=0, text='Dataset')
+
+    export = BundleExport('bundle', 'Bundle', None)
+    export.project = project
+    export.snapshot = None
+
+    response = export.render()
+    zip_file = zipfile.ZipFile(io.BytesIO(response.content))
+    assert 'validation.txt' not in zip_file.namelist()
+    assert 'X-Validation-Errors' not in response
+
+
+def create_file(path, dmp):
+    path.write_text(json.dumps({'dmp': dmp}))
+    return str(path)
+
+
+def test_import(attributes, project, tmp_path):
+    import_plugin = MaDMPImport('madmp', 'maDMP', None)
+    import_plugin.current_project = project
+    import_plugin.file_name = create_file(tmp_path / 'dmp.json', {
+        'title': 'Example DMP',
+        'dataset': [{'title': 'Dataset', 'keyword': ['example']}]
+    })
+
+    assert import_plugin.check()
+    import_plugin.process()
+    assert {(value.attribute.path, value.text) for value in import_plugin.values if value.attribute} >= {
+        ('project/dataset/id', 'Dataset'),
+        ('project/dataset/title', 'Dataset')
+    }
+
+
+def test_import_language(attributes, options, project, tmp_path):
+    import_plugin = MaDMPImport('madmp', 'maDMP', None)
+    import_plugin.current_project = project
+    import_plugin.file_name = create_file(tmp_path / 'dmp.json', {
+        'title': 'Example DMP',
+        'language': 'deu',
+        'dataset': [{'title': 'Dataset', 'language': 'eng'}]
+    })
+
+    assert import_plugin.check()
+    import_plugin.process()
+    assert {
+        (value.attribute.path, value.option.uri_path)
+        for value in import_plugin.values if value.attribute and value.option
+    } == {
+        ('project/language', 'language/de'),
+        ('project/dataset/language', 'language/en')
+    }
+
+
+def test_import_invalid(attributes, project, tmp_path):
+    # an invalid file is accepted by check, so that the violations are shown to the user
+    import_plugin = MaDMPImport('madmp', 'maDMP', None)
+    import_plugin.current_project = project
+    import_plugin.file_name = create_file(tmp_path / 'dmp.json', {
+        'title': 'Example DMP',
+        'dataset': []
+    })
+
+    assert import_plugin.check()
+    with pytest.raises(ValidationError) as e:
+        import_plugin.process()
+
+    assert e.value.messages[0] == 'The file is not a valid maDMP file.'
+    assert len(e.value.messages) == 2
+    assert import_plugin.values == []
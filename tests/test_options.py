@@ -0,0 +1,75 @@
+import importlib
+import json
+
+import pytest
+
+from rdmo_plugins.options import OptionMap
+
+from .conftest import fixtures_dir
+
+# the dicts of the exports and imports before they were replaced by the OptionMap, keyed by the class attribute
+option_maps = json.loads((fixtures_dir / 'option_maps.json').read_text())
+
+# codes which were misspelled in the dicts before
+corrections = {
+    'rdmo_plugins.exports.radar.mixins.RadarMixin.controlled_subject_area_options': {
+        'radar_controlled_subject_area/computer_science': 'COMPUTER_SCIENCE',
+        'radar_controlled_subject_area/geological_science': 'GEOLOGICAL_SCIENCE'
+    }
+}
+
+
+# codes which were only commented out in the dicts of the maDMP export before, since the options were missing
+additions = {
+    'rdmo_plugins.exports.madmp.MaDMPExport.language_options': {
+        'language/en': 'eng',
+        'language/de': 'deu'
+    },
+    'rdmo_plugins.exports.madmp.MaDMPExport.person_id_type_options': {
+        'name_identifier_scheme/orcid': 'orcid',
+        'name_identifier_scheme/insi': 'isni'
+    },
+    'rdmo_plugins.exports.madmp.MaDMPExport.dataset_id_type_options': {
+        'identifier_type/doi': 'doi',
+        'identifier_type/other': 'other',
+        'identifier_type/url': 'url',
+        'identifier_type/handle': 'handle'
+    },
+    'rdmo_plugins.exports.madmp.MaDMPExport.dmp_id_type_options': {
+        'identifier_type/doi': 'doi',
+        'identifier_type/other': 'other',
+        'identifier_type/url': 'url',
+        'identifier_type/handle': 'handle'
+    }
+}
+
+
+def get_option_map(key):
+    module_name, class_name, attribute = key.rsplit('.', 2)
+    return getattr(getattr(importlib.import_module(module_name), class_name), attribute)
+
+
+@pytest.mark.parametrize('key', [key for key in option_maps if '.exports.' in key])
+def test_export_option_map(key):
+    option_map = get_option_map(key)
+    codes = option_map.maps['path_to_code'] if isinstance(option_map, OptionMap) else option_map
+
+    assert codes == dict(option_maps[key], **corrections.get(key, {}), **additions.get(key, {}))
+
+
+@pytest.mark.parametrize('key', [key for key in option_maps if '.imports.' in key])
+def test_import_option_map(key):
+    option_map = get_option_map(key)
+
+    # for every code the option, which was found first in the dict before, is imported
+    for uri, code in option_maps[key].items():
+        first_uri = next(uri for uri, first_code in option_maps[key].items() if first_code == code)
+        assert option_map.get_uri(code) == first_uri
+
+
+def test_madmp_import_option_map():
+    option_map = get_option_map('rdmo_plugins.imports.madmp.MaDMPImport.language_options')
+
+    assert option_map.get_uri('eng') == 'https://rdmo.jochenklar.dev/terms/options/language/en'
+    assert option_map.get_uri('deu') == 'https://rdmo.jochenklar.dev/terms/options/language/de'
+    assert option_map.get_uri('fra') is None
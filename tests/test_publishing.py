@@ -0,0 +1,159 @@
+from datetime import timedelta
+
+import pytest
+
+from django.utils.timezone import now
+
+from rdmo_plugins.exports import publishing
+from rdmo_plugins.exports.utils import cache_is_shared
+from rdmo_plugins.exports.zenodo import ZenodoExportProvider
+from rdmo_plugins.models import PublishingJob
+
+
+@pytest.fixture
+def provider(providers, settings, project, http_request, monkeypatch):
+    settings.ZENODO_PROVIDER['background'] = True
+
+    provider = ZenodoExportProvider('zenodo', 'Zenodo', 'rdmo_plugins.exports.zenodo.ZenodoExportProvider')
+    provider.project = project
+    provider.request = http_request
+
+    # the tokens of the user are in the token store
+    monkeypatch.setattr(ZenodoExportProvider, 'token_store_enabled', True)
+    monkeypatch.setattr(provider, 'get_tokens', lambda cache_key: {'access_token': 'token'})
+    return provider
+
+
+@pytest.mark.parametrize('backend,shared', [
+    ('django.core.cache.backends.locmem.LocMemCache', False),
+    ('django.core.cache.backends.dummy.DummyCache', False),
+    ('django.core.cache.backends.redis.RedisCache', True),
+    ('django.core.cache.backends.memcached.PyMemcacheCache', True)
+])
+def test_cache_is_shared(settings, backend, shared):
+    settings.CACHES = {'default': {'BACKEND': backend}}
+    assert cache_is_shared() is shared
+
+
+def test_publish_in_background(provider, settings, http_request):
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache'}}
+    assert provider.publish_in_background(http_request)
+
+
+def test_publish_in_background_local_cache(provider, http_request, caplog):
+    # with the LocMemCache of the tests, the status of the jobs would only be seen by one process
+    assert not provider.publish_in_background(http_request)
+    assert 'no shared cache' in caplog.text
+
+
+def test_publish_in_background_disabled(provider, settings, http_request):
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache'}}
+    settings.ZENODO_PROVIDER['background'] = False
+    assert not provider.publish_in_background(http_request)
+
+
+class Provider(object):
+
+    # stands in for an export provider in the worker, the datasets in results are returned by publish
+    provider_settings = {'max_attempts': 2, 'backoff': 30}
+
+    def __init__(self, results):
+        self.results = results
+
+    def publish(self, set_indexes, options):
+        return [dict(self.results[set_index], set_index=set_index) for set_index in set_indexes]
+
+
+@pytest.fixture
+def job(project, http_request, monkeypatch):
+    # the worker thread is not started, the jobs are claimed and run by the tests
+    monkeypatch.setattr(publishing, 'start_worker', lambda: None)
+
+    provider = ZenodoExportProvider('zenodo', 'Zenodo', 'rdmo_plugins.exports.zenodo.ZenodoExportProvider')
+    provider.project = project
+    provider.request = http_request
+
+    job = publishing.create_job(provider, [0, 1], {'sync': False})
+    publishing.enqueue(job)
+    return job
+
+
+def run_job(provider, monkeypatch):
+    monkeypatch.setattr(publishing, 'get_plugin', lambda plugin_type, key: provider)
+    job = publishing.claim_job()
+    publishing.run_job(job)
+    return PublishingJob.objects.get(pk=job.pk)
+
+
+def test_enqueue(job, project):
+    # the job is stored in the database and shown on the export page
+    assert [(stored_job.pk, stored_job.status) for stored_job in publishing.get_jobs('zenodo', project.id)] == [
+        (job.pk, 'queued')
+    ]
+    assert publishing.get_jobs('radar', project.id) == []
+
+
+def test_claim_job(job):
+    # a job is only claimed once, e.g. by the workers of two processes
+    assert publishing.claim_job().pk == job.pk
+    assert PublishingJob.objects.get(pk=job.pk).status == 'running'
+    assert publishing.claim_job() is None
+
+
+def test_claim_job_delay(job):
+    publishing.enqueue(job, delay=60)
+    assert publishing.claim_job() is None
+
+
+def test_run_job(job, monkeypatch):
+    job = run_job(Provider({0: {'url': 'https://zenodo.example.org/records/1'}, 1: {'unchanged': True}}), monkeypatch)
+    assert job.status == 'sent'
+    assert job.attempts == 1
+    assert [dataset['set_index'] for dataset in job.datasets] == [0, 1]
+
+
+def test_run_job_retry(job, monkeypatch):
+    # the dataset, which failed temporarily, is queued again, until max_attempts is reached
+    provider = Provider({0: {'url': 'https://zenodo.example.org/records/1'}, 1: {'error': 'timeout', 'retry': True}})
+
+    job = run_job(provider, monkeypatch)
+    assert job.status == 'queued'
+    assert job.set_indexes == [1]
+    assert publishing.claim_job() is None
+
+    job.next_attempt = job.updated
+    job.save()
+
+    job = run_job(provider, monkeypatch)
+    assert job.status == 'failed'
+    assert job.attempts == 2
+    assert [dataset['error'] for dataset in job.datasets] == [None, 'timeout']
+
+
+def test_run_job_error(job, monkeypatch):
+    class ExpiredProvider(Provider):
+
+        def publish(self, set_indexes, options):
+            raise publishing.PublishingError('The authorization expired.')
+
+    job = run_job(ExpiredProvider({}), monkeypatch)
+    assert job.status == 'failed'
+    assert job.error == 'The authorization expired.'
+
+
+def test_recover_jobs(job):
+    # a job, which was running when its process was stopped, has failed, once the job_timeout has passed
+    jobs_settings = publishing.get_jobs_settings()
+    running = publishing.claim_job()
+
+    publishing.recover_jobs(jobs_settings)
+    assert PublishingJob.objects.get(pk=running.pk).status == 'running'
+
+    PublishingJob.objects.filter(pk=running.pk).update(updated=now() - timedelta(seconds=3601))
+    publishing.recover_jobs(jobs_settings)
+    assert PublishingJob.objects.get(pk=running.pk).status == 'failed'
+
+    # finished jobs are deleted after the job_retention
+    PublishingJob.objects.filter(pk=running.pk).update(updated=now() - timedelta(days=8))
+    publishing.recover_jobs(jobs_settings)
+    assert not PublishingJob.objects.filter(pk=running.pk).exists()
@@ -0,0 +1,220 @@
+import pytest
+import requests
+
+from django.core.cache import cache
+from django.db.models.signals import post_save
+
+from rdmo.projects.models import Membership, Value
+
+from rdmo_plugins.exports.radar import RadarExportProvider, providers
+
+
+@pytest.fixture
+def provider(providers, attributes, options, project, http_request):
+    for set_index, title in enumerate(['First dataset', 'Second dataset']):
+        project.values.create(attribute=attributes['project/dataset/id'], set_index=set_index, text=title)
+        project.values.create(attribute=attributes['project/dataset/title'], set_index=set_index, text=title)
+
+    provider = RadarExportProvider('radar', 'RADAR', 'rdmo_plugins.exports.radar.RadarExportProvider')
+    provider.project = project
+    provider.snapshot = None
+    provider.request = http_request
+    return provider
+
+
+def get_post_requests(provider, set_indexes):
+    requests_list, pending = provider.prepare_requests(set_indexes, {'workspace': 'workspace'})
+    return {
+        set_index: (method, url, idempotency_key)
+        for set_index, (method, url, data, idempotency_key) in zip(set_indexes, requests_list)
+    }, pending
+
+
+def test_idempotency_key(provider, monkeypatch):
+    monkeypatch.setattr('rdmo_plugins.exports.radar.providers.time.time', lambda: 1000)
+    first, pending = get_post_requests(provider, [0, 1])
+    assert pending == []
+    assert first[0][:2] == ('post', 'https://radar.example.org/radar/api/workspaces/workspace/datasets')
+    assert first[0][2] != first[1][2]
+
+    # the first requests timed out, so nothing is sent, while the claims are pending,
+    # since the datasets might have been created in RADAR
+    second, pending = get_post_requests(provider, [0, 1])
+    assert second == {}
+    assert pending == [0, 1]
+
+    # after the pending_timeout, the datasets are sent again later, with a different archiveDate
+    # and publishDate, and the key needs to be the same
+    for set_index in [0, 1]:
+        provider.release_dataset(set_index)
+    monkeypatch.setattr('rdmo_plugins.exports.radar.providers.time.time', lambda: 2000)
+    third, pending = get_post_requests(provider, [0, 1])
+    assert pending == []
+    assert third == first
+
+
+def test_idempotency_key_changed(provider, attributes):
+    first, pending = get_post_requests(provider, [0])
+
+    # a dataset which was changed in the meantime can not be sent, while the first request is pending
+    provider.project.values.filter(attribute=attributes['project/dataset/title'], set_index=0).update(text='Changed')
+    second, pending = get_post_requests(provider, [0])
+    assert second == {}
+    assert pending == [0]
+
+    # once the claim is released, the changed dataset is sent with a new key
+    cache.delete(provider.get_pending_cache_key(provider.project.id, 0))
+    third, pending = get_post_requests(provider, [0])
+    assert third[0][2] != first[0][2]
+
+
+def test_send_datasets_authorize(provider, http_request, monkeypatch):
+    # without an access token, only the project and the datasets are stored in the session, and not the
+    # payloads, the claims are released, since nothing was sent, and the requests are prepared again
+    Membership.objects.create(project=provider.project, user=http_request.user, role='owner')
+    monkeypatch.setattr(RadarExportProvider, 'authorize', lambda self, request: 'authorize')
+    options = {'workspace': 'workspace', 'sync': False}
+
+    assert provider.send_datasets([0, 1], options) == 'authorize'
+    assert provider.get_from_session(http_request, 'request') == ('many', None, {
+        'project_id': provider.project.id,
+        'name': 'send_datasets',
+        'args': [[0, 1], options]
+    })
+    assert provider.get_from_session(http_request, 'radar_hashes') is None
+    assert cache.get(provider.get_pending_cache_key(provider.project.id, 0)) is None
+
+    # the callback creates a new provider, without the project
+    sent = []
+    monkeypatch.setattr(RadarExportProvider, 'get_access_token', lambda self, request: 'token')
+    monkeypatch.setattr(RadarExportProvider, 'send_requests',
+                        lambda self, access_token, requests_list: sent.extend(requests_list) or
+                        [Response({}, status_code=201) for request in requests_list])
+    monkeypatch.setattr(RadarExportProvider, 'post_many_success', lambda self, request, results: 'success')
+
+    callback_provider = RadarExportProvider('radar', 'RADAR', 'rdmo_plugins.exports.radar.RadarExportProvider')
+    stored_request = callback_provider.pop_from_session(http_request, 'request')
+    assert callback_provider.resend_many(http_request, stored_request[2]) == 'success'
+    assert [data['descriptiveMetadata']['title'] for method, url, data, idempotency_key in sent] == \
+        ['First dataset', 'Second dataset']
+
+
+def test_get_request_headers(provider, monkeypatch):
+    # the key of requests, which are not prepared by prepare_requests, leaves out the dates as well
+    monkeypatch.setattr('rdmo_plugins.exports.radar.providers.time.time', lambda: 1000)
+    first = provider.get_request_headers('token', 'post', 'https://radar.example.org', provider.get_post_data(0))
+    monkeypatch.setattr('rdmo_plugins.exports.radar.providers.time.time', lambda: 2000)
+    second = provider.get_request_headers('token', 'post', 'https://radar.example.org', provider.get_post_data(0))
+
+    assert first['Idempotency-Key'] == second['Idempotency-Key']
+    assert first['Authorization'] == 'Bearer token'
+
+
+def test_save_dataset_values(provider, attributes):
+    # the values are saved one by one, so that the signals of the values are sent
+    saved = []
+
+    def receiver(sender, instance, **kwargs):
+        saved.append((instance.attribute.path, instance.set_index, instance.text))
+
+    post_save.connect(receiver, sender=Value)
+    try:
+        provider.save_dataset_values(provider.project.id, {
+            0: {'project/dataset/radar_id': 'radar-0', 'project/dataset/title': 'First dataset'},
+            1: {'project/dataset/radar_id': 'radar-1'}
+        })
+    finally:
+        post_save.disconnect(receiver, sender=Value)
+
+    # the title did not change, so it is not saved again
+    assert saved == [('project/dataset/radar_id', 0, 'radar-0'), ('project/dataset/radar_id', 1, 'radar-1')]
+
+
+class Response(object):
+
+    def __init__(self, data, status_code=200):
+        self.data = data
+        self.status_code = status_code
+        self.ok = status_code < 400
+
+    def json(self):
+        return self.data
+
+
+def pull(provider, results, monkeypatch):
+    # the results are passed like by send_many, after the datasets were fetched from RADAR
+    monkeypatch.setattr(providers, 'render', lambda request, template, context, status: context)
+    provider.store_in_session(provider.request, 'project_id', provider.project.id)
+    provider.store_in_session(provider.request, 'set_indexes', list(range(len(results))))
+    provider.store_in_session(provider.request, 'radar_ids', [(index, 'radar-{}'.format(index))
+                                                              for index in range(len(results))])
+    return provider.pull_many_success(provider.request, [(None, response) for response in results])['datasets']
+
+
+def get_titles(provider, attributes):
+    return list(provider.project.values.filter(attribute=attributes['project/dataset/title'])
+                                       .order_by('set_index').values_list('text', flat=True))
+
+
+def test_pull(provider, attributes, monkeypatch):
+    datasets = pull(provider, [
+        Response({'descriptiveMetadata': {'title': 'Changed dataset'}}),
+        Response({'descriptiveMetadata': {'title': 'Second dataset'}})
+    ], monkeypatch)
+
+    assert [dataset.get('error') for dataset in datasets] == [None, None]
+    assert datasets[0]['url'] == 'https://radar.example.org/radar/en/dataset/radar-0'
+    assert get_titles(provider, attributes) == ['Changed dataset', 'Second dataset']
+
+
+def test_pull_keeps_id(provider, attributes, monkeypatch):
+    pull(provider, [
+        Response({'descriptiveMetadata': {'title': 'Changed dataset'}}),
+        Response({'descriptiveMetadata': {'title': 'Second dataset'}})
+    ], monkeypatch)
+
+    assert list(provider.project.values.filter(attribute=attributes['project/dataset/id'])
+                                       .order_by('set_index').values_list('text', flat=True)) == \
+        ['First dataset', 'Second dataset']
+
+
+def test_pull_removed(provider, attributes, monkeypatch):
+    # the description was removed in RADAR, so it is deleted in RDMO as well, but only for the pulled dataset
+    for set_index in [0, 1]:
+        provider.project.values.create(attribute=attributes['project/dataset/description'],
+                                       set_index=set_index, text='Description')
+
+    pull(provider, [
+        Response({'descriptiveMetadata': {'title': 'First dataset'}})
+    ], monkeypatch)
+
+    assert list(provider.project.values.filter(attribute=attributes['project/dataset/description'])
+                                       .values_list('set_index', flat=True)) == [1]
+    assert get_titles(provider, attributes) == ['First dataset', 'Second dataset']
+
+
+def test_pull_errors(provider, attributes, monkeypatch):
+    datasets = pull(provider, [
+        Response({'descriptiveMetadata': {}}),
+        Response({'descriptiveMetadata': {'fundingReferences': {}}}),
+        Response({'exception': 'Not found'}, status_code=404),
+        requests.ConnectionError('connection refused')
+    ], monkeypatch)
+
+    assert [dataset['error'] for dataset in datasets] == [
+        'RADAR returned no metadata for the dataset.',
+        'RADAR returned no metadata for the dataset.',
+        'Not found',
+        'connection refused'
+    ]
+    assert get_titles(provider, attributes) == ['First dataset', 'Second dataset']
+
+
+def test_pull_unknown_elements(provider, attributes, monkeypatch):
+    # metadata without any of the known elements is rendered as a document without the namespace of the elements
+    datasets = pull(provider, [
+        Response({'descriptiveMetadata': {'unknownElement': 'value'}})
+    ], monkeypatch)
+
+    assert datasets[0].get('error') is None
+    assert get_titles(provider, attributes) == ['First dataset', 'Second dataset']
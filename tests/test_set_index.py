@@ -0,0 +1,89 @@
+from rdmo.projects.models import Value
+
+from rdmo_plugins.imports.mixins import SetIndexMixin, check_cache
+
+
+class SetIndexImport(SetIndexMixin):
+
+    def __init__(self, project, file_name):
+        self.current_project = project
+        self.file_name = str(file_name)
+
+
+def create_file(path, content):
+    path.write_text(content)
+    return path
+
+
+def test_get_next_set_index(attributes, project, tmp_path):
+    for set_index in [0, 1, 3]:
+        Value.objects.create(project=project, attribute=attributes['project/dataset/id'], set_index=set_index)
+
+    file_name = create_file(tmp_path / 'dataset.xml', 'dataset')
+    assert SetIndexImport(project, file_name).get_next_set_index('project/dataset/id') == 4
+
+
+def test_get_next_set_index_empty(attributes, project, tmp_path):
+    file_name = create_file(tmp_path / 'dataset.xml', 'dataset')
+    assert SetIndexImport(project, file_name).get_next_set_index('project/dataset/id') == 0
+
+
+def test_get_next_set_index_confirm(attributes, project, tmp_path):
+    # the import is processed again, when it is confirmed, and needs to get the same set_index
+    file_name = create_file(tmp_path / 'dataset.xml', 'dataset')
+    preview = SetIndexImport(project, file_name).get_next_set_index('project/dataset/id')
+    confirm = SetIndexImport(project, file_name).get_next_set_index('project/dataset/id')
+    assert preview == confirm == 0
+
+
+def test_get_next_set_index_concurrent(attributes, project, tmp_path):
+    # the reservations of imports, which were not confirmed yet, are not used again
+    first = SetIndexImport(project, create_file(tmp_path / 'first.xml', 'first'))
+    second = SetIndexImport(project, create_file(tmp_path / 'second.xml', 'second'))
+    third = SetIndexImport(project, create_file(tmp_path / 'third.xml', 'third'))
+
+    assert first.get_next_set_index('project/funder/id', count=3) == 0
+    assert second.get_next_set_index('project/funder/id', count=2) == 3
+    assert third.get_next_set_index('project/funder/id') == 5
+
+    # the paths are allocated separately
+    assert third.get_next_set_index('project/dataset/id') == 0
+
+
+def test_get_next_set_index_same_file_name(attributes, project, tmp_path):
+    # a different file with the same name gets a new set_index
+    file_name = create_file(tmp_path / 'dataset.xml', 'first dataset')
+    assert SetIndexImport(project, file_name).get_next_set_index('project/dataset/id') == 0
+
+    create_file(tmp_path / 'dataset.xml', 'second dataset')
+    assert SetIndexImport(project, file_name).get_next_set_index('project/dataset/id') == 1
+
+
+def test_get_next_set_index_saved(attributes, project, tmp_path):
+    # once the import was saved, the same file gets a new set_index
+    file_name = create_file(tmp_path / 'dataset.xml', 'dataset')
+    set_index = SetIndexImport(project, file_name).get_next_set_index('project/dataset/id')
+    Value.objects.create(project=project, attribute=attributes['project/dataset/id'], set_index=set_index)
+
+    assert SetIndexImport(project, file_name).get_next_set_index('project/dataset/id') == set_index + 1
+
+
+def test_get_next_set_index_local_cache(attributes, project, tmp_path, caplog):
+    # without a shared cache, concurrent imports in different processes are not safe, this is logged once
+    check_cache.cache_clear()
+    file_name = create_file(tmp_path / 'dataset.xml', 'dataset')
+    SetIndexImport(project, file_name).get_next_set_index('project/dataset/id')
+    SetIndexImport(project, file_name).get_next_set_index('project/dataset/id')
+
+    assert [record.levelname for record in caplog.records if 'No shared cache' in record.getMessage()] == ['WARNING']
+
+
+def test_get_next_set_index_shared_cache(settings, attributes, project, tmp_path, caplog):
+    check_cache.cache_clear()
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                                   'LOCATION': str(tmp_path / 'cache')}}
+    file_name = create_file(tmp_path / 'dataset.xml', 'dataset')
+    SetIndexImport(project, file_name).get_next_set_index('project/dataset/id')
+
+    assert 'No shared cache' not in caplog.text
+    check_cache.cache_clear()
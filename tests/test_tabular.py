@@ -0,0 +1,88 @@
+import csv
+import io
+
+import pytest
+
+from django.core.management import call_command
+
+from rdmo_plugins.exports.tabular import CSVTableWriter, ParquetTableWriter, columns, get_dataset_rows, get_pyarrow
+
+
+@pytest.fixture
+def datasets(attributes, project):
+    for set_index, text in enumerate(['First dataset', 'Second dataset']):
+        project.values.create(attribute=attributes['project/dataset/id'], set_index=set_index, text=text)
+
+    project.values.create(attribute=attributes['project/dataset/title'], set_index=0, text='Measurements')
+    project.values.create(attribute=attributes['project/dataset/publisher'], set_index=0,
+                          text='Example Data Repository')
+
+    for set_index, text in enumerate(['Doe, Jane', 'Example Research Group']):
+        project.values.create(attribute=attributes['project/dataset/creator/name'], set_prefix='0',
+                              set_index=set_index, text=text)
+
+    for collection_index, text in enumerate(['example', 'measurement']):
+        project.values.create(attribute=attributes['project/research_question/keywords'],
+                              collection_index=collection_index, text=text)
+
+
+def test_get_dataset_rows(datasets, project):
+    rows = list(get_dataset_rows(project))
+
+    assert [list(row) for row in rows] == [[name for name, column_type in columns]] * 2
+    assert [row['set_index'] for row in rows] == [0, 1]
+
+    assert rows[0]['project_id'] == project.id
+    assert rows[0]['project_title'] == 'Example project'
+    assert rows[0]['identifier'] == 'First dataset'
+    assert rows[0]['identifier_type'] == 'OTHER'
+    assert rows[0]['title'] == 'Measurements'
+    assert rows[0]['publisher'] == 'Example Data Repository'
+    assert rows[0]['creators'] == ['Doe, Jane', 'Example Research Group']
+    assert rows[0]['keywords'] == ['example', 'measurement']
+
+    # the title falls back to the id, and the lists are empty
+    assert rows[1]['title'] == 'Second dataset'
+    assert rows[1]['publisher'] is None
+    assert rows[1]['creators'] == []
+    assert rows[1]['licenses'] == []
+
+
+def test_get_dataset_rows_empty(attributes, project):
+    assert list(get_dataset_rows(project)) == []
+
+
+def test_csv_table_writer(datasets, project):
+    f = io.StringIO()
+    writer = CSVTableWriter(f, delimiter=';')
+    for row in get_dataset_rows(project):
+        writer.write(row)
+    writer.close()
+
+    first, second = csv.DictReader(io.StringIO(f.getvalue()), delimiter=';')
+    assert first['title'] == 'Measurements'
+    assert first['creators'] == 'Doe, Jane; Example Research Group'
+    assert first['set_index'] == '0'
+    assert second['creators'] == ''
+
+
+@pytest.mark.skipif(get_pyarrow() is None, reason='pyarrow is not installed')
+def test_parquet_table_writer(datasets, project):
+    f = io.BytesIO()
+    writer = ParquetTableWriter(f, batch_size=1)
+    for row in get_dataset_rows(project):
+        writer.write(row)
+    writer.close()
+
+    parquet_file = get_pyarrow().parquet.ParquetFile(io.BytesIO(f.getvalue()))
+    assert parquet_file.metadata.num_row_groups == 2
+
+    assert parquet_file.read().to_pylist() == list(get_dataset_rows(project))
+
+
+def test_export_datasets(datasets, project, tmp_path):
+    output = tmp_path / 'datasets.csv'
+    call_command('export_datasets', str(output), stdout=io.StringIO())
+
+    rows = list(csv.DictReader(output.open()))
+    assert [row['identifier'] for row in rows] == ['First dataset', 'Second dataset']
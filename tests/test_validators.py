@@ -0,0 +1,50 @@
+import pytest
+
+from rdmo_plugins.validators import get_json_validator, get_xml_schema, validate_json, validate_xml, validate_xml_file
+
+from .conftest import fixtures_dir
+
+
+@pytest.fixture(autouse=True)
+def validation(settings):
+    settings.PLUGINS_VALIDATION = True
+    get_xml_schema.cache_clear()
+    get_json_validator.cache_clear()
+    yield
+    get_xml_schema.cache_clear()
+    get_json_validator.cache_clear()
+
+
+def test_datacite_schema():
+    assert get_xml_schema('datacite') is not None
+
+
+def test_validate_xml_file():
+    assert validate_xml_file('datacite', fixtures_dir / 'datacite.xml') == []
+
+
+def test_validate_xml_invalid():
+    xml = (fixtures_dir / 'datacite.xml').read_text().replace('<publisher>Example Data Repository</publisher>', '')
+    errors = validate_xml('datacite', xml)
+    assert len(errors) == 1
+    assert 'publisher' in errors[0]
+
+
+def test_validate_xml_radar(caplog):
+    # the RADAR schema is not included, so RADAR documents are only validated if it is configured
+    assert get_xml_schema('radar') is None
+    assert validate_xml_file('radar', fixtures_dir / 'radar.xml') == []
+    assert 'no radar schema is configured' in caplog.text
+
+
+def test_validate_json_no_schema(settings, caplog):
+    # the maDMP schema is not included, the validation is skipped with a warning, which is logged only once
+    settings.PLUGINS_JSON_SCHEMAS = {}
+    assert validate_json('madmp', {}) == []
+    assert validate_json('madmp', {}) == []
+    assert [record.levelname for record in caplog.records if 'madmp' in record.getMessage()] == ['WARNING']
+
+
+def test_validate_xml_disabled(settings):
+    settings.PLUGINS_VALIDATION = False
+    assert validate_xml('datacite', '<resource/>') == []